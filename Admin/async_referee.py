@@ -0,0 +1,60 @@
+from referee import Referee, PLACEMENT
+import asyncio
+import copy
+import inspect
+
+"""
+An AsyncReferee is a Referee (see referee.py) whose run_game is a coroutine, so one asyncio event loop can run many
+games at once, for example hundreds of games against remote or slow players, without one game waiting on another.
+
+A Player of an AsyncReferee can have coroutine place_avatar and move_avatar methods, which are awaited in the event loop
+and given the official GameState, like a Referee gives it. Any other Player, typically a local one that searches
+(see strategy.py), is called in the executor, by default the event loop's default ThreadPoolExecutor, so the event loop
+keeps running the other games while it thinks. A Player called in the executor is given a copy of the GameState, since
+it can still be running after it timed out, while the game goes on without it.
+
+If the AsyncReferee has a timeout (see referee.py), a Player that takes longer than that to place or move a penguin is
+eliminated, the same way as a Player that gives an illegal answer, and so is a Player whose call raises an exception.
+Without a timeout, an exception raised by a Player propagates out of run_game, exactly like with a Referee. A call that
+timed out is cancelled if it is a coroutine, but a call running in the executor cannot be stopped, it just finishes in
+the background and its answer is ignored. The latency histograms of the Players (see referee.py) include the time their
+calls waited for the event loop. An AsyncReferee can adjudicate like a Referee too.
+"""
+
+
+class AsyncReferee(Referee):
+
+    def __init__(self, player_seq, board_rows=None, board_columns=None, test_board=None, timeout=None, executor=None,
+                 adjudicate=False):
+        super().__init__(player_seq, board_rows, board_columns, test_board, timeout, adjudicate)
+        # a concurrent.futures Executor, or None for the default executor of the event loop
+        self.__executor = executor
+
+    async def run_game(self):
+        game = self.play_game()
+        try:
+            current_player, phase_type = next(game)
+            while True:
+                answer = await self.__place_or_move_avatar(current_player, phase_type)
+                current_player, phase_type = game.send(answer)
+        except StopIteration as game_over:
+            return game_over.value
+
+    async def __place_or_move_avatar(self, current_player, phase_type):
+        # the answer of the Player, or None if it timed out or raised with a timeout set
+        player_method = current_player.place_avatar if phase_type == PLACEMENT else current_player.move_avatar
+        if inspect.iscoroutinefunction(player_method):
+            player_call = player_method(self.get_current_game_state())
+        else:
+            player_call = asyncio.get_running_loop().run_in_executor(self.__executor, player_method,
+                                                                     copy.deepcopy(self.get_current_game_state()))
+        if self.get_timeout() is None:
+            return await player_call
+
+        try:
+            return await asyncio.wait_for(player_call, self.get_timeout())
+        except Exception:
+            return None
+
+    def get_executor(self):
+        return self.__executor
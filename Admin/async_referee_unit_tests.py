@@ -0,0 +1,93 @@
+import unittest
+import sys
+import asyncio
+import time
+from async_referee import AsyncReferee
+sys.path.append('../Common')
+from board import Board
+sys.path.append('../Player')
+from player import Player
+
+
+class SlowPlayer(Player):
+    # a Player with coroutine methods that waits delay seconds before every answer, like a remote player would
+    def __init__(self, player_id, delay):
+        super().__init__(player_id)
+        self.__delay = delay
+
+    async def place_avatar(self, current_game_state):
+        await asyncio.sleep(self.__delay)
+        return super().place_avatar(current_game_state)
+
+    async def move_avatar(self, current_game_state):
+        await asyncio.sleep(self.__delay)
+        return super().move_avatar(current_game_state)
+
+
+class FailingPlayer(Player):
+    async def move_avatar(self, current_game_state):
+        raise ConnectionError('The player disconnected')
+
+
+class TestAsyncReferee(unittest.TestCase):
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            AsyncReferee([Player(1), Player(2)], 2, 5, timeout=0)
+
+    def test_run_game(self):
+        # tests that the outcome is the same as the one of a Referee, for Players called in the executor
+        board = Board(4, 3, {3: [0]}, num_of_fish_per_tile=2)
+        player1 = Player(1)
+        player2 = Player(2)
+        referee = AsyncReferee([player2, player1], test_board=board)
+        assert asyncio.run(referee.run_game()) == {'won': [player2], 'lost': [player1], 'cheated/failed': []}
+
+        board = Board(2, 5, {0: [0, 1]}, num_of_fish_per_tile=2)
+        player1 = SlowPlayer(1, 0)
+        player2 = Player(2)
+        referee = AsyncReferee([player1, player2], test_board=board)
+        assert asyncio.run(referee.run_game()) == {'won': [player1, player2], 'lost': [], 'cheated/failed': []}
+
+    def test_run_game_timeout(self):
+        # tests that a Player that takes longer than the timeout, or raises, is eliminated, and that without a timeout
+        # the exception of a Player propagates, like with a Referee
+        board = Board(2, 5, {}, num_of_fish_per_tile=2)
+        player1 = SlowPlayer(1, 10)
+        player2 = Player(2)
+        referee = AsyncReferee([player1, player2], test_board=board, timeout=0.05)
+        assert referee.get_timeout() == 0.05
+        assert asyncio.run(referee.run_game()) == {'won': [player2], 'lost': [], 'cheated/failed': [player1]}
+
+        board = Board(2, 5, {}, num_of_fish_per_tile=2)
+        player1 = FailingPlayer(1)
+        player2 = Player(2)
+        referee = AsyncReferee([player1, player2], test_board=board, timeout=1)
+        assert asyncio.run(referee.run_game()) == {'won': [player2], 'lost': [], 'cheated/failed': [player1]}
+
+        board = Board(2, 5, {}, num_of_fish_per_tile=2)
+        referee = AsyncReferee([FailingPlayer(1), Player(2)], test_board=board)
+        with self.assertRaises(ConnectionError):
+            asyncio.run(referee.run_game())
+
+    def test_run_games_concurrently(self):
+        # tests that one event loop runs many games with slow Players at once, rather than one after the other
+        async def run_games(referees):
+            return await asyncio.gather(*[referee.run_game() for referee in referees])
+
+        num_of_games = 100
+        delay = 0.01
+        referees = [AsyncReferee([SlowPlayer(1, delay), SlowPlayer(2, delay)],
+                                 test_board=Board(2, 5, {}, num_of_fish_per_tile=2)) for _i in range(num_of_games)]
+        start_time = time.perf_counter()
+        outcomes = asyncio.run(run_games(referees))
+        elapsed = time.perf_counter() - start_time
+        # every game takes at least 8 placements, so at least 8 delays
+        assert elapsed < num_of_games * 8 * delay / 4
+        for outcome in outcomes:
+            assert [player.get_player_id() for player in outcome["won"]] == [1]
+            assert outcome["cheated/failed"] == []
+
+
+if __name__ == '__main__':
+    unittest.main()
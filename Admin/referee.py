@@ -3,9 +3,11 @@ sys.path.append('../Common')
 from board import Board
 from tile_fish_penguin_constants import MAX_FISH, PENGUIN_COLORS
 from state import GameState
-from game_tree import GameTree
+import copy
 import random
 import math
+import threading
+import time
 
 RAND_VAL_LOW = 0
 RAND_VAL_HIGH = 5
@@ -14,6 +16,9 @@ MIN_NUM_ONE_FISH_TILES_MAX_PERCENT = 5
 PLACEMENT = "placement"
 MOVING = "moving"
 
+# the upper bounds, in seconds, of the buckets of a LatencyHistogram (see below), from fastest to slowest
+LATENCY_BUCKETS = [0.001, 0.01, 0.1, 1, 10]
+
 """
 A PhaseType is one of PLACEMENT OR MOVING (SEE ABOVE).
 
@@ -41,13 +46,36 @@ Abnormal interactions between Referee and Player:
 - Gives a data structure other than the expected data structure for the phase it is in. For placement phase, exp structure
 is a List, and for moving phase, exp structure is a tuple. 
 - Gives illegal placements/actions.
+- Skips its turn, by giving the empty Action (), when it can still move.
+- Takes longer than the timeout of the referee to answer, if it has one.
+
+If a Referee has a timeout, a number of seconds, it calls every Player in a worker thread, on a copy of the GameState,
+and waits at most that long for its answer. A Player that does not answer in time, or whose call raises an exception,
+is eliminated. The worker thread of a Player that timed out cannot be stopped, it just finishes in the background and
+its answer is ignored, but the game goes on without waiting for it. Without a timeout, a Player is called directly on
+the GameState, and an exception it raises propagates out of run_game (an AsyncReferee does the same, see
+async_referee.py).
+
+A LatencyHistogram is a List of ints with one more element than LATENCY_BUCKETS: element i is how many answers of a
+Player took at most LATENCY_BUCKETS[i] seconds (and more than the bound before it), and the last element is how many
+took longer than all of them. A Referee keeps one for every Player, so slow Players can be spotted.
+
+A Referee can optionally adjudicate: before every move, it works out the most fish each Player could still end up
+with, its score plus, for every Region of the board (see regions.py) where one of its penguins can still move, the fish
+of the free tiles of that Region and of the tiles under its penguins that can move there. Once one Player has more fish
+than any other Player could still end up with, nothing the Players do can change who wins, so the game ends there, and
+the Outcome is the one the rest of the game would have had, as long as no Player would have failed or cheated in it,
+with the same Players in each List, but maybe in another order, since the Lists follow the turns.
 """
 
 
 class Referee:
     # test board is a Board used only for unit testing purposes. For all other cases, it will not be passed in. If it is passed
     # in though, I don't see a need for board_rows and board_columns so they're initialized to None.
-    def __init__(self, player_seq, board_rows=None, board_columns=None, test_board=None):
+    def __init__(self, player_seq, board_rows=None, board_columns=None, test_board=None, timeout=None,
+                 adjudicate=False):
+        if timeout is not None and timeout <= 0:
+            raise ValueError('Timeout must be > 0')
         # a List of Player objects, already in playing order
         self.__player_seq = player_seq
         # an int
@@ -60,16 +88,42 @@ class Referee:
         self.__current_game_state = None
         # a List of failing/cheating Players
         self.__bad_players = []
+        # a number of seconds, or None for no time limit
+        self.__timeout = timeout
+        # a Dictionary of the form {player_id: LatencyHistogram}
+        self.__latency_histograms = {player.get_player_id(): [0] * (len(LATENCY_BUCKETS) + 1) for player in player_seq}
+        # whether the game ends as soon as its winner is known, see above
+        self.__adjudicate = adjudicate
+        # whether the game was ended by adjudication rather than played to the end
+        self.__adjudicated = False
 
     def run_game(self):
+        game = self.play_game()
+        try:
+            current_player, phase_type = next(game)
+            while True:
+                current_player, phase_type = game.send(self.__place_or_move_avatar(current_player, phase_type))
+        except StopIteration as game_over:
+            return game_over.value
+
+    def play_game(self):
+        """
+        Runs the game as a generator, so the Players can be called by whoever drives it (see run_game, and
+        async_referee.py): every time a Player has to place or move a penguin, it yields a tuple (player, phase_type),
+        and must be sent back what the Player answered, or None if the Player failed to answer, which gets it
+        eliminated like any other invalid answer. Returns the Outcome of the game.
+        """
         # setup the board, assign the penguin colors to each player, and initialize the current GameState
         self.__setup()
         while not self.__current_game_state.is_game_over() and not self.__current_game_state.is_placement_phase_over():
           # the expected type of a Placement is a List (see handle_phase function for more info)
-            self.__handle_phase(PLACEMENT, list)
+            yield from self.__handle_phase(PLACEMENT, list)
         while not self.__current_game_state.is_game_over():
+            if self.__adjudicate and self.__is_decided():
+                self.__adjudicated = True
+                break
           # the expected type of an Action is a tuple (see handle_phase function for more info)
-            self.__handle_phase(MOVING, tuple)
+            yield from self.__handle_phase(MOVING, tuple)
         return self.__report_outcome()
 
     def __setup(self):
@@ -92,7 +146,7 @@ class Referee:
                                                   self.__get_max_num_tiles_with_attr(MIN_NUM_ONE_FISH_TILES_MAX_PERCENT)))
             elif rand_val == RAND_VAL_HIGH:
                 board = Board(self.__board_rows, self.__board_columns, holes,
-                              num_fish_per_tile=self.__get_rand_val(RAND_VAL_LOW, MAX_FISH))
+                              num_of_fish_per_tile=self.__get_rand_val(1, MAX_FISH))
             else:
                 board = Board(self.__board_rows, self.__board_columns, holes)
         return board
@@ -127,11 +181,18 @@ class Referee:
     def __handle_phase(self, phase_type, exp_structure_type):
         # in order to cycle shift player sequence
         current_player = self.__player_seq.pop(0)
-        to_execute = self.__place_or_move_avatar(current_player, phase_type)
+        start_time = time.perf_counter()
+        to_execute = yield current_player, phase_type
+        self.__record_latency(current_player, time.perf_counter() - start_time)
         if phase_type == MOVING and to_execute == ():
-            self.__current_game_state.skip_turn(current_player.get_player_id())
+            # a player can only skip its turn when it cannot move
+            if self.__current_game_state.skip_turn(current_player.get_player_id()):
+                self.__player_seq.append(current_player)
+            else:
+                self.__remove_player(current_player)
         else:
-            if self.__invalid_structure(to_execute, exp_structure_type) or self.__is_illegal(to_execute, phase_type):
+            if self.__invalid_structure(to_execute, exp_structure_type) or \
+                    self.__is_illegal(current_player.get_player_id(), to_execute, phase_type):
                 self.__remove_player(current_player)
             else:
                 self.__current_game_state.place_avatar(current_player.get_player_id(), to_execute) \
@@ -141,25 +202,73 @@ class Referee:
                 self.__player_seq.append(current_player)
 
     def __place_or_move_avatar(self, current_player, phase_type):
-        return current_player.place_avatar(self.__current_game_state) if phase_type == PLACEMENT \
-            else current_player.move_avatar(self.__current_game_state)
+        player_method = current_player.place_avatar if phase_type == PLACEMENT else current_player.move_avatar
+        if self.__timeout is None:
+            return player_method(self.__current_game_state)
+
+        # a List holding the answer of the Player once it gives one, it stays empty if the Player raises
+        answer = []
+        game_state_copy = copy.deepcopy(self.__current_game_state)
+
+        def call_player():
+            try:
+                answer.append(player_method(game_state_copy))
+            except Exception:
+                pass
+
+        worker = threading.Thread(target=call_player, daemon=True)
+        worker.start()
+        worker.join(self.__timeout)
+        return answer[0] if answer else None
+
+    def __record_latency(self, player, latency):
+        latency_histogram = self.__latency_histograms.setdefault(player.get_player_id(),
+                                                                 [0] * (len(LATENCY_BUCKETS) + 1))
+        bucket = 0
+        while bucket < len(LATENCY_BUCKETS) and latency > LATENCY_BUCKETS[bucket]:
+            bucket += 1
+        latency_histogram[bucket] += 1
 
     @staticmethod
     def __invalid_structure(structure, exp_structure_type):
         return not isinstance(structure, exp_structure_type) or len(structure) != 2
 
-    def __is_illegal(self, to_execute, phase_type):
-        return self.__is_illegal_placement(to_execute) if phase_type == PLACEMENT else self.__is_illegal_action(to_execute)
+    def __is_illegal(self, player_id, to_execute, phase_type):
+        return self.__is_illegal_placement(to_execute) if phase_type == PLACEMENT else \
+            self.__is_illegal_action(player_id, to_execute)
 
     def __is_illegal_placement(self, placement):
         return self.__current_game_state.is_pos_out_of_bounds(placement) or \
                not self.__current_game_state.is_unoccupied(placement) or \
                self.__current_game_state.is_hole(placement)
 
-    def __is_illegal_action(self, action):
-        game_tree = GameTree(self.__current_game_state)
-        game_tree.next_layer()
-        return action not in game_tree.get_map_action_to_child_nodes()
+    def __is_illegal_action(self, player_id, action):
+        return not self.__current_game_state.is_legal_action(player_id, action)
+
+    def __is_decided(self):
+        # whether one Player has more fish than any other Player could still end up with
+        game_state = self.__current_game_state
+        board = game_state.get_board()
+        scores = game_state.get_player_fish_count()
+        occupancy = game_state.get_occupancy()
+        penguin_mobility = game_state.get_penguin_mobility()
+        free_mask = board.get_live_mask() & ~game_state.get_occupied_mask()
+
+        max_scores = dict(scores)
+        for region in board.get_regions():
+            moving_cells = [cell for cell, mobility in penguin_mobility.items() if mobility and region >> cell & 1]
+            if not moving_cells:
+                continue
+            region_free_mask = region & free_mask
+            region_fish = sum(board.get_fish_count(board.get_posn(cell))
+                              for cell in range(board.get_rows() * board.get_columns()) if region_free_mask >> cell & 1)
+            for player_id in {occupancy[cell] for cell in moving_cells}:
+                max_scores[player_id] += region_fish
+            for cell in moving_cells:
+                max_scores[occupancy[cell]] += board.get_fish_count(board.get_posn(cell))
+
+        leader = max(scores, key=scores.get)
+        return all(max_scores[player_id] < scores[leader] for player_id in scores if player_id != leader)
 
     def __remove_player(self, player):
         self.__current_game_state.remove_player(player.get_player_id())
@@ -190,3 +299,15 @@ class Referee:
 
     def get_bad_players(self):
         return self.__bad_players
+
+    def get_timeout(self):
+        return self.__timeout
+
+    def get_latency_histograms(self):
+        return self.__latency_histograms
+
+    def get_adjudicate(self):
+        return self.__adjudicate
+
+    def is_adjudicated(self):
+        return self.__adjudicated
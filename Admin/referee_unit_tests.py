@@ -1,8 +1,11 @@
 import unittest
 import sys
-from referee import Referee
+import time
+import random
+from referee import Referee, LATENCY_BUCKETS
 sys.path.append('../Common')
 from board import Board
+from tile_fish_penguin_constants import MAX_FISH
 sys.path.append('../Player')
 from player import Player
 
@@ -33,6 +36,90 @@ class TestReferee(unittest.TestCase):
         referee = Referee(player_seq, test_board=board)
         assert referee.run_game() == {'won': [player1, player2], 'lost': [], 'cheated/failed': []}
 
+    def test_run_game_skip_turn(self):
+        # tests that a player who skips its turn while it can still move is eliminated
+        class SkippingPlayer(Player):
+            def move_avatar(self, current_game_state):
+                return ()
+
+        board = Board(2, 5, {}, num_of_fish_per_tile=2)
+        player1 = SkippingPlayer(1)
+        player2 = Player(2)
+        player_seq = [player1, player2]
+        referee = Referee(player_seq, test_board=board)
+        assert referee.run_game() == {'won': [player2], 'lost': [], 'cheated/failed': [player1]}
+
+    def test_run_game_timeout(self):
+        # tests that a player who takes longer than the timeout, or raises, is eliminated, and that every answer is in
+        # the latency histogram of its player
+        class SlowPlayer(Player):
+            def move_avatar(self, current_game_state):
+                time.sleep(10)
+                return super().move_avatar(current_game_state)
+
+        class FailingPlayer(Player):
+            def move_avatar(self, current_game_state):
+                raise ConnectionError('The player disconnected')
+
+        with self.assertRaises(ValueError):
+            Referee([Player(1), Player(2)], 2, 5, timeout=0)
+
+        for bad_player in (SlowPlayer(1), FailingPlayer(1)):
+            board = Board(2, 5, {}, num_of_fish_per_tile=2)
+            player2 = Player(2)
+            referee = Referee([bad_player, player2], test_board=board, timeout=0.1)
+            assert referee.get_timeout() == 0.1
+            assert referee.run_game() == {'won': [player2], 'lost': [], 'cheated/failed': [bad_player]}
+            latency_histograms = referee.get_latency_histograms()
+            assert len(latency_histograms[1]) == len(LATENCY_BUCKETS) + 1
+            # 4 placements and 1 move, the one that timed out or raised
+            assert sum(latency_histograms[1]) == 5
+            assert sum(latency_histograms[2]) >= 4
+
+        # without a timeout, the exception of a player propagates, like with an AsyncReferee
+        board = Board(2, 5, {}, num_of_fish_per_tile=2)
+        referee = Referee([FailingPlayer(1), Player(2)], test_board=board)
+        with self.assertRaises(ConnectionError):
+            referee.run_game()
+
+    def test_run_game_random_boards(self):
+        # tests that every kind of random board the Referee creates can be played on, including the ones with the same
+        # number of fish on every tile
+        nums_of_fish_per_tile = set()
+        for seed in range(50):
+            random.seed(seed)
+            referee = Referee([Player(1), Player(2)], 3, 4)
+            referee.run_game()
+            nums_of_fish_per_tile.add(referee.get_current_game_state().get_board().get_num_of_fish_per_tile())
+        nums_of_fish_per_tile.discard(None)
+        assert nums_of_fish_per_tile
+        assert all(1 <= num_of_fish_per_tile <= MAX_FISH for num_of_fish_per_tile in nums_of_fish_per_tile)
+
+    def test_run_game_adjudicate(self):
+        # tests that a game that is ended as soon as its winner is known has the outcome of the whole game
+        outcomes = []
+        num_of_answers = []
+        for adjudicate in (False, True):
+            random.seed(5)
+            player1 = Player(1)
+            player2 = Player(2)
+            referee = Referee([player1, player2], 3, 5, adjudicate=adjudicate)
+            outcome = referee.run_game()
+            outcomes.append({key: [player.get_player_id() for player in players] for key, players in outcome.items()})
+            num_of_answers.append(sum(sum(histogram) for histogram in referee.get_latency_histograms().values()))
+            assert referee.get_adjudicate() == adjudicate
+            assert referee.is_adjudicated() == adjudicate
+        assert outcomes[0] == outcomes[1] == {'won': [1], 'lost': [2], 'cheated/failed': []}
+        assert num_of_answers[1] < num_of_answers[0]
+
+        # a game whose winner is only known at the end is played to the end
+        board = Board(2, 5, {}, num_of_fish_per_tile=2)
+        player1 = Player(1)
+        player2 = Player(2)
+        referee = Referee([player1, player2], test_board=board, adjudicate=True)
+        assert referee.run_game() == {'won': [player1], 'lost': [player2], 'cheated/failed': []}
+        assert not referee.is_adjudicated()
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
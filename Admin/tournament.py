@@ -0,0 +1,177 @@
+import sys
+sys.path.append('../Common')
+sys.path.append('../Player')
+from referee import Referee
+from player import Player
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from itertools import permutations
+import random
+import time
+
+# the keys of a Standing, in addition to "games" (see below)
+OUTCOME_KEYS = ["won", "lost", "cheated/failed"]
+
+"""
+A PlayerConfig is a tuple of the form (name, player_kwargs), where name is a String that is unique in the tournament and
+player_kwargs is a Dictionary of keyword arguments for Player (see player.py), other than player_id, for example
+{"search": "mcts", "time_budget": 0.5}. The Players themselves are never sent to another process: every game builds new
+ones from their PlayerConfigs in the process it runs in, so player_kwargs must only hold plain data (no executor).
+
+A BoardSpec is a tuple of the form (rows, columns), where rows and columns are both ints. The Referee of a game creates
+a random board of that size (see referee.py).
+
+A Game is a tuple of the form (game_index, seed, rows, columns, lineup), where game_index and seed are ints, and lineup
+is a tuple of PlayerConfigs, in playing order. seed seeds the random module of the process the game runs in, and the
+seed of each Player is drawn from it unless its player_kwargs has one (see player.py), so a Game whose Players have no
+time_budget always plays out the same way, whichever process it runs in. How far a Player with a time_budget searches
+depends on how busy the machine is, so its games can play out differently.
+
+A NamedOutcome is a Dictionary of the form {"won": [name], "lost": [name], "cheated/failed": [name]}, an Outcome (see
+referee.py) with the names of the PlayerConfigs of the Players instead of the Players.
+
+A Standing is a Dictionary of the form {"games": int, "won": int, "lost": int, "cheated/failed": int}, how many games a
+PlayerConfig played and how many times it was in each part of the NamedOutcomes of those games.
+
+A Tournament is an object that plays a batch of Fish games in a pool of processes, each game run by its own Referee,
+and adds up their NamedOutcomes into the Standings of the PlayerConfigs. On every BoardSpec, every ordered lineup of
+players_per_game different PlayerConfigs plays rounds games, so every PlayerConfig plays from every seat against every
+other one.
+
+A game that raises an exception is recorded as crashed, with the exception, and the tournament goes on. If a process of
+the pool dies instead, the pool breaks and every game still in it fails, so those games are played again one by one,
+each in a new process, and only the ones that kill that process too are recorded as crashed. Crashed games do not count
+in the Standings.
+
+A Tournament can have its games adjudicated (see referee.py), so that every game ends as soon as its winner is known,
+which only changes the Standings if a Player would have failed or cheated in the part of a game that was cut off.
+"""
+
+
+def run_tournament_game(game, adjudicate=False):
+    """
+    Plays the Game in this process and returns a tuple of the form (game_index, NamedOutcome). If adjudicate is True,
+    the Referee ends the game as soon as its winner is known (see referee.py). The same Game always has the same
+    NamedOutcome, unless one of its Players has a time_budget.
+    """
+    game_index, seed, rows, columns, lineup = game
+    random.seed(seed)
+    players = [Player(seat + 1, **dict({"seed": random.getrandbits(32)}, **player_kwargs))
+               for seat, (_name, player_kwargs) in enumerate(lineup)]
+    names = {player.get_player_id(): name for player, (name, _player_kwargs) in zip(players, lineup)}
+    outcome = Referee(players, rows, columns, adjudicate=adjudicate).run_game()
+    return game_index, {key: [names[player.get_player_id()] for player in outcome[key]] for key in OUTCOME_KEYS}
+
+
+class Tournament:
+
+    def __init__(self, player_configs, board_specs, players_per_game=2, rounds=1, max_workers=None, seed=None,
+                 adjudicate=False):
+        names = [name for name, _player_kwargs in player_configs]
+        if len(set(names)) != len(names):
+            raise ValueError('Player config names must be unique')
+        if not 2 <= players_per_game <= min(4, len(player_configs)):
+            raise ValueError('Players per game must be 2 <= x <= 4, and at most the number of player configs')
+        if rounds < 1:
+            raise ValueError('Rounds must be >= 1')
+        if max_workers is not None and max_workers < 1:
+            raise ValueError('Max workers must be >= 1')
+
+        # a List of PlayerConfigs
+        self.__player_configs = player_configs
+        # a List of BoardSpecs
+        self.__board_specs = board_specs
+        # an int
+        self.__players_per_game = players_per_game
+        # an int, how many times every lineup plays on every BoardSpec
+        self.__rounds = rounds
+        # an int, or None for as many processes as the machine has cores
+        self.__max_workers = max_workers
+        # whether the Referees of the games adjudicate
+        self.__adjudicate = adjudicate
+        # a List of Games, in the order they are scheduled
+        self.__games = self.__schedule_games(seed)
+        # a Dictionary of the form {game_index: NamedOutcome} of the games that were played to the end
+        self.__outcomes = {}
+        # a Dictionary of the form {game_index: exception} of the crashed games
+        self.__crashed_games = {}
+        # a float, how many games were played to the end per second of the last run
+        self.__games_per_second = 0.0
+
+    def __schedule_games(self, seed):
+        rng = random.Random(seed)
+        games = []
+        for rows, columns in self.__board_specs:
+            for _round in range(self.__rounds):
+                for lineup in permutations(self.__player_configs, self.__players_per_game):
+                    games.append((len(games), rng.getrandbits(32), rows, columns, tuple(lineup)))
+        return games
+
+    def run(self):
+        """
+        Plays every scheduled game and returns the Standings, a Dictionary of the form {name: Standing}.
+        """
+        self.__outcomes = {}
+        self.__crashed_games = {}
+        start_time = time.perf_counter()
+
+        with ProcessPoolExecutor(max_workers=self.__max_workers) as executor:
+            broken_games = self.__play_games(executor, self.__games)
+        # each game that was running when the pool broke is played again on its own, so a game that kills its
+        # process cannot take the other ones down with it again
+        for game in broken_games:
+            with ProcessPoolExecutor(max_workers=1) as executor:
+                for broken_game in self.__play_games(executor, [game]):
+                    self.__crashed_games[broken_game[0]] = BrokenProcessPool('The game killed its process')
+
+        elapsed = time.perf_counter() - start_time
+        self.__games_per_second = len(self.__outcomes) / elapsed if elapsed > 0 else 0.0
+        return self.get_standings()
+
+    def __play_games(self, executor, games):
+        # plays the games in the executor, recording their outcomes and crashes, and returns the ones that could not be
+        # played because the pool broke
+        broken_games = []
+        futures = {executor.submit(run_tournament_game, game, self.__adjudicate): game for game in games}
+        for future in as_completed(futures):
+            game = futures[future]
+            try:
+                game_index, outcome = future.result()
+                self.__outcomes[game_index] = outcome
+            except BrokenProcessPool:
+                broken_games.append(game)
+            except Exception as error:
+                self.__crashed_games[game[0]] = error
+        return sorted(broken_games)
+
+    def get_standings(self):
+        standings = {name: dict({"games": 0}, **{key: 0 for key in OUTCOME_KEYS})
+                     for name, _player_kwargs in self.__player_configs}
+        for game_index, outcome in self.__outcomes.items():
+            for name, _player_kwargs in self.__games[game_index][4]:
+                standings[name]["games"] += 1
+            for key in OUTCOME_KEYS:
+                for name in outcome[key]:
+                    standings[name][key] += 1
+        return standings
+
+    def get_player_configs(self):
+        return self.__player_configs
+
+    def get_board_specs(self):
+        return self.__board_specs
+
+    def get_adjudicate(self):
+        return self.__adjudicate
+
+    def get_games(self):
+        return self.__games
+
+    def get_outcomes(self):
+        return self.__outcomes
+
+    def get_crashed_games(self):
+        return self.__crashed_games
+
+    def get_games_per_second(self):
+        return self.__games_per_second
@@ -0,0 +1,71 @@
+import unittest
+from tournament import Tournament, run_tournament_game
+
+
+class TestTournament(unittest.TestCase):
+
+    def test_invalid_input(self):
+        player_configs = [("a", {}), ("b", {})]
+        with self.assertRaises(ValueError):
+            Tournament([("a", {}), ("a", {})], [(3, 4)])
+        with self.assertRaises(ValueError):
+            Tournament(player_configs, [(3, 4)], players_per_game=3)
+        with self.assertRaises(ValueError):
+            Tournament(player_configs, [(3, 4)], rounds=0)
+        with self.assertRaises(ValueError):
+            Tournament(player_configs, [(3, 4)], max_workers=0)
+
+    def test_schedule(self):
+        # tests that every ordered lineup plays rounds games on every board, with its own seed
+        tournament = Tournament([("a", {}), ("b", {}), ("c", {})], [(3, 4), (2, 5)], rounds=2, seed=7)
+        games = tournament.get_games()
+        assert len(games) == 2 * 2 * 6
+        assert [game[0] for game in games] == list(range(len(games)))
+        assert [game[1] for game in games] == [game[1] for game in Tournament([("a", {}), ("b", {}), ("c", {})],
+                                                                             [(3, 4), (2, 5)], rounds=2,
+                                                                             seed=7).get_games()]
+        assert [(game[2], game[3]) for game in games[:12]] == [(3, 4)] * 12
+        assert [tuple(name for name, _kwargs in game[4]) for game in games[:6]] == \
+               [("a", "b"), ("a", "c"), ("b", "a"), ("b", "c"), ("c", "a"), ("c", "b")]
+
+    def test_run(self):
+        # tests that the standings add up the outcomes of every game, and that a game plays out the same way in any
+        # process
+        tournament = Tournament([("minimax", {}), ("mcts", {"search": "mcts"})], [(3, 4)], rounds=2,
+                                max_workers=2, seed=1)
+        standings = tournament.run()
+        assert tournament.get_crashed_games() == {}
+        assert len(tournament.get_outcomes()) == 4
+        assert tournament.get_games_per_second() > 0
+        for name in ("minimax", "mcts"):
+            standing = standings[name]
+            assert standing["games"] == 4
+            assert standing["won"] + standing["lost"] + standing["cheated/failed"] == 4
+        for game in tournament.get_games():
+            assert run_tournament_game(game) == (game[0], tournament.get_outcomes()[game[0]])
+
+    def test_run_seeded_mcts(self):
+        # tests that a game between players who search with MCTS plays out the same way, since their seeds are drawn
+        # from the seed of the game
+        game = (0, 12, 4, 5, (("a", {"search": "mcts"}), ("b", {"search": "mcts"}), ("c", {"search": "mcts"})))
+        assert run_tournament_game(game) == run_tournament_game(game) == run_tournament_game(game)
+
+    def test_run_adjudicate(self):
+        # tests that games ended as soon as their winners are known add up to the same standings
+        player_configs = [("a", {}), ("b", {})]
+        tournament = Tournament(player_configs, [(3, 5)], rounds=2, max_workers=2, seed=3, adjudicate=True)
+        assert tournament.get_adjudicate()
+        assert tournament.run() == Tournament(player_configs, [(3, 5)], rounds=2, max_workers=2, seed=3).run()
+
+    def test_run_crashed_game(self):
+        # tests that a game that raises is recorded as crashed and does not count in the standings
+        tournament = Tournament([("good", {}), ("bad", {"search": "hello"})], [(3, 4)], max_workers=2, seed=1)
+        standings = tournament.run()
+        assert sorted(tournament.get_crashed_games()) == [0, 1]
+        assert all(isinstance(error, ValueError) for error in tournament.get_crashed_games().values())
+        assert standings == {"good": {"games": 0, "won": 0, "lost": 0, "cheated/failed": 0},
+                             "bad": {"games": 0, "won": 0, "lost": 0, "cheated/failed": 0}}
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,231 @@
+import copy
+from board import Board
+from tile import __Tile as tile_inst
+from zobrist import get_zobrist_table
+from regions import RegionMap
+
+"""
+A BitBoard is an alternative storage backend for a Board. It exposes the same public methods as a Board (see board.py
+for the data definition and the coordinate system), so a GameState can run on either one, but it does not keep a 2D
+array of Tile objects. Instead:
+
+- every position [row, col] is given a cell index, which is the int row * columns + col,
+- the live (visible) tiles are one arbitrary-precision int, where bit i is set if the tile at cell i is not a hole,
+- the fish on each tile are packed in a bytearray indexed by cell.
+
+A BitBoard is built from a Board, so it goes through exactly the same error checking and fish generation. The number
+of fish on a tile never changes during a game, so copies of a BitBoard share the fish array and only the live tile int
+differs between them, which makes copying a BitBoard (and therefore a GameState that is on a BitBoard) cheap. Like a
+Board, a BitBoard keeps the Regions of its live tiles (see regions.py).
+"""
+
+
+class BitBoard:
+
+    def __init__(self, rows, columns, holes, min_num_one_fish_tiles=0, num_of_fish_per_tile=None):
+        self.__pack(Board(rows, columns, holes, min_num_one_fish_tiles, num_of_fish_per_tile))
+
+    @staticmethod
+    def from_board(board):
+        bit_board = BitBoard.__new__(BitBoard)
+        bit_board.__pack(board)
+        return bit_board
+
+    @staticmethod
+    def from_fish_counts(rows, columns, fish_counts, live_mask):
+        """
+        Builds a BitBoard directly from its packed form, see get_fish_counts and get_live_mask.
+        """
+        if len(fish_counts) != rows * columns:
+            raise ValueError('There must be a fish count for every tile')
+
+        bit_board = BitBoard(rows, columns, {}, num_of_fish_per_tile=1)
+        bit_board.__num_of_fish_per_tile = None
+        bit_board.__fish = bytearray(fish_counts)
+        return bit_board.copy_with_live_mask(live_mask)
+
+    def __pack(self, board):
+        self.__rows = board.get_rows()
+        self.__columns = board.get_columns()
+        self.__min_num_one_fish_tiles = board.get_min_num_one_fish_tiles()
+        self.__num_of_fish_per_tile = board.get_num_of_fish_per_tile()
+
+        # an int, bit i is set if the tile at cell i is visible
+        self.__live = 0
+        # a bytearray of length rows * columns, the number of fish on the tile at cell i
+        self.__fish = bytearray(self.__rows * self.__columns)
+
+        for i, tiles_per_column in enumerate(board.get_tiles()):
+            for j, tile in enumerate(tiles_per_column):
+                cell = i * self.__columns + j
+                self.__fish[cell] = tile.get_num_fish_per_tile()
+                if tile.get_visibility():
+                    self.__live |= 1 << cell
+
+        # the cell posns, the rays and the NeighborTable of the board (see board.py), shared with the board this was
+        # built from
+        self.__cell_posns = board.get_cell_posns()
+        self.__rays = board.get_rays()
+        self.__neighbor_table = board.get_neighbor_table()
+        self.__region_map = RegionMap(self.__neighbor_table, self.__live)
+
+        # see Board.get_hash
+        self.__zobrist = get_zobrist_table(self.__rows, self.__columns)
+        self.__hash = board.get_hash()
+
+    def __deepcopy__(self, memo):
+        # the fish array and the rays never change, so they are shared with the copy
+        bit_board_copy = BitBoard.__new__(BitBoard)
+        bit_board_copy.__dict__.update(self.__dict__)
+        memo[id(self)] = bit_board_copy
+        bit_board_copy.__region_map = copy.deepcopy(self.__region_map, memo)
+        return bit_board_copy
+
+    def copy_with_live_mask(self, live_mask):
+        bit_board_copy = copy.deepcopy(self)
+        bit_board_copy.__live = live_mask
+        bit_board_copy.__region_map = RegionMap(self.__neighbor_table, live_mask)
+        for cell in range(self.__rows * self.__columns):
+            if (self.__live ^ live_mask) >> cell & 1:
+                bit_board_copy.__hash ^= self.__zobrist.get_hole_key(cell)
+        return bit_board_copy
+
+    def __check_pos_out_of_bounds(self, posn):
+        pos_row = posn[0]
+        pos_col = posn[1]
+
+        if pos_row >= 0 and pos_col >= 0:
+            return pos_row >= self.__rows or pos_col >= self.__columns
+        return True
+
+    def get_cell(self, posn):
+        return posn[0] * self.__columns + posn[1]
+
+    def get_posn(self, cell):
+        return list(self.__cell_posns[cell])
+
+    def get_mask(self, lo_posns):
+        mask = 0
+        for posn in lo_posns:
+            if posn:
+                mask |= 1 << self.get_cell(posn)
+        return mask
+
+    def get_reachable_cells(self, start_cell, blocked_mask, recurse=True):
+        free_mask = self.__live & ~blocked_mask
+        reachable_cells = []
+        for ray in self.__rays[start_cell]:
+            for cell in ray:
+                if not free_mask >> cell & 1:
+                    break
+                reachable_cells.append(cell)
+                if not recurse:
+                    break
+        return reachable_cells
+
+    def get_reachable_posns(self, start_posn, lo_all_penguin_posns, recurse=True):
+        if self.__check_pos_out_of_bounds(start_posn):
+            raise ValueError('Row must be 1 <= x < self.rows, column must be 1 <=x < self.columns')
+
+        if self.is_hole(start_posn):
+            raise ValueError('Nowhere reachable from an empty tile')
+
+        reachable_cells = self.get_reachable_cells(self.get_cell(start_posn), self.get_mask(lo_all_penguin_posns),
+                                                   recurse)
+        return [self.get_posn(cell) for cell in reachable_cells]
+
+    def remove_tile(self, posn):
+        if self.__check_pos_out_of_bounds(posn):
+            raise ValueError('Row must be 1 <= x < self.rows, column must be 1 <=x < self.columns')
+
+        if self.is_hole(posn):
+            raise ValueError('Tile has already been removed')
+
+        self.remove_cell(self.get_cell(posn))
+
+    def remove_cell(self, cell):
+        # see Board.remove_cell
+        self.__live &= ~(1 << cell)
+        self.__hash ^= self.__zobrist.get_hole_key(cell)
+        self.__region_map.remove_cell(cell)
+
+    def restore_tile(self, posn):
+        if self.__check_pos_out_of_bounds(posn):
+            raise ValueError('Row must be 1 <= x < self.rows, column must be 1 <=x < self.columns')
+
+        if not self.is_hole(posn):
+            raise ValueError('Tile has not been removed')
+
+        self.restore_cell(self.get_cell(posn))
+
+    def restore_cell(self, cell):
+        # see Board.restore_cell
+        self.__live |= 1 << cell
+        self.__hash ^= self.__zobrist.get_hole_key(cell)
+        self.__region_map.restore_cell(cell)
+
+    def is_hole(self, posn):
+        return not self.__live >> self.get_cell(posn) & 1
+
+    def get_fish_count(self, posn):
+        return self.__fish[self.get_cell(posn)]
+
+    def get_cell_fish_count(self, cell):
+        return self.__fish[cell]
+
+    def get_rows(self):
+        return self.__rows
+
+    def get_columns(self):
+        return self.__columns
+
+    def get_holes(self):
+        holes = {}
+        for cell in range(self.__rows * self.__columns):
+            if not self.__live >> cell & 1:
+                holes.setdefault(cell // self.__columns, []).append(cell % self.__columns)
+        return holes
+
+    def get_min_num_one_fish_tiles(self):
+        return self.__min_num_one_fish_tiles
+
+    def get_num_of_fish_per_tile(self):
+        return self.__num_of_fish_per_tile
+
+    def get_tiles(self):
+        # A BitBoard does not store Tiles, so this is a snapshot of the board at this moment in the same format as
+        # Board.get_tiles. Changing the returned Tiles does not change the BitBoard.
+        tiles = []
+        for i in range(self.__rows):
+            tiles_per_column = []
+            for j in range(self.__columns):
+                tile = tile_inst(self.get_fish_count([i, j]))
+                if self.is_hole([i, j]):
+                    tile.set_invisible()
+                tiles_per_column.append(tile)
+            tiles.append(tiles_per_column)
+        return tiles
+
+    def get_live_mask(self):
+        return self.__live
+
+    def get_fish_counts(self):
+        return self.__fish
+
+    def get_cell_posns(self):
+        return self.__cell_posns
+
+    def get_rays(self):
+        return self.__rays
+
+    def get_neighbor_table(self):
+        return self.__neighbor_table
+
+    def get_regions(self):
+        return self.__region_map.get_regions()
+
+    def get_region(self, posn):
+        return self.__region_map.get_region(self.get_cell(posn))
+
+    def get_hash(self):
+        return self.__hash
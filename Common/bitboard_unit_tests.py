@@ -0,0 +1,95 @@
+import unittest
+import copy
+from bitboard import BitBoard
+from board import Board
+from state import GameState
+
+
+class TestBitBoard(unittest.TestCase):
+
+    def test_error_checking(self):
+        # tests that a BitBoard goes through the same error checking as a Board
+        with self.assertRaises(TypeError):
+            BitBoard('hello', 2, {})
+        with self.assertRaises(ValueError):
+            BitBoard(2, 0, {})
+
+    def test_from_board(self):
+        # tests that packing a Board keeps its holes and fish
+        board = Board(3, 2, {0: [0, 1], 1: [0]}, num_of_fish_per_tile=3)
+        bit_board = BitBoard.from_board(board)
+        assert bit_board.get_holes() == {0: [0, 1], 1: [0]}
+        assert bit_board.is_hole([0, 1])
+        assert not bit_board.is_hole([2, 1])
+        assert bit_board.get_fish_count([2, 1]) == 3
+        assert bit_board.get_live_mask() == 0b111000
+
+    def test_from_fish_counts(self):
+        # tests that a BitBoard can be rebuilt from its packed form, with the same hash
+        board = Board(3, 2, {0: [0, 1], 1: [0]}, num_of_fish_per_tile=3)
+        bit_board = BitBoard.from_board(board)
+        bit_board_copy = BitBoard.from_fish_counts(3, 2, bytes(bit_board.get_fish_counts()), bit_board.get_live_mask())
+        assert bit_board_copy.get_holes() == {0: [0, 1], 1: [0]}
+        assert bit_board_copy.get_fish_count([2, 1]) == 3
+        assert bit_board_copy.get_hash() == board.get_hash()
+        with self.assertRaises(ValueError):
+            BitBoard.from_fish_counts(3, 2, bytes(5), 0)
+
+    def test_get_reachable_posns(self):
+        # tests that a BitBoard reaches the same posns, in the same order, as a Board
+        bit_board = BitBoard(8, 3, {})
+        exp_reachable_posns = [[1, 0], [2, 1], [1, 1], [0, 2], [4, 1], [5, 1], [6, 2], [7, 2], [5, 0], [7, 0],
+                               [4, 0], [2, 0]]
+        assert bit_board.get_reachable_posns([3, 0], []) == exp_reachable_posns
+
+        bit_board = BitBoard(3, 3, {0: [2]})
+        assert bit_board.get_reachable_posns([2, 2], []) == [[1, 2], [1, 1], [0, 1]]
+        assert bit_board.get_reachable_posns([2, 2], [[1, 1]]) == [[1, 2]]
+        assert bit_board.get_reachable_posns([2, 2], [], recurse=False) == [[1, 2], [1, 1]]
+
+        with self.assertRaises(ValueError):
+            bit_board.get_reachable_posns([0, 2], [])
+
+    def test_remove_tile_and_copy(self):
+        # tests that removing a tile only affects the BitBoard it was removed from
+        bit_board = BitBoard(4, 3, {})
+        bit_board_copy = copy.deepcopy(bit_board)
+        bit_board.remove_tile([0, 0])
+        assert bit_board.is_hole([0, 0])
+        assert not bit_board_copy.is_hole([0, 0])
+        assert bit_board.get_fish_counts() is bit_board_copy.get_fish_counts()
+
+        with self.assertRaises(ValueError):
+            bit_board.remove_tile([0, 0])
+
+    def test_regions(self):
+        # tests that a BitBoard keeps the same regions as a Board, and that its copies keep their own
+        board = Board(4, 3, {})
+        bit_board = BitBoard.from_board(board)
+        for posn in ([0, 1], [1, 1], [2, 1]):
+            board.remove_tile(posn)
+            bit_board.remove_tile(posn)
+            assert sorted(bit_board.get_regions()) == sorted(board.get_regions())
+        bit_board_copy = copy.deepcopy(bit_board)
+        bit_board_copy.restore_tile([2, 1])
+        assert sorted(bit_board.get_regions()) == sorted(board.get_regions())
+        assert len(bit_board_copy.get_regions()) < len(bit_board.get_regions())
+        assert sorted(bit_board.copy_with_live_mask(bit_board_copy.get_live_mask()).get_regions()) == \
+               sorted(bit_board_copy.get_regions())
+
+    def test_game_state_on_bit_board(self):
+        # tests that a GameState plays the same on a BitBoard as on a Board
+        for board in [Board(4, 3, {}, num_of_fish_per_tile=3), BitBoard(4, 3, {}, num_of_fish_per_tile=3)]:
+            state = GameState(board, {1: "black", 2: "white"}, [1, 2])
+            assert state.place_avatar(1, [1, 0])
+            assert state.place_avatar(2, [2, 1])
+            assert not state.is_unoccupied([2, 1])
+            assert state.get_all_reachable_dests(1) == [[0, 1], [3, 0], [2, 0], [0, 0]]
+            assert state.move_avatar(1, [1, 0], [3, 0])
+            assert state.is_hole([1, 0])
+            assert state.player_has_penguin_at_pos(1, [3, 0])
+            assert state.get_player_score(1) == 3
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,5 +1,8 @@
 from tile import __Tile as tile_inst
 from tile_fish_penguin_constants import MAX_FISH
+from zobrist import get_zobrist_table
+from regions import RegionMap, get_neighbor_table
+import copy
 import random
 
 """
@@ -12,8 +15,20 @@ A board uses the coordinate system of [row, col], 0-indexed. So [0,0] represents
 board, [0,1] is the position directly to the right but in the same row as [0,0]. [1,0] is the position directly below 
 but in the same column as [0,0], and these values also correspond to the indexes in self.__tiles, which can be used to 
 find the corresponding tile at the position.
+
+Every position [row, col] also has a cell index, which is the int row * columns + col. A board precomputes, for every 
+cell, its six rays: the cells you pass through, in order, when moving in a straight line from that cell in each 
+direction until the edge of the board. The rays are in the order north, northeast, southeast, south, southwest, 
+northwest, and only depend on the board dimensions, so they are computed once when the board is created and shared 
+by its copies.
+
+A board also keeps the Regions of its live tiles (see regions.py), which remove_tile and restore_tile keep up to date.
 """
 
+# For every direction, in ray order, the (row shift, column shift on an even row, column shift on an odd row) of one
+# step in that direction
+DIRECTION_SHIFTS = [(-2, 0, 0), (-1, 0, 1), (1, 0, 1), (2, 0, 0), (1, -1, 0), (-1, -1, 0)]
+
 
 class Board:
     
@@ -44,6 +59,41 @@ class Board:
 
         self.__initialize_game_board()
 
+        # a List indexed by cell of (row, col) tuples, the position of each cell
+        self.__cell_posns = [(i, j) for i in range(rows) for j in range(columns)]
+
+        # a List indexed by cell, where each element is a tuple of six rays (see above), and each ray is a tuple of
+        # cell indexes
+        self.__rays = self.__compute_rays(rows, columns)
+        # the NeighborTable of the board (see regions.py), shared by its copies like the rays
+        self.__neighbor_table = get_neighbor_table(self.__rays)
+
+        # the ZobristTable of boards with these dimensions (see zobrist.py), and an int that is the XOR of the hole
+        # keys of every removed tile, updated by remove_tile and restore_tile
+        self.__zobrist = get_zobrist_table(rows, columns)
+        self.__hash = 0
+        # an int, bit i is set if the tile at cell i is visible, like for a BitBoard (see bitboard.py)
+        self.__live_mask = 0
+        for cell in range(rows * columns):
+            if self.is_hole(self.get_posn(cell)):
+                self.__hash ^= self.__zobrist.get_hole_key(cell)
+            else:
+                self.__live_mask |= 1 << cell
+
+        # a RegionMap of the live tiles (see regions.py)
+        self.__region_map = RegionMap(self.__neighbor_table, self.__live_mask)
+
+    def __deepcopy__(self, memo):
+        # the cell posns and the rays only depend on the board dimensions, so they are shared with the copy
+        board_copy = Board.__new__(Board)
+        memo[id(self)] = board_copy
+        for attr, val in self.__dict__.items():
+            if attr in ('_Board__cell_posns', '_Board__rays', '_Board__neighbor_table'):
+                board_copy.__dict__[attr] = val
+            else:
+                board_copy.__dict__[attr] = copy.deepcopy(val, memo)
+        return board_copy
+
     @staticmethod
     def __error_check_rows_and_columns(rows, columns):
         if not isinstance(rows, int) or not isinstance(columns, int):
@@ -118,36 +168,44 @@ class Board:
             return pos_row >= self.__rows or pos_col >= self.__columns
         return True
 
-    def __get_reachable_posns_help(self, start_posn, pos_acc, lo_all_penguin_posns, recurse, **kwargs):
-        tile_row = start_posn[0]
-        tile_column = start_posn[1]
-
-        even_row_shift = kwargs["even_row_shift"]
-        odd_row_shift = kwargs["odd_row_shift"]
-
-        even_col_shift = kwargs["even_col_shift"]
-        odd_col_shift = kwargs["odd_col_shift"]
-
-        new_row = tile_row + even_row_shift if tile_row % 2 == 0 else tile_row + odd_row_shift
-        new_col = tile_column + even_col_shift if tile_row % 2 == 0 else tile_column + odd_col_shift
-
-        new_posn = [new_row, new_col]
-
-        if self.__check_pos_out_of_bounds(new_posn):
-            return pos_acc
-
-        if self.__check_empty_tile(start_posn) or self.__check_empty_tile(new_posn):
-            return pos_acc
-
-        if new_posn in lo_all_penguin_posns:
-            return pos_acc
-
-        pos_acc.append(new_posn)
-
-        if recurse:
-            return self.__get_reachable_posns_help(new_posn, pos_acc, lo_all_penguin_posns, recurse, **kwargs)
-        else:
-            return pos_acc
+    @staticmethod
+    def __compute_rays(rows, columns):
+        rays = []
+        for i in range(rows):
+            for j in range(columns):
+                rays_per_cell = []
+                for row_shift, even_col_shift, odd_col_shift in DIRECTION_SHIFTS:
+                    ray = []
+                    ray_row = i
+                    ray_col = j
+                    while True:
+                        ray_col += even_col_shift if ray_row % 2 == 0 else odd_col_shift
+                        ray_row += row_shift
+                        if not (0 <= ray_row < rows and 0 <= ray_col < columns):
+                            break
+                        ray.append(ray_row * columns + ray_col)
+                    rays_per_cell.append(tuple(ray))
+                rays.append(tuple(rays_per_cell))
+        return rays
+
+    def get_reachable_cells(self, start_cell, blocked_cells, recurse=True):
+        """
+        Walks the precomputed rays out of start_cell, stopping each one at the first hole, the first cell in
+        blocked_cells (anything that supports `in` on cell indexes) or the edge of the board. Assumes start_cell is a
+        valid cell that is not a hole.
+        """
+        tiles = self.__tiles
+        cell_posns = self.__cell_posns
+        reachable_cells = []
+        for ray in self.__rays[start_cell]:
+            for cell in ray:
+                tile_row, tile_col = cell_posns[cell]
+                if cell in blocked_cells or not tiles[tile_row][tile_col].get_visibility():
+                    break
+                reachable_cells.append(cell)
+                if not recurse:
+                    break
+        return reachable_cells
 
     def get_reachable_posns(self, start_posn, lo_all_penguin_posns, recurse=True):
         if self.__check_pos_out_of_bounds(start_posn):
@@ -156,50 +214,9 @@ class Board:
         if self.__check_empty_tile(start_posn):
             raise ValueError('Nowhere reachable from an empty tile')
 
-        reachable_posns = []
-
-        # north
-        reachable_posns.extend(self.__get_reachable_posns_help(start_posn, [],
-                                                                       lo_all_penguin_posns,
-                                                                       recurse,
-                                                                       even_row_shift=-2, odd_row_shift=-2,
-                                                                       even_col_shift=0, odd_col_shift=0))
-
-        # northeast
-        reachable_posns.extend(self.__get_reachable_posns_help(start_posn, [],
-                                                                       lo_all_penguin_posns,
-                                                                       recurse,
-                                                                       even_row_shift=-1, odd_row_shift=-1,
-                                                                       even_col_shift=0, odd_col_shift=1))
-
-        # southeast
-        reachable_posns.extend(self.__get_reachable_posns_help(start_posn, [],
-                                                                       lo_all_penguin_posns,
-                                                                       recurse,
-                                                                       even_row_shift=1, odd_row_shift=1,
-                                                                       even_col_shift=0, odd_col_shift=1))
-        # south
-        reachable_posns.extend(self.__get_reachable_posns_help(start_posn, [],
-                                                                       lo_all_penguin_posns,
-                                                                       recurse,
-                                                                       even_row_shift=2, odd_row_shift=2,
-                                                                       even_col_shift=0, odd_col_shift=0))
-
-        # southwest
-        reachable_posns.extend(self.__get_reachable_posns_help(start_posn, [],
-                                                                       lo_all_penguin_posns,
-                                                                       recurse,
-                                                                       even_row_shift=1, odd_row_shift=1,
-                                                                       even_col_shift=-1, odd_col_shift=0))
-
-        # northwest
-        reachable_posns.extend(self.__get_reachable_posns_help(start_posn, [],
-                                                                       lo_all_penguin_posns,
-                                                                       recurse,
-                                                                       even_row_shift=-1, odd_row_shift=-1,
-                                                                       even_col_shift=-1, odd_col_shift=0))
-
-        return reachable_posns
+        blocked_cells = {self.get_cell(posn) for posn in lo_all_penguin_posns if posn}
+        reachable_cells = self.get_reachable_cells(self.get_cell(start_posn), blocked_cells, recurse)
+        return [self.get_posn(cell) for cell in reachable_cells]
 
     def remove_tile(self, posn):
         if self.__check_pos_out_of_bounds(posn):
@@ -208,17 +225,64 @@ class Board:
         if self.__check_empty_tile(posn):
             raise ValueError('Tile has already been removed')
 
-        tile_row = posn[0]
-        tile_column = posn[1]
+        self.remove_cell(self.get_cell(posn))
 
-        tile_to_change = self.__tiles[tile_row][tile_column]
-        tile_to_change.set_invisible()
+    def remove_cell(self, cell):
+        """
+        Same as remove_tile, for the tile at cell, which must be a live tile of the board. Used by GameState, which
+        works on cells.
+        """
+        tile_row, tile_column = self.__cell_posns[cell]
+        self.__tiles[tile_row][tile_column].set_invisible()
+        self.__hash ^= self.__zobrist.get_hole_key(cell)
+        self.__live_mask &= ~(1 << cell)
+        self.__region_map.remove_cell(cell)
 
         if tile_row in self.__holes:
             self.__holes[tile_row].append(tile_column)
         else:
             self.__holes[tile_row] = [tile_column]
 
+    def restore_tile(self, posn):
+        # the inverse of remove_tile, used to take back a move
+        if self.__check_pos_out_of_bounds(posn):
+            raise ValueError('Row must be 1 <= x < self.rows, column must be 1 <=x < self.columns')
+
+        if not self.__check_empty_tile(posn):
+            raise ValueError('Tile has not been removed')
+
+        self.restore_cell(self.get_cell(posn))
+
+    def restore_cell(self, cell):
+        """
+        Same as restore_tile, for the tile at cell, which must be a hole of the board.
+        """
+        tile_row, tile_column = self.__cell_posns[cell]
+        self.__tiles[tile_row][tile_column].set_visible()
+        self.__hash ^= self.__zobrist.get_hole_key(cell)
+        self.__live_mask |= 1 << cell
+        self.__region_map.restore_cell(cell)
+
+        self.__holes[tile_row].remove(tile_column)
+        if not self.__holes[tile_row]:
+            self.__holes.pop(tile_row)
+
+    def get_cell(self, posn):
+        return posn[0] * self.__columns + posn[1]
+
+    def get_posn(self, cell):
+        return list(self.__cell_posns[cell])
+
+    def is_hole(self, posn):
+        return self.__check_empty_tile(posn)
+
+    def get_fish_count(self, posn):
+        return self.__tiles[posn[0]][posn[1]].get_num_fish_per_tile()
+
+    def get_cell_fish_count(self, cell):
+        tile_row, tile_column = self.__cell_posns[cell]
+        return self.__tiles[tile_row][tile_column].get_num_fish_per_tile()
+
     def get_rows(self):
         return self.__rows
 
@@ -236,3 +300,24 @@ class Board:
 
     def get_tiles(self):
         return self.__tiles
+
+    def get_cell_posns(self):
+        return self.__cell_posns
+
+    def get_rays(self):
+        return self.__rays
+
+    def get_neighbor_table(self):
+        return self.__neighbor_table
+
+    def get_live_mask(self):
+        return self.__live_mask
+
+    def get_regions(self):
+        return self.__region_map.get_regions()
+
+    def get_region(self, posn):
+        return self.__region_map.get_region(self.get_cell(posn))
+
+    def get_hash(self):
+        return self.__hash
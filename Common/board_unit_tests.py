@@ -1,6 +1,9 @@
 import unittest
+import copy
+import random
 from board import Board
 from tile_fish_penguin_constants import MAX_FISH
+from regions import RegionMap
 
 
 class TestBoard(unittest.TestCase):
@@ -157,6 +160,16 @@ class TestBoard(unittest.TestCase):
         actual_reachable_posns = board.get_reachable_posns([2, 2], [])
         assert exp_reachable_posns == actual_reachable_posns
 
+    def test_get_rays(self):
+        # tests the precomputed rays of a cell, in north, northeast, southeast, south, southwest, northwest order
+        board = Board(4, 3, {})
+        assert board.get_rays()[board.get_cell([1, 0])] == ((), (1,), (7, 10), (9,), (6,), (0,))
+
+    def test_get_reachable_posns_long_ray(self):
+        # tests that a ray longer than the recursion limit can be walked
+        board = Board(2010, 1, {})
+        assert len(board.get_reachable_posns([0, 0], [])) == 1005
+
     def test_remove_tile_out_of_bounds(self):
         # tests that a non-existent tile cannot be removed (out of bounds)
         with self.assertRaises(ValueError):
@@ -179,6 +192,61 @@ class TestBoard(unittest.TestCase):
         board.remove_tile([0,0])
         assert not tile.get_visibility()
 
+    def test_remove_and_restore_cell(self):
+        # tests that removing and restoring a tile by its cell is the same as by its posn
+        board = Board(4, 3, {}, num_of_fish_per_tile=2)
+        assert board.get_cell_posns()[7] == (2, 1)
+        assert board.get_cell_fish_count(7) == 2
+        board_copy = copy.deepcopy(board)
+        board.remove_cell(7)
+        board_copy.remove_tile([2, 1])
+        assert board.is_hole([2, 1])
+        assert board.get_live_mask() == board_copy.get_live_mask()
+        assert board.get_hash() == board_copy.get_hash()
+        board.restore_cell(7)
+        assert not board.is_hole([2, 1])
+        assert board.get_regions() == [0b111111111111]
+
+    def test_get_neighbor_table(self):
+        # tests that the neighbors of a cell go around it: two neighbors that follow each other are next to each other
+        board = Board(5, 4, {})
+        neighbor_table = board.get_neighbor_table()
+        assert neighbor_table[board.get_cell([1, 0])] == (-1, 1, 9, 12, 8, 0)
+        for neighbors in neighbor_table:
+            for d in range(6):
+                if neighbors[d] >= 0 and neighbors[d - 1] >= 0:
+                    assert neighbors[d - 1] in neighbor_table[neighbors[d]]
+
+    def test_regions(self):
+        # tests that removing a tile can split a region, and restoring it merges the regions back
+        board = Board(2, 3, {})
+        assert board.get_regions() == [0b111111]
+        board.remove_tile([0, 1])
+        assert sorted(board.get_regions()) == [0b1001, 0b110100]
+        assert board.get_region([1, 2]) == 0b110100
+        assert board.get_region([0, 1]) == 0
+        assert board.get_live_mask() == 0b111101
+        board_copy = copy.deepcopy(board)
+        board.restore_tile([0, 1])
+        assert board.get_regions() == [0b111111]
+        assert sorted(board_copy.get_regions()) == [0b1001, 0b110100]
+
+    def test_regions_random(self):
+        # tests that the regions kept up to date through removals and restorations are the ones computed from scratch
+        rng = random.Random(5)
+        board = Board(6, 5, {})
+        removed_posns = []
+        for _i in range(200):
+            if removed_posns and (rng.random() < 0.4 or len(removed_posns) == 30):
+                board.restore_tile(removed_posns.pop(rng.randrange(len(removed_posns))))
+            else:
+                posn = [rng.randrange(6), rng.randrange(5)]
+                if posn not in removed_posns:
+                    board.remove_tile(posn)
+                    removed_posns.append(posn)
+            regions = RegionMap(board.get_neighbor_table(), board.get_live_mask()).get_regions()
+            assert sorted(board.get_regions()) == sorted(regions)
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -1,6 +1,10 @@
 import unittest
+import copy
+import random
 from state import GameState
 from board import Board
+from bitboard import BitBoard
+from tile import __Tile as tile_inst
 
 
 class TestGameState(unittest.TestCase):
@@ -44,6 +48,34 @@ class TestGameState(unittest.TestCase):
         state.place_avatar(1, [0, 0])
         assert not state.is_unoccupied([0, 0])
 
+    def test_occupancy(self):
+        # tests that the occupancy index follows placing, moving and removing penguins
+        board = Board(4, 3, {}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2])
+        assert state.place_avatar(1, [1, 0])
+        assert state.place_avatar(2, [2, 1])
+        assert state.get_occupancy() == {3: 1, 7: 2}
+
+        assert state.move_avatar(1, [1, 0], [3, 0])
+        assert state.get_occupancy() == {9: 1, 7: 2}
+        assert state.is_unoccupied([1, 0])
+
+        state.remove_player(2)
+        assert state.get_occupancy() == {9: 1}
+        assert state.is_unoccupied([2, 1])
+
+    def test_penguin_cells(self):
+        # tests that penguins are kept as cells, and that the posns built from them can be changed freely
+        board = Board(4, 3, {}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [2, 1], penguin_posns={1: [[1, 0], []], 2: [[], []]})
+        assert state.get_penguin_cells() == {1: [3, -1], 2: [-1, -1]}
+        assert state.place_avatar(2, [2, 1])
+        assert state.get_penguin_cells() == {1: [3, -1], 2: [7, -1]}
+        penguin_posns = state.get_penguin_posns()
+        assert penguin_posns == {1: [[1, 0], []], 2: [[2, 1], []]}
+        penguin_posns[1][0] = [3, 0]
+        assert state.get_penguin_posns()[1][0] == [1, 0]
+
     def test_is_hole(self):
         # tests whether a given posn is a hole.
         board = Board(4, 3, {1: [0]})
@@ -151,6 +183,29 @@ class TestGameState(unittest.TestCase):
         assert player_fish_count[1] == 3
         assert player_fish_count[2] == 3
 
+    def test_is_legal_action(self):
+        # tests that an Action is legal exactly when it is one of the legal Actions, on both kinds of board, and that
+        # a penguin cannot move to a posn only another penguin of the same player can reach
+        for board in (Board(4, 5, {2: [1]}, num_of_fish_per_tile=2), BitBoard(4, 5, {2: [1]}, num_of_fish_per_tile=2)):
+            state = GameState(board, {1: "black", 2: "white"}, [1, 2],
+                              penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]],
+                                             2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+            legal_actions = state.get_legal_actions()
+            posns = [(row, col) for row in range(-1, 5) for col in range(-1, 6)]
+            for start_posn in posns:
+                for dest_posn in posns:
+                    action = (start_posn, dest_posn)
+                    assert state.is_legal_action(1, action) == (action in legal_actions)
+                    assert not state.is_legal_action(2, action)
+
+            assert not state.is_legal_action(1, ((1, 3), (2, 1)))
+            assert not state.is_legal_action(1, ([1, 3], [0, 3]))
+            assert not state.is_legal_action(1, ((1, 3), (0, 3), (0, 4)))
+            assert not state.is_legal_action(1, ((1, 3), ("0", 3)))
+            assert not state.is_legal_action(1, ())
+            assert not state.move_avatar(1, [0, 0], [0, 3])
+            assert state.move_avatar(1, [1, 3], [0, 3])
+
     def test_remove_player(self):
         # tests player removal
         board = Board(2, 5, {})
@@ -227,6 +282,148 @@ class TestGameState(unittest.TestCase):
         # nowhere left for anyone to go
         assert state.is_game_over()
 
+    def test_is_game_over_blocked_by_opponents(self):
+        # tests that a penguin whose neighbors are all taken cannot move, even if there are free posns behind the
+        # penguins in its way
+        board = Board(5, 1, {})
+        state = GameState(board, {1: "black", 2: "white"}, [2, 1], penguin_posns={1: [[0, 0]], 2: [[1, 0], [2, 0]]})
+        assert not state.player_can_make_move(1)
+        assert state.player_can_make_move(2)
+        assert not state.is_game_over()
+        assert state.get_player_mobility() == {1: 0, 2: 3}
+
+        assert state.move_avatar(2, [2, 0], [4, 0])
+        assert state.skip_turn(1)
+        assert state.move_avatar(2, [1, 0], [3, 0])
+        assert state.skip_turn(1)
+        assert state.is_game_over()
+        assert state.get_legal_actions() == []
+
+    def test_mobility_tracking(self):
+        # tests that the mobilities kept up to date through placements, moves, undos and removals are the ones computed
+        # from scratch, on both kinds of board
+        for board_class in (Board, BitBoard):
+            rng = random.Random(3)
+            for _game in range(5):
+                board = board_class(5, 4, {2: [1]}, num_of_fish_per_tile=2)
+                state = GameState(board, {1: "black", 2: "white", 3: "red"}, [1, 2, 3])
+                free_posns = [[row, col] for row in range(5) for col in range(4) if [row, col] != [2, 1]]
+                rng.shuffle(free_posns)
+                while not state.is_placement_phase_over():
+                    assert state.place_avatar(state.get_player_order()[0], free_posns.pop())
+                undo_records = []
+                while not state.is_game_over():
+                    self.__check_mobility(state)
+                    action = rng.choice(state.get_legal_actions())
+                    undo_records.append(state.apply_action(action))
+                    if rng.random() < 0.2:
+                        state.undo(undo_records.pop())
+                self.__check_mobility(state)
+                while undo_records:
+                    state.undo(undo_records.pop())
+                    self.__check_mobility(state)
+                state.remove_player(2)
+                self.__check_mobility(state)
+
+    @staticmethod
+    def __check_mobility(state):
+        fresh_state = GameState(copy.deepcopy(state.get_board()), dict(state.get_player_penguin_colors()),
+                                list(state.get_player_order()), dict(state.get_player_fish_count()),
+                                copy.deepcopy(state.get_penguin_posns()))
+        assert state.get_penguin_mobility() == fresh_state.get_penguin_mobility()
+        assert state.get_player_mobility() == fresh_state.get_player_mobility()
+        for player_id in state.get_player_order():
+            assert state.player_can_make_move(player_id) == bool(state.get_all_reachable_dests(player_id))
+
+    def test_apply_action_and_undo(self):
+        # tests that undoing an applied action puts back the penguin, the fish, the tile and the turn order
+        board = Board(4, 3, {}, num_of_fish_per_tile=3)
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[1, 0]], 2: [[2, 1]]})
+
+        assert not state.apply_action(((1, 0), (2, 1)))
+        assert not state.apply_action(((2, 1), (3, 1)))
+
+        undo_record = state.apply_action(((1, 0), (3, 0)))
+        # cells are row * 3 + col
+        assert undo_record == (1, 0, 3, 9, 3)
+        assert state.get_penguin_posns() == {1: [[3, 0]], 2: [[2, 1]]}
+        assert state.get_player_score(1) == 3
+        assert state.is_hole([1, 0])
+        assert state.get_player_order() == [2, 1]
+
+        state.undo(undo_record)
+        assert state.get_penguin_posns() == {1: [[1, 0]], 2: [[2, 1]]}
+        assert state.get_occupancy() == {3: 1, 7: 2}
+        assert state.get_player_score(1) == 0
+        assert board.get_holes() == {}
+        assert state.get_player_order() == [1, 2]
+
+    def test_apply_action_skip(self):
+        # tests that the empty action only skips the turn of a stuck player
+        board = Board(2, 5, {})
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [0, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 3]]})
+        assert state.get_legal_actions() == [()]
+        undo_record = state.apply_action(())
+        assert undo_record == (1,)
+        assert state.get_player_order() == [2, 1]
+        assert not state.apply_action(())
+
+        state.undo(undo_record)
+        assert state.get_player_order() == [1, 2]
+
+    def test_serialize(self):
+        # tests that a serialized GameState comes back as an equal GameState on a BitBoard
+        board = Board(4, 5, {0: [0], 1: [0, 1]}, num_of_fish_per_tile=2)
+        board.get_tiles()[2][2] = tile_inst(5)
+        state = GameState(board, {1: "black", 2: "white"}, [2, 1], player_fish_count={1: 2, 2: 4},
+                          penguin_posns={1: [[2, 0], [0, 1]], 2: [[3, 0], []]})
+        serialized_state = state.serialize()
+        assert serialized_state[:2] == (4, 5)
+        state_copy = GameState.deserialize(serialized_state)
+        assert isinstance(state_copy.get_board(), BitBoard)
+        assert state_copy.get_player_order() == [2, 1]
+        assert state_copy.get_player_penguin_colors() == {1: "black", 2: "white"}
+        assert state_copy.get_player_fish_count() == {1: 2, 2: 4}
+        assert state_copy.get_penguin_posns() == {1: [[2, 0], [0, 1]], 2: [[3, 0], []]}
+        assert state_copy.get_board().get_holes() == {0: [0], 1: [0, 1]}
+        assert state_copy.get_board().get_fish_count([2, 2]) == 5
+        assert state_copy.get_hash(include_scores=True) == state.get_hash(include_scores=True)
+        assert state_copy.get_legal_actions() == state.get_legal_actions()
+        assert state_copy.serialize() == serialized_state
+
+    def test_get_hash(self):
+        # tests that the hash only depends on the position, not the moves that led to it
+        def new_state():
+            return GameState(Board(4, 5, {}, num_of_fish_per_tile=2), {1: "black", 2: "white"}, [2, 1],
+                             penguin_posns={1: [[0, 0], [0, 1]], 2: [[1, 0], [1, 1]]})
+
+        state_1 = new_state()
+        state_2 = new_state()
+        initial_hash = state_1.get_hash(include_scores=True)
+        assert initial_hash == state_2.get_hash(include_scores=True)
+
+        for action in [((1, 0), (3, 0)), ((0, 0), (2, 0)), ((1, 1), (3, 1)), ((0, 1), (2, 1))]:
+            undo_record = state_1.apply_action(action)
+        state_1.undo(undo_record)
+        for action in [((1, 1), (3, 1)), ((0, 0), (2, 0)), ((1, 0), (3, 0))]:
+            state_2.apply_action(action)
+        assert state_1.get_hash(include_scores=True) == state_2.get_hash(include_scores=True)
+
+        state_3 = GameState(Board(4, 5, {0: [0], 1: [0, 1]}, num_of_fish_per_tile=2), {1: "black", 2: "white"}, [1, 2],
+                            player_fish_count={1: 2, 2: 4}, penguin_posns={1: [[2, 0], [0, 1]], 2: [[3, 0], [3, 1]]})
+        assert state_1.get_hash(include_scores=True) == state_3.get_hash(include_scores=True)
+
+        # the turn and the scores are part of the hash
+        assert state_1.skip_turn(1) is False
+        state_3.remove_player(2)
+        assert state_1.get_hash() != state_3.get_hash()
+        state_4 = new_state()
+        state_4.apply_action(((1, 0), (3, 0)))
+        state_4.undo(state_4.apply_action(((0, 0), (2, 0))))
+        assert state_4.get_hash() != initial_hash
+
 
 if __name__ == '__main__':
     unittest.main()
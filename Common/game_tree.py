@@ -1,4 +1,5 @@
-import copy
+from collections import OrderedDict
+from collections.abc import Mapping
 
 """
 A GameTree is a class that represents an entire game, all possible permutations of where players might place their
@@ -23,11 +24,245 @@ Where *row, and *col are both ints. (start_row, start_col) is the current locati
 the location that the penguin wants to go to. See board.py for more information on my coordinate system. An empty Action, 
 representing a time when a Player cannot make a move, is of the form ().
 
+The GameState of a GameTree can be either a GameState (see state.py) or a PersistentGameState (see persistent_state.py).
+Child GameStates are made with get_successor, which for a GameState is a full copy, and for a PersistentGameState shares
+everything that did not change with its parent, so layers of a tree of PersistentGameStates take far less memory.
+
+A GameTree can also be expanded one node at a time: expand gives a node its map_action_to_child_nodes, and get_child 
+expands a node if needed and returns the child of one Action. map_action_to_child_nodes is then a LazyChildNodes, a 
+read-only Dict(Action -> GameTree) that knows its Actions up front but only creates the child GameTree (and so the child 
+GameState) of an Action the first time it is looked up. A consumer that walks the tree depth first, or only follows 
+some of the Actions, only pays for the nodes it visits. next_layer still builds whole layers, and so still creates 
+every child of every node in them.
+
+A GameTree can be given a max_nodes budget, an int, in which case all the nodes of the tree share one NodeBudget. A node 
+is resident while it holds its GameState. Whenever a child is looked up, it and the nodes on the path it was looked up 
+by become the most recently used resident nodes, and if more than max_nodes nodes are resident, the least recently used 
+subtrees are evicted, except for the nodes of that path: each of their nodes drops its GameState and its children, but 
+stays in its parent's map_action_to_child_nodes. With merged transpositions (see below), the path a node was looked up 
+by is not always the chain of its first parents, so NodeBudget remembers it. 
+An evicted node is regenerated from its parent's GameState the next time its GameState is needed, and its children are 
+created again when it is expanded again, so a tree with a budget answers every question the same way a tree without 
+one does, at a fixed ceiling of resident GameStates. The root is never evicted.
+
+A GameTree can also be told to merge_transpositions, in which case it is really a directed acyclic graph: all the nodes 
+share one NodeTable, which maps the hash of every position (see GameState.get_hash, scores included) to its node, and a 
+child whose position is already in the table is not created again, the existing node becomes a child of one more 
+parent instead. Positions that are reached by moving penguins in different orders are then stored and expanded once. 
+A node remembers the first parent it was created from, which is the one get_parent returns and the one it is 
+regenerated from if it is evicted. An evicted node leaves the table until it is regenerated, so with a max_nodes budget 
+some positions may be stored more than once.
+
+A GameTree can be kept while the game it represents goes on: find_descendant finds the node of the position the game 
+has reached among the nodes created so far, and reroot makes that node the root of the tree, so that everything that was 
+created below it is kept and everything else is let go.
+
 """
 
 
+class NodeTable:
+    """
+    The nodes of a GameTree that merges transpositions, by position hash, see above. Counts how many times a child was
+    found in the table instead of being created.
+    """
+
+    def __init__(self):
+        # a Dictionary of the form {position_hash: GameTree}
+        self.__nodes = {}
+        self.__merges = 0
+
+    def lookup(self, position_hash):
+        node = self.__nodes.get(position_hash)
+        if node is not None:
+            self.__merges += 1
+        return node
+
+    def add(self, position_hash, node):
+        self.__nodes.setdefault(position_hash, node)
+
+    def remove(self, position_hash, node):
+        if self.__nodes.get(position_hash) is node:
+            del self.__nodes[position_hash]
+
+    def retain(self, nodes):
+        """
+        Forgets every node that is not one of the given nodes.
+        """
+        node_ids = {id(node) for node in nodes}
+        self.__nodes = {position_hash: node for position_hash, node in self.__nodes.items() if id(node) in node_ids}
+
+    def get_num_nodes(self):
+        return len(self.__nodes)
+
+    def get_merges(self):
+        return self.__merges
+
+
+class NodeBudget:
+    """
+    The resident nodes of a GameTree with a max_nodes budget, from least to most recently used, see above. Counts how
+    many subtrees it evicted and how many nodes were regenerated.
+    """
+
+    def __init__(self, max_nodes):
+        if not isinstance(max_nodes, int):
+            raise TypeError('Max nodes must be an int')
+        if max_nodes < 1:
+            raise ValueError('Max nodes must be at least 1')
+
+        self.__max_nodes = max_nodes
+        # an OrderedDict of the form {GameTree: None}, used as an ordered set
+        self.__resident_nodes = OrderedDict()
+        # the node in use, last, and the nodes it was reached by from the root, first, a List of GameTrees. With merged
+        # transpositions that is not always the chain of first parents (see GameTree.get_parent)
+        self.__path = []
+        # a Set of the ids of the nodes of path
+        self.__path_ids = set()
+        self.__evictions = 0
+        self.__regenerations = 0
+
+    def add(self, node):
+        self.__resident_nodes[node] = None
+
+    def remove(self, node):
+        self.__resident_nodes.pop(node, None)
+
+    def record_regeneration(self):
+        self.__regenerations += 1
+
+    def retain(self, nodes):
+        """
+        Forgets every resident node that is not one of the given nodes, keeping the order of the others.
+        """
+        node_ids = {id(node) for node in nodes}
+        for node in [node for node in self.__resident_nodes if id(node) not in node_ids]:
+            del self.__resident_nodes[node]
+        self.__set_path([])
+
+    def touch(self, node, parent=None):
+        """
+        Makes node the node in use, looked up from parent, or from its first parent if parent is not given. The path
+        to node is the path to parent, if parent is on the current path, otherwise the chain of first parents of
+        parent. node and every node on that path become the most recently used nodes, ancestors more recently than
+        their descendants, so none of them is ever the least recently used node while node is in use.
+        """
+        if not self.__path or self.__path[-1] is not node:
+            if parent is None:
+                parent = node.get_parent()
+            path = self.__path
+            # the search usually looks up a child of the node in use, or of one of the last nodes before it
+            parent_index = next((i for i in range(len(path) - 1, -1, -1) if path[i] is parent), None)
+            if parent_index is not None:
+                path = path[:parent_index + 1]
+            else:
+                path = []
+                while parent is not None:
+                    path.append(parent)
+                    parent = parent.get_parent()
+                path.reverse()
+            path.append(node)
+            self.__set_path(path)
+
+        for path_node in reversed(self.__path):
+            if path_node in self.__resident_nodes:
+                self.__resident_nodes.move_to_end(path_node)
+
+    def __set_path(self, path):
+        self.__path = path
+        self.__path_ids = {id(path_node) for path_node in path}
+
+    def is_in_use(self, node):
+        """
+        Whether node is the node in use or on the path it was reached by, see touch. Such a node is never evicted,
+        not even along with the subtree of its first parent.
+        """
+        return id(node) in self.__path_ids
+
+    def enforce(self, node_in_use):
+        """
+        Evicts the least recently used subtrees until at most max_nodes nodes are resident, except the root and
+        node_in_use and the path it was reached by (see touch).
+        """
+        while len(self.__resident_nodes) > self.__max_nodes:
+            least_recently_used_node = None
+            for node in self.__resident_nodes:
+                if node is node_in_use:
+                    break
+                if node.get_parent() is not None and not self.is_in_use(node):
+                    least_recently_used_node = node
+                    break
+            if least_recently_used_node is None:
+                break
+            least_recently_used_node.evict()
+            self.__evictions += 1
+
+    def get_max_nodes(self):
+        return self.__max_nodes
+
+    def get_num_resident(self):
+        return len(self.__resident_nodes)
+
+    def get_evictions(self):
+        return self.__evictions
+
+    def get_regenerations(self):
+        return self.__regenerations
+
+
+class LazyChildNodes(Mapping):
+    """
+    The map_action_to_child_nodes of an expanded GameTree, see above. Checking whether an Action is legal, iterating 
+    over the Actions or counting them does not create any child.
+    """
+
+    def __init__(self, actions, create_child, on_lookup=None):
+        # the legal Actions in GameTree order (see GameState.get_legal_actions), and a Dictionary of the form
+        # {action: GameTree} of the children created so far
+        self.__actions = actions
+        self.__action_set = set(self.__actions)
+        self.__created_child_nodes = {}
+        # create_child takes an Action and returns its child GameTree, on_lookup is called with every child looked up
+        self.__create_child = create_child
+        self.__on_lookup = on_lookup
+
+    def __getitem__(self, action):
+        if action not in self:
+            raise KeyError(action)
+        if action not in self.__created_child_nodes:
+            self.__created_child_nodes[action] = self.__create_child(action)
+        child_node = self.__created_child_nodes[action]
+        if self.__on_lookup is not None:
+            self.__on_lookup(child_node)
+        return child_node
+
+    def __contains__(self, action):
+        try:
+            return action in self.__action_set
+        # an Action that is not even hashable, like a List, is not legal
+        except TypeError:
+            return False
+
+    def __iter__(self):
+        return iter(self.__actions)
+
+    def __len__(self):
+        return len(self.__actions)
+
+    def is_created(self, action):
+        return action in self.__created_child_nodes
+
+    def get_num_created(self):
+        return len(self.__created_child_nodes)
+
+    def get_created_child_nodes(self):
+        return list(self.__created_child_nodes.values())
+
+    def get_created_items(self):
+        return list(self.__created_child_nodes.items())
+
+
 class GameTree:
-    def __init__(self, game_state):
+    def __init__(self, game_state, max_nodes=None, merge_transpositions=False):
         assert game_state.is_placement_phase_over(), "State is invalid, penguin placement phase " \
                                                      "is still ongoing"
 
@@ -43,19 +278,149 @@ class GameTree:
         # have its child nodes set yet.
         self.__last_nodes = []
 
+        # whether map_action_to_child_nodes has been set, see expand, and whether next_layer has generated the first
+        # layer, which it may do after this node was expanded
+        self.__is_expanded = False
+        self.__first_layer_generated = False
+
+        # the parent GameTree of this node and the Action that led here from it, None for the root
+        self.__parent = None
+        self.__action = None
+        # the NodeBudget shared by the whole tree, or None if it has no max_nodes budget
+        self.__node_budget = NodeBudget(max_nodes) if max_nodes is not None else None
+        if self.__node_budget is not None:
+            self.__node_budget.add(self)
+        # the NodeTable shared by the whole graph, or None if it does not merge transpositions
+        self.__node_table = NodeTable() if merge_transpositions else None
+        if self.__node_table is not None:
+            self.__node_table.add(game_state.get_hash(include_scores=True), self)
+
+    def __create_child(self, action):
+        child_state = self.get_game_state().get_successor(action)
+        if self.__node_table is not None:
+            existing_node = self.__node_table.lookup(child_state.get_hash(include_scores=True))
+            if existing_node is not None:
+                return existing_node
+
+        child_node = GameTree(child_state)
+        child_node.__parent = self
+        child_node.__action = action
+        child_node.__node_budget = self.__node_budget
+        child_node.__node_table = self.__node_table
+        if self.__node_budget is not None:
+            self.__node_budget.add(child_node)
+        if self.__node_table is not None:
+            self.__node_table.add(child_state.get_hash(include_scores=True), child_node)
+        return child_node
+
+    def __on_child_lookup(self, child_node):
+        self.__node_budget.touch(child_node, self)
+        self.__node_budget.enforce(child_node)
+
+    def evict(self):
+        """
+        Drops the GameState and the children of this node and of every resident node below it, see NodeBudget. They
+        are regenerated when they are needed again.
+        """
+        if self.__parent is None:
+            raise ValueError('The root of a GameTree cannot be evicted')
+        if self.__is_expanded:
+            for child_node in self.__map_action_to_child_nodes.get_created_child_nodes():
+                # a merged child belongs to the subtree of its first parent, so only that parent evicts it, unless
+                # the search reached it through another parent and is still using it
+                if child_node.is_resident() and child_node.__parent is self and \
+                        not self.__node_budget.is_in_use(child_node):
+                    child_node.evict()
+        if self.__node_table is not None:
+            self.__node_table.remove(self.__game_state.get_hash(include_scores=True), self)
+        self.__game_state = None
+        self.__map_action_to_child_nodes = {}
+        self.__is_expanded = False
+        self.__node_budget.remove(self)
+
+    def find_descendant(self, position_hash, max_depth):
+        """
+        The node at most max_depth Actions below this one whose GameState has the given hash, scores included (see
+        GameState.get_hash), or None. Only looks at nodes that have been created and are resident, and never creates
+        any.
+        """
+        layer = [self]
+        for _depth in range(max_depth + 1):
+            next_layer = []
+            for node in layer:
+                if not node.is_resident():
+                    continue
+                if node.__game_state.get_hash(include_scores=True) == position_hash:
+                    return node
+                if node.__is_expanded:
+                    next_layer.extend(node.__map_action_to_child_nodes.get_created_child_nodes())
+            layer = next_layer
+        return None
+
+    def reroot(self):
+        """
+        Makes this node the root of its tree. The nodes below it are kept, with their GameStates, their children and
+        their place in the NodeBudget and NodeTable, if any, and every other node is let go.
+        """
+        if not self.is_resident():
+            self.__regenerate()
+
+        # a Dictionary of the form {id(node): node} of the nodes below this one, and another of the form
+        # {id(node): (parent, action)} of the parent and Action each of them was first reached by from this node
+        subtree = {id(self): self}
+        reached_from = {}
+        nodes_to_visit = [self]
+        while nodes_to_visit:
+            node = nodes_to_visit.pop()
+            if node.__is_expanded:
+                for action, child_node in node.__map_action_to_child_nodes.get_created_items():
+                    if id(child_node) not in subtree:
+                        subtree[id(child_node)] = child_node
+                        reached_from[id(child_node)] = (node, action)
+                        nodes_to_visit.append(child_node)
+
+        # a merged node whose first parent is no longer in the tree is regenerated from the parent it was reached by
+        for node_id, (parent, action) in reached_from.items():
+            node = subtree[node_id]
+            if id(node.__parent) not in subtree:
+                node.__parent = parent
+                node.__action = action
+
+        self.__parent = None
+        self.__action = None
+        self.__last_nodes = []
+        self.__first_layer_generated = False
+        if self.__node_budget is not None:
+            self.__node_budget.retain(subtree.values())
+        if self.__node_table is not None:
+            self.__node_table.retain(subtree.values())
+
+    def __regenerate(self):
+        self.__game_state = self.__parent.get_game_state().get_successor(self.__action)
+        if self.__node_table is not None:
+            self.__node_table.add(self.__game_state.get_hash(include_scores=True), self)
+        self.__node_budget.record_regeneration()
+        self.__node_budget.add(self)
+        self.__node_budget.touch(self)
+        self.__node_budget.enforce(self)
+
     def __generate_game_tree(self):
         while True:
-            if self.__map_action_to_child_nodes == {}:
-                self.__map_action_to_child_nodes = self.all_actions_to_child_nodes()
-                for action, child_node in self.__map_action_to_child_nodes.items():
+            if not self.__first_layer_generated:
+                self.__first_layer_generated = True
+                for action, child_node in self.expand().items():
                     self.__last_nodes.append(child_node)
                 yield
             else:
                 new_last_nodes = []
+                # the ids of the nodes in new_last_nodes, a node that merges transpositions can be reached from more than
+                # one node of the layer above, but is only expanded once
+                new_last_node_ids = set()
                 for child_node in self.__last_nodes:
-                    child_node.__map_action_to_child_nodes = child_node.all_actions_to_child_nodes()
-                    for action2, child_node2 in child_node.__map_action_to_child_nodes.items():
-                        new_last_nodes.append(child_node2)
+                    for action2, child_node2 in child_node.expand().items():
+                        if id(child_node2) not in new_last_node_ids:
+                            new_last_node_ids.add(id(child_node2))
+                            new_last_nodes.append(child_node2)
                 # represents the fact that the game is over because for each node in the current layer there were
                 # no child nodes for any of them
                 if new_last_nodes == []:
@@ -69,44 +434,34 @@ class GameTree:
         except StopIteration:
             return "Game Done"
 
-    def __get_all_actions_to_child_nodes_help(self, whose_turn, player_penguin_posns, game_state):
-        all_actions_to_child_nodes = {}
-        for i in range(len(player_penguin_posns)):
-            start_posn = player_penguin_posns[i]
-            all_dests = game_state.get_all_reachable_dests(whose_turn, which_penguin=i)
-            for dest_posn in all_dests:
-                game_state_copy = copy.deepcopy(game_state)
-                game_state_copy.move_avatar(whose_turn, start_posn, dest_posn)
-                all_actions_to_child_nodes[(tuple(start_posn), tuple(dest_posn))] = GameTree(game_state_copy)
-        return all_actions_to_child_nodes
-
     def all_actions_to_child_nodes(self):
-        # "game over" node
-        if self.__game_state.is_game_over():
-            return {}
-
-        game_state_player_order = self.__game_state.get_player_order()
-        game_state_penguin_posns = self.__game_state.get_penguin_posns()
-
-        whose_turn = game_state_player_order[0]
+        # "game over" nodes have no legal actions, "player stuck" nodes only have the empty action () and general
+        # "can make a move" nodes have every legal action of the player whose turn it is (see GameState.get_legal_actions)
+        # The child nodes are only created when they are looked up, see LazyChildNodes.
+        on_lookup = self.__on_child_lookup if self.__node_budget is not None else None
+        return LazyChildNodes(self.get_game_state().get_legal_actions(), self.__create_child, on_lookup)
 
-        game_state_copy = copy.deepcopy(self.__game_state)
-
-        # "player stuck" node
-        if game_state_copy.skip_turn(whose_turn):
-            return {(): GameTree(game_state_copy)}
+    def expand(self):
+        if not self.__is_expanded:
+            self.__map_action_to_child_nodes = self.all_actions_to_child_nodes()
+            self.__is_expanded = True
+        return self.__map_action_to_child_nodes
 
-        # general "can make a move" node
-        else:
-            player_penguin_posns = game_state_penguin_posns[whose_turn]
-            return self.__get_all_actions_to_child_nodes_help(whose_turn, player_penguin_posns, self.__game_state)
+    def get_child(self, action):
+        """
+        The child GameTree of action, creating only that child if it has not been created yet, or False if action is
+        not legal.
+        """
+        map_action_to_child_nodes = self.expand()
+        if action not in map_action_to_child_nodes:
+            return False
+        return map_action_to_child_nodes[action]
 
     def execute_action(self, action):
-        for legal_action in self.__map_action_to_child_nodes:
-            if action == legal_action:
-                child_node = self.__map_action_to_child_nodes[legal_action]
-                return child_node.get_game_state()
-        return False
+        child_node = self.get_child(action)
+        if child_node is False:
+            return False
+        return child_node.get_game_state()
 
     def apply_to_all_children(self, func):
         res = []
@@ -133,10 +488,30 @@ class GameTree:
         game_state.render_game_state()
 
     def get_game_state(self):
+        if self.__game_state is None:
+            self.__regenerate()
         return self.__game_state
 
+    def is_resident(self):
+        return self.__game_state is not None
+
+    def get_parent(self):
+        return self.__parent
+
+    def get_action(self):
+        return self.__action
+
+    def get_node_budget(self):
+        return self.__node_budget
+
+    def get_node_table(self):
+        return self.__node_table
+
     def get_map_action_to_child_nodes(self):
         return self.__map_action_to_child_nodes
 
+    def is_expanded(self):
+        return self.__is_expanded
+
     def get_last_nodes(self):
         return self.__last_nodes
@@ -117,6 +117,182 @@ class TestGameTree(unittest.TestCase):
         game_tree_child_1 = game.get_map_action_to_child_nodes()[((1, 4), (0, 4))]
         assert game_tree_child_1.apply_to_all_children(game.score_at_state) == [2]
 
+    def test_lazy_expansion(self):
+        # tests that expanding a node only creates the children that are looked up
+        board = Board(4, 5, {}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [2, 1],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        game = GameTree(state)
+        assert not game.is_expanded()
+
+        map_action_to_child_nodes = game.expand()
+        assert game.is_expanded()
+        assert len(map_action_to_child_nodes) == 19
+        assert list(map_action_to_child_nodes) == state.get_legal_actions()
+        assert ((1, 0), (3, 0)) in map_action_to_child_nodes
+        assert [[1, 0], [3, 0]] not in map_action_to_child_nodes
+        assert map_action_to_child_nodes.get_num_created() == 0
+
+        game_tree_child = game.get_child(((1, 0), (3, 0)))
+        assert game_tree_child.get_game_state().get_player_order() == [1, 2]
+        assert not game_tree_child.is_expanded()
+        assert game.get_child(((1, 0), (3, 0))) is game_tree_child
+        assert map_action_to_child_nodes.is_created(((1, 0), (3, 0)))
+        assert map_action_to_child_nodes.get_num_created() == 1
+        assert not game.get_child(((1, 0), (4, 0)))
+
+        assert game_tree_child.execute_action(((0, 0), (2, 0)))
+        assert game_tree_child.get_map_action_to_child_nodes().get_num_created() == 1
+        assert map_action_to_child_nodes.get_num_created() == 1
+
+        # next_layer builds the rest of the layer around the node that was already expanded
+        game.next_layer()
+        assert map_action_to_child_nodes.get_num_created() == 19
+        assert game.get_child(((1, 0), (3, 0))) is game_tree_child
+
+    def test_node_budget(self):
+        # tests that a tree with a budget never holds more GameStates than the budget, and regenerates evicted nodes
+        # exactly as they were
+        board = Board(4, 5, {}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [2, 1],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        with self.assertRaises(ValueError):
+            GameTree(state, max_nodes=0)
+
+        game = GameTree(state, max_nodes=5)
+        node_budget = game.get_node_budget()
+        first_child = game.get_child(((1, 0), (3, 0)))
+        first_grandchild = first_child.get_child(((0, 0), (2, 0)))
+        first_hash = first_grandchild.get_game_state().get_hash(include_scores=True)
+        for action in game.expand():
+            for action2 in game.get_child(action).expand():
+                game.get_child(action).get_child(action2)
+                assert node_budget.get_num_resident() <= 5
+        assert node_budget.get_evictions() > 0
+        assert not first_grandchild.is_resident()
+        regenerations = node_budget.get_regenerations()
+        with self.assertRaises(ValueError):
+            game.evict()
+
+        # an evicted node is still the child of its parent, and comes back with the same GameState, but its children
+        # are created again
+        assert game.get_child(((1, 0), (3, 0))) is first_child
+        new_first_grandchild = first_child.get_child(((0, 0), (2, 0)))
+        assert new_first_grandchild.get_game_state().get_hash(include_scores=True) == first_hash
+        assert node_budget.get_regenerations() > regenerations
+        assert node_budget.get_num_resident() <= 5
+
+    def test_node_budget_next_layer(self):
+        # tests that layers built with a budget have the same nodes as layers built without one
+        board = Board(4, 5, {}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [2, 1],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        game = GameTree(state)
+        bounded_game = GameTree(state, max_nodes=20)
+        for _i in range(2):
+            game.next_layer()
+            bounded_game.next_layer()
+            assert bounded_game.get_node_budget().get_num_resident() <= 20
+        assert [node.get_game_state().get_hash() for node in game.get_last_nodes()] == \
+               [node.get_game_state().get_hash() for node in bounded_game.get_last_nodes()]
+        assert bounded_game.get_node_budget().get_num_resident() <= 20
+
+    def test_merge_transpositions(self):
+        # tests that merging transpositions keeps the same positions in every layer, but only one node for each
+        board = Board(4, 5, {}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [2, 1],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        game = GameTree(state)
+        merged_game = GameTree(state, merge_transpositions=True)
+        for _i in range(3):
+            game.next_layer()
+            merged_game.next_layer()
+            layer_hashes = [node.get_game_state().get_hash(include_scores=True) for node in game.get_last_nodes()]
+            merged_layer_hashes = [node.get_game_state().get_hash(include_scores=True)
+                                   for node in merged_game.get_last_nodes()]
+            assert sorted(set(layer_hashes)) == sorted(merged_layer_hashes)
+        assert len(merged_game.get_last_nodes()) < len(game.get_last_nodes())
+        assert merged_game.get_node_table().get_merges() > 0
+        assert game.get_node_table() is None
+
+        # moving the same two penguins in either order leads to the same node
+        first_node = merged_game.get_child(((1, 0), (3, 0))).get_child(((0, 0), (2, 0))).get_child(((1, 1), (3, 1)))
+        second_node = merged_game.get_child(((1, 1), (3, 1))).get_child(((0, 0), (2, 0))).get_child(((1, 0), (3, 0)))
+        assert first_node is second_node
+
+    def test_node_budget_merged_path(self):
+        # tests that the path a merged node was reached by is kept while it is in use, even when it is not the chain of
+        # its first parents
+        board = Board(4, 5, {}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [2, 1],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        game = GameTree(state, max_nodes=8, merge_transpositions=True)
+        node_budget = game.get_node_budget()
+        first_grandparent = game.get_child(((1, 0), (3, 0)))
+        first_node = first_grandparent.get_child(((0, 0), (2, 0))).get_child(((1, 1), (3, 1)))
+        second_grandparent = game.get_child(((1, 1), (3, 1)))
+        second_parent = second_grandparent.get_child(((0, 0), (2, 0)))
+        assert second_parent.get_child(((1, 0), (3, 0))) is first_node
+        assert first_node.get_parent() is not second_parent
+
+        for action in first_node.expand():
+            first_node.get_child(action)
+            assert node_budget.is_in_use(second_parent)
+            assert second_grandparent.is_resident() and second_parent.is_resident() and first_node.is_resident()
+        assert node_budget.get_evictions() > 0
+        assert node_budget.get_num_resident() <= 8
+        assert second_parent.get_map_action_to_child_nodes().is_created(((1, 0), (3, 0)))
+        # the first parents of the merged node were evicted, but not the merged node along with them
+        assert not first_grandparent.is_resident()
+
+    def test_find_descendant_and_reroot(self):
+        # tests that a descendant can be found by the hash of its GameState, and that re-rooting on it keeps the nodes
+        # below it and lets go of the rest
+        board = Board(4, 5, {}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [2, 1],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        game = GameTree(state, max_nodes=1000, merge_transpositions=True)
+        child = game.get_child(((1, 0), (3, 0)))
+        grandchild = child.get_child(((0, 0), (2, 0)))
+        great_grandchild = grandchild.get_child(((1, 1), (3, 1)))
+        other_child = game.get_child(((1, 1), (3, 1)))
+        other_child_hash = other_child.get_game_state().get_hash(include_scores=True)
+        assert game.get_node_table().lookup(other_child_hash) is other_child
+        grandchild_hash = grandchild.get_game_state().get_hash(include_scores=True)
+        assert game.find_descendant(grandchild_hash, 1) is None
+        assert game.find_descendant(grandchild_hash, 2) is grandchild
+        assert game.find_descendant(0, 2) is None
+
+        grandchild.reroot()
+        assert grandchild.get_parent() is None
+        assert grandchild.get_action() is None
+        assert grandchild.get_child(((1, 1), (3, 1))) is great_grandchild
+        assert great_grandchild.get_parent() is grandchild
+        assert grandchild.get_node_budget().get_num_resident() == 2
+        assert grandchild.get_node_table().lookup(great_grandchild.get_game_state().get_hash(include_scores=True)) \
+               is great_grandchild
+        assert grandchild.get_node_table().lookup(child.get_game_state().get_hash(include_scores=True)) is None
+        # the sibling of the old path is let go too, it is neither in the NodeTable nor below the new root
+        assert grandchild.get_node_table().lookup(other_child_hash) is None
+        assert grandchild.find_descendant(other_child_hash, 3) is None
+
+    def test_reroot_merged_node(self):
+        # tests that a merged node whose first parent is let go by re-rooting is re-pointed to a parent that is kept
+        board = Board(4, 5, {}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [2, 1],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        game = GameTree(state, max_nodes=1000, merge_transpositions=True)
+        first_node = game.get_child(((1, 0), (3, 0))).get_child(((0, 0), (2, 0))).get_child(((1, 1), (3, 1)))
+        second_parent = game.get_child(((1, 1), (3, 1))).get_child(((0, 0), (2, 0)))
+        assert second_parent.get_child(((1, 0), (3, 0))) is first_node
+        assert first_node.get_parent() is not second_parent
+
+        second_parent.reroot()
+        assert first_node.get_parent() is second_parent
+        assert first_node.get_action() == ((1, 0), (3, 0))
+        first_hash = first_node.get_game_state().get_hash(include_scores=True)
+        first_node.evict()
+        assert first_node.get_game_state().get_hash(include_scores=True) == first_hash
 
 
 if __name__ == '__main__':
@@ -0,0 +1,334 @@
+import copy
+from bitboard import BitBoard
+from state import GameState
+from zobrist import get_zobrist_table
+
+"""
+A PersistentGameState is an immutable game state (see state.py for the GameState it stands in for). It works as the
+state of a GameTree (see game_tree.py): place_avatar, move_avatar, skip_turn, remove_player and get_successor never
+change it. Instead they return a new PersistentGameState (or False if the change is not legal), which shares every
+piece that did not change with the PersistentGameState it came from:
+
+- the board geometry and the fish on every tile, which never change during a game, are one BitBoard (see bitboard.py)
+  that is shared by every PersistentGameState of a game, and the holes are an int bitmask of live tiles,
+- the penguins are a Dictionary of the form {player_id: (cell)}, where each player's penguins are a tuple of cells
+  (see board.py), or None for a penguin that has not been placed yet, so moving a penguin only makes a new tuple for the
+  player that moved, and the other players' tuples are shared,
+- the player order is a tuple, and the penguin colors are only copied when a player is removed.
+
+So a new PersistentGameState costs O(number of players) instead of O(board size), which is what keeps many sibling
+states alive at once cheap, like the layers of a GameTree (a GameTree works with either kind of state).
+
+Since it cannot be changed in place, a PersistentGameState has no apply_action and no undo, which is how a GameState is
+searched in place. Code that searches either kind of state, like Strategy (see strategy.py), steps to the next one
+with get_successor instead.
+"""
+
+
+class PersistentGameState:
+
+    def __init__(self, bit_board, live_mask, player_penguin_colors, player_order, player_fish_count, penguin_cells,
+                 hashes=None):
+        # a BitBoard that is never changed, it is only used for its dimensions, rays and fish
+        self.__bit_board = bit_board
+        # an int, bit i is set if the tile at cell i is not a hole
+        self.__live_mask = live_mask
+        # a Dictionary of the form {player_id: player_penguin_color}
+        self.__player_penguin_colors = player_penguin_colors
+        # a tuple of player ids, it is player_order[0]'s turn
+        self.__player_order = player_order
+        # a Dictionary of the form {player_id: fish_count}
+        self.__player_fish_count = player_fish_count
+        # a Dictionary of the form {player_id: (cell)}, see above
+        self.__penguin_cells = penguin_cells
+        # an int, bit i is set if there is a penguin on cell i
+        self.__occupied_mask = 0
+        for player_penguin_cells in penguin_cells.values():
+            for cell in player_penguin_cells:
+                if cell is not None:
+                    self.__occupied_mask |= 1 << cell
+
+        # the ZobristTable of the board and a tuple (board_hash, penguin_hash, score_hash) of ints, the same hashes a
+        # GameState and its Board keep (see GameState.get_hash). They are computed from scratch when not given, and
+        # updated from the parent's hashes when a new PersistentGameState is derived.
+        self.__zobrist = get_zobrist_table(bit_board.get_rows(), bit_board.get_columns())
+        self.__hashes = hashes if hashes is not None else self.__compute_hashes()
+
+    def __compute_hashes(self):
+        board_hash = 0
+        for cell in range(self.__bit_board.get_rows() * self.__bit_board.get_columns()):
+            if not self.__live_mask >> cell & 1:
+                board_hash ^= self.__zobrist.get_hole_key(cell)
+        penguin_hash = 0
+        for player_id, player_penguin_cells in self.__penguin_cells.items():
+            for cell in player_penguin_cells:
+                if cell is not None:
+                    penguin_hash ^= self.__zobrist.get_penguin_key(player_id, cell)
+        score_hash = 0
+        for player_id, fish_count in self.__player_fish_count.items():
+            score_hash ^= self.__zobrist.get_score_key(player_id, fish_count)
+        return board_hash, penguin_hash, score_hash
+
+    @staticmethod
+    def from_game_state(game_state):
+        board = game_state.get_board()
+        bit_board = copy.deepcopy(board) if isinstance(board, BitBoard) else BitBoard.from_board(board)
+        # a GameState marks unplaced penguins with -1 rather than None
+        penguin_cells = {player_id: tuple(cell if cell >= 0 else None for cell in cells)
+                         for player_id, cells in game_state.get_penguin_cells().items()}
+        return PersistentGameState(bit_board, bit_board.get_live_mask(),
+                                   dict(game_state.get_player_penguin_colors()),
+                                   tuple(game_state.get_player_order()),
+                                   dict(game_state.get_player_fish_count()),
+                                   penguin_cells)
+
+    def to_game_state(self):
+        return GameState(self.get_board(), dict(self.__player_penguin_colors), list(self.__player_order),
+                         dict(self.__player_fish_count), self.get_penguin_posns())
+
+    def __derive(self, live_mask=None, player_penguin_colors=None, player_order=None, player_fish_count=None,
+                 penguin_cells=None, hash_changes=(0, 0, 0)):
+        # a new PersistentGameState that shares everything that is not given with this one. hash_changes is a tuple of
+        # the keys to XOR into each of the hashes
+        hashes = tuple(old_hash ^ hash_change for old_hash, hash_change in zip(self.__hashes, hash_changes))
+        return PersistentGameState(self.__bit_board,
+                                   self.__live_mask if live_mask is None else live_mask,
+                                   self.__player_penguin_colors if player_penguin_colors is None
+                                   else player_penguin_colors,
+                                   self.__player_order if player_order is None else player_order,
+                                   self.__player_fish_count if player_fish_count is None else player_fish_count,
+                                   self.__penguin_cells if penguin_cells is None else penguin_cells,
+                                   hashes)
+
+    def __deepcopy__(self, memo):
+        # nothing in a PersistentGameState can change, so a copy is the same object
+        return self
+
+    def __get_cell(self, posn):
+        return self.__bit_board.get_cell(posn)
+
+    def __get_posn(self, cell):
+        return self.__bit_board.get_posn(cell)
+
+    def __next_turn(self):
+        return self.__player_order[1:] + self.__player_order[:1]
+
+    def is_pos_out_of_bounds(self, posn):
+        return (posn[0] < 0 or posn[0] >= self.__bit_board.get_rows()) or \
+               (posn[1] < 0 or posn[1] >= self.__bit_board.get_columns())
+
+    def player_has_penguin_at_pos(self, player_id, posn):
+        if self.is_pos_out_of_bounds(posn):
+            return False
+        return self.__get_cell(posn) in self.__penguin_cells[player_id]
+
+    def is_hole(self, posn):
+        return not self.__live_mask >> self.__get_cell(posn) & 1
+
+    def get_fish_count(self, posn):
+        # the fish on a tile never change, so they are read off the shared BitBoard, without building a board
+        return self.__bit_board.get_fish_count(posn)
+
+    def is_unoccupied(self, posn):
+        if self.is_pos_out_of_bounds(posn):
+            return True
+        return not self.__occupied_mask >> self.__get_cell(posn) & 1
+
+    def __get_reachable_cells(self, start_cell, blocked_mask, recurse=True):
+        free_mask = self.__live_mask & ~blocked_mask
+        reachable_cells = []
+        for ray in self.__bit_board.get_rays()[start_cell]:
+            for cell in ray:
+                if not free_mask >> cell & 1:
+                    break
+                reachable_cells.append(cell)
+                if not recurse:
+                    break
+        return reachable_cells
+
+    def get_all_reachable_dests_help(self, start_pos, recurse):
+        return [self.__get_posn(cell) for cell in
+                self.__get_reachable_cells(self.__get_cell(start_pos), self.__occupied_mask, recurse)]
+
+    def get_all_reachable_dests(self, player_id, which_penguin=None, recurse=True):
+        player_penguin_cells = self.__penguin_cells[player_id]
+        start_cells = player_penguin_cells if which_penguin is None else [player_penguin_cells[which_penguin]]
+
+        all_destinations = []
+        for start_cell in start_cells:
+            if start_cell is not None:
+                all_destinations.extend(self.__get_posn(cell) for cell in
+                                        self.__get_reachable_cells(start_cell, self.__occupied_mask, recurse))
+        return all_destinations
+
+    def get_winning_score(self):
+        return max(self.__player_fish_count.values())
+
+    def get_player_score(self, player_id):
+        return self.__player_fish_count[player_id]
+
+    def is_placement_phase_over(self):
+        for player_penguin_cells in self.__penguin_cells.values():
+            if None in player_penguin_cells:
+                return False
+        return True
+
+    def player_can_make_move(self, player_id):
+        # the same rule as GameState.player_can_make_move: a penguin can move if a cell next to it is free
+        player_penguin_cells = self.__penguin_cells[player_id]
+        if None in player_penguin_cells:
+            return True
+        free_mask = self.__live_mask & ~self.__occupied_mask
+        rays = self.__bit_board.get_rays()
+        for cell in player_penguin_cells:
+            for ray in rays[cell]:
+                if ray and free_mask >> ray[0] & 1:
+                    return True
+        return False
+
+    def is_game_over(self):
+        for player_id in self.__penguin_cells:
+            if self.player_can_make_move(player_id):
+                return False
+        return True
+
+    def get_legal_actions(self):
+        # the same Actions, in the same order, as GameState.get_legal_actions
+        if self.is_game_over():
+            return []
+
+        whose_turn = self.__player_order[0]
+        legal_actions = []
+        for start_cell in self.__penguin_cells[whose_turn]:
+            if start_cell is not None:
+                start_posn = tuple(self.__get_posn(start_cell))
+                for dest_cell in self.__get_reachable_cells(start_cell, self.__occupied_mask):
+                    legal_actions.append((start_posn, tuple(self.__get_posn(dest_cell))))
+
+        return legal_actions if legal_actions else [()]
+
+    def remove_player(self, player_id):
+        player_penguin_colors = dict(self.__player_penguin_colors)
+        player_penguin_colors.pop(player_id)
+        player_fish_count = dict(self.__player_fish_count)
+        player_fish_count.pop(player_id)
+        penguin_cells = dict(self.__penguin_cells)
+        penguin_hash_change = 0
+        for cell in penguin_cells.pop(player_id):
+            if cell is not None:
+                penguin_hash_change ^= self.__zobrist.get_penguin_key(player_id, cell)
+        score_hash_change = self.__zobrist.get_score_key(player_id, self.__player_fish_count[player_id])
+        return self.__derive(player_penguin_colors=player_penguin_colors,
+                             player_order=tuple(i for i in self.__player_order if i != player_id),
+                             player_fish_count=player_fish_count,
+                             penguin_cells=penguin_cells,
+                             hash_changes=(0, penguin_hash_change, score_hash_change))
+
+    def skip_turn(self, player_id):
+        if not self.get_all_reachable_dests(player_id):
+            return self.__derive(player_order=self.__next_turn())
+        return False
+
+    def place_avatar(self, player_id, desired_posn):
+        if not self.is_pos_out_of_bounds(desired_posn) and self.is_unoccupied(desired_posn) and \
+                not self.is_hole(desired_posn) and self.__player_order[0] == player_id:
+            player_penguin_cells = self.__penguin_cells[player_id]
+            if None in player_penguin_cells:
+                i = player_penguin_cells.index(None)
+                penguin_cells = dict(self.__penguin_cells)
+                desired_cell = self.__get_cell(desired_posn)
+                penguin_cells[player_id] = player_penguin_cells[:i] + (desired_cell,) + player_penguin_cells[i + 1:]
+                return self.__derive(player_order=self.__next_turn(), penguin_cells=penguin_cells,
+                                     hash_changes=(0, self.__zobrist.get_penguin_key(player_id, desired_cell), 0))
+        return False
+
+    def move_avatar(self, player_id, start_posn, desired_posn):
+        if self.__player_order[0] == player_id and not self.is_pos_out_of_bounds(desired_posn):
+            return self.get_successor((tuple(start_posn), tuple(desired_posn)))
+        return False
+
+    def get_successor(self, action):
+        """
+        The PersistentGameState after the player whose turn it is takes the Action (see game_tree.py), or False if the
+        Action is not legal.
+        """
+        whose_turn = self.__player_order[0]
+
+        if action == ():
+            return self.skip_turn(whose_turn)
+
+        if self.is_pos_out_of_bounds(action[0]) or self.is_pos_out_of_bounds(action[1]):
+            return False
+        start_cell = self.__get_cell(action[0])
+        desired_cell = self.__get_cell(action[1])
+        player_penguin_cells = self.__penguin_cells[whose_turn]
+        if start_cell not in player_penguin_cells or \
+                desired_cell not in self.__get_reachable_cells(start_cell, self.__occupied_mask):
+            return False
+
+        i = player_penguin_cells.index(start_cell)
+        penguin_cells = dict(self.__penguin_cells)
+        penguin_cells[whose_turn] = player_penguin_cells[:i] + (desired_cell,) + player_penguin_cells[i + 1:]
+
+        player_fish_count = dict(self.__player_fish_count)
+        player_fish_count[whose_turn] += self.__bit_board.get_fish_counts()[start_cell]
+
+        hash_changes = (self.__zobrist.get_hole_key(start_cell),
+                        self.__zobrist.get_penguin_key(whose_turn, start_cell) ^
+                        self.__zobrist.get_penguin_key(whose_turn, desired_cell),
+                        self.__zobrist.get_score_key(whose_turn, self.__player_fish_count[whose_turn]) ^
+                        self.__zobrist.get_score_key(whose_turn, player_fish_count[whose_turn]))
+
+        return self.__derive(live_mask=self.__live_mask & ~(1 << start_cell),
+                             player_order=self.__next_turn(),
+                             player_fish_count=player_fish_count,
+                             penguin_cells=penguin_cells,
+                             hash_changes=hash_changes)
+
+    def render_game_state(self):
+        self.to_game_state().render_game_state()
+
+    def get_hash(self, include_scores=False):
+        # the same hash a GameState in this position has, see GameState.get_hash
+        board_hash, penguin_hash, score_hash = self.__hashes
+        position_hash = board_hash ^ penguin_hash
+        if self.__player_order:
+            position_hash ^= self.__zobrist.get_turn_key(self.__player_order[0])
+        if include_scores:
+            position_hash ^= score_hash
+        return position_hash
+
+    def get_board(self):
+        """
+        A new BitBoard with the holes of this PersistentGameState, which takes O(board size) to build. Searches ask
+        for the fish on a tile with get_fish_count instead.
+        """
+        return self.__bit_board.copy_with_live_mask(self.__live_mask)
+
+    def get_player_penguin_colors(self):
+        return dict(self.__player_penguin_colors)
+
+    def get_player_order(self):
+        return list(self.__player_order)
+
+    def get_player_fish_count(self):
+        return dict(self.__player_fish_count)
+
+    def get_penguin_posns(self):
+        return {player_id: [self.__get_posn(cell) if cell is not None else [] for cell in player_penguin_cells]
+                for player_id, player_penguin_cells in self.__penguin_cells.items()}
+
+    def get_penguin_cells(self):
+        return self.__penguin_cells
+
+    def get_live_mask(self):
+        return self.__live_mask
+
+    def get_occupied_mask(self):
+        return self.__occupied_mask
+
+    def get_penguin_masks(self):
+        # a Dictionary of the form {player_id: int}, the bitmask of the cells of each player's penguins, like
+        # GameState.get_penguin_masks
+        return {player_id: sum(1 << cell for cell in player_penguin_cells if cell is not None)
+                for player_id, player_penguin_cells in self.__penguin_cells.items()}
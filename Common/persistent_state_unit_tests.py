@@ -0,0 +1,118 @@
+import unittest
+from state import GameState
+from board import Board
+from game_tree import GameTree
+from persistent_state import PersistentGameState
+
+
+class TestPersistentGameState(unittest.TestCase):
+
+    def test_place_and_move_avatar(self):
+        # tests that placing and moving return new states and leave the old one as it was
+        board = Board(4, 3, {}, num_of_fish_per_tile=3)
+        state = PersistentGameState.from_game_state(GameState(board, {1: "black", 2: "white"}, [1, 2]))
+
+        placed = state.place_avatar(1, [1, 0])
+        assert placed.player_has_penguin_at_pos(1, [1, 0])
+        assert not state.player_has_penguin_at_pos(1, [1, 0])
+        assert not placed.place_avatar(1, [0, 0])
+
+        placed = placed.place_avatar(2, [2, 1])
+        assert not placed.move_avatar(1, [1, 0], [2, 1])
+        moved = placed.move_avatar(1, [1, 0], [3, 0])
+        assert moved.is_hole([1, 0])
+        assert not placed.is_hole([1, 0])
+        assert moved.get_player_score(1) == 3
+        assert placed.get_player_score(1) == 0
+        assert moved.get_player_order() == [2, 1]
+        assert moved.get_penguin_posns() == {1: [[3, 0], [], [], []], 2: [[2, 1], [], [], []]}
+
+    def test_structural_sharing(self):
+        # tests that a move only replaces the penguins of the player who moved
+        board = Board(4, 5, {}, num_of_fish_per_tile=2)
+        state = PersistentGameState.from_game_state(
+            GameState(board, {1: "black", 2: "white"}, [2, 1],
+                      penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]}))
+        moved = state.get_successor(((1, 0), (3, 0)))
+        assert moved.get_penguin_cells()[1] is state.get_penguin_cells()[1]
+        assert moved.get_penguin_cells()[2] is not state.get_penguin_cells()[2]
+
+    def test_same_game_tree(self):
+        # tests that a GameTree of PersistentGameStates has the same actions and scores as one of GameStates
+        board = Board(4, 5, {2: [2]}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [2, 1],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        game = GameTree(state)
+        persistent_game = GameTree(PersistentGameState.from_game_state(state))
+        for _i in range(2):
+            game.next_layer()
+            persistent_game.next_layer()
+
+        assert list(game.get_map_action_to_child_nodes()) == list(persistent_game.get_map_action_to_child_nodes())
+        for action, child_node in game.get_map_action_to_child_nodes().items():
+            persistent_child_node = persistent_game.get_map_action_to_child_nodes()[action]
+            assert list(child_node.get_map_action_to_child_nodes()) == \
+                list(persistent_child_node.get_map_action_to_child_nodes())
+            assert child_node.apply_to_all_children(game.score_at_state) == \
+                persistent_child_node.apply_to_all_children(game.score_at_state)
+
+    def test_get_hash(self):
+        # tests that a PersistentGameState has the same hash as a GameState in the same position
+        board = Board(4, 5, {2: [2]}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [2, 1],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        persistent_state = PersistentGameState.from_game_state(state)
+        for action in [((1, 0), (3, 0)), ((0, 0), (2, 0))]:
+            state.apply_action(action)
+            persistent_state = persistent_state.get_successor(action)
+            assert state.get_hash(include_scores=True) == persistent_state.get_hash(include_scores=True)
+        state.remove_player(2)
+        persistent_state = persistent_state.remove_player(2)
+        assert state.get_hash(include_scores=True) == persistent_state.get_hash(include_scores=True)
+
+    def test_get_fish_count(self):
+        # tests that the fish on a tile are the ones of the GameState, holes included, without building a board
+        board = Board(3, 4, {2: [2]})
+        state = GameState(board, {1: "black", 2: "white"}, [2, 1], penguin_posns={1: [[0, 0]], 2: [[1, 0]]})
+        persistent_state = PersistentGameState.from_game_state(state)
+        state.apply_action(((1, 0), (2, 0)))
+        persistent_state = persistent_state.get_successor(((1, 0), (2, 0)))
+        for row in range(3):
+            for col in range(4):
+                assert persistent_state.get_fish_count([row, col]) == state.get_fish_count([row, col])
+
+    def test_get_all_reachable_dests_help(self):
+        # tests that the tiles reachable from a posn, and the ones next to it, are the ones of the GameState
+        board = Board(4, 5, {2: [2]}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [2, 1],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        persistent_state = PersistentGameState.from_game_state(state)
+        for posn in [[1, 0], [3, 0], [2, 3]]:
+            for recurse in [True, False]:
+                assert persistent_state.get_all_reachable_dests_help(posn, recurse) == \
+                    state.get_all_reachable_dests_help(posn, recurse)
+
+    def test_to_game_state(self):
+        # tests the conversion back to a GameState
+        board = Board(2, 5, {0: [4]}, num_of_fish_per_tile=2)
+        state = PersistentGameState.from_game_state(
+            GameState(board, {1: "black", 2: "white"}, [1, 2], penguin_posns={1: [[0, 0]], 2: [[1, 1]]}))
+        game_state = state.get_successor(((0, 0), (1, 0))).to_game_state()
+        assert game_state.get_penguin_posns() == {1: [[1, 0]], 2: [[1, 1]]}
+        assert game_state.get_board().get_holes() == {0: [0, 4]}
+        assert game_state.get_player_score(1) == 2
+
+    def test_is_game_over_blocked_by_opponents(self):
+        # tests that a penguin whose neighbors are all taken cannot move, like for a GameState
+        board = Board(5, 1, {})
+        state = PersistentGameState.from_game_state(
+            GameState(board, {1: "black", 2: "white"}, [2, 1], penguin_posns={1: [[0, 0]], 2: [[1, 0], [2, 0]]}))
+        assert not state.player_can_make_move(1)
+        assert state.player_can_make_move(2)
+        state = state.get_successor(((2, 0), (4, 0))).get_successor(())
+        assert not state.is_game_over()
+        assert state.get_successor(((1, 0), (3, 0))).is_game_over()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,134 @@
+"""
+A Region is an int bitmask of cells (see bitboard.py) that is a connected component of the live tiles of a board: every
+live tile next to a tile of the Region is in the Region too, and a penguin could go from any tile of the Region to any
+other one through tiles of the Region next to each other, if no penguin were in the way. Holes split a board into
+Regions, and nothing that happens in one Region can change anything in another.
+
+A NeighborTable is a List indexed by cell, where each element is a tuple of the six cells next to that cell, in ray
+order (see board.py), with -1 for a direction that leads off the board. In ray order, two directions that follow each
+other (and the last and the first) lead to cells that are next to each other too, so the six neighbors of a cell go
+around it.
+
+A RegionMap keeps the Regions of a board up to date while its tiles are removed and restored:
+
+- removing a tile can only split its own Region. If the live tiles around it form at most one unbroken arc, they are
+  still connected to each other without it, so the Region just loses the tile. Otherwise the Region is split by a flood
+  fill from each arc, which only looks at the cells of that Region,
+- restoring a tile merges it with the Regions of the live tiles around it.
+"""
+
+
+def get_neighbor_table(rays):
+    """
+    The NeighborTable of a board, from its rays (see Board.get_rays).
+    """
+    return [tuple(ray[0] if ray else -1 for ray in cell_rays) for cell_rays in rays]
+
+
+def get_neighbor_masks(neighbor_table):
+    """
+    A List indexed by cell of the int bitmasks of the cells next to each cell, from a NeighborTable.
+    """
+    return [sum(1 << neighbor for neighbor in neighbors if neighbor >= 0) for neighbors in neighbor_table]
+
+
+def flood_fill(neighbor_table, start_cell, mask):
+    """
+    The int bitmask of the cells of mask that are connected to start_cell through cells of mask next to each other.
+    """
+    filled_mask = 1 << start_cell
+    cells_to_visit = [start_cell]
+    while cells_to_visit:
+        for neighbor in neighbor_table[cells_to_visit.pop()]:
+            if neighbor >= 0 and mask >> neighbor & 1 and not filled_mask >> neighbor & 1:
+                filled_mask |= 1 << neighbor
+                cells_to_visit.append(neighbor)
+    return filled_mask
+
+
+class RegionMap:
+
+    def __init__(self, neighbor_table, live_mask):
+        # a NeighborTable, and a List indexed by cell of the int bitmasks of the cells next to each cell, both shared by
+        # every copy of the RegionMap
+        self.__neighbor_table = neighbor_table
+        self.__neighbor_masks = get_neighbor_masks(neighbor_table)
+        # a List of Regions, in no particular order
+        self.__regions = []
+        remaining_mask = live_mask
+        while remaining_mask:
+            start_cell = (remaining_mask & -remaining_mask).bit_length() - 1
+            region = flood_fill(self.__neighbor_table, start_cell, remaining_mask)
+            self.__regions.append(region)
+            remaining_mask &= ~region
+
+    def __deepcopy__(self, memo):
+        region_map_copy = RegionMap.__new__(RegionMap)
+        memo[id(self)] = region_map_copy
+        region_map_copy.__neighbor_table = self.__neighbor_table
+        region_map_copy.__neighbor_masks = self.__neighbor_masks
+        region_map_copy.__regions = list(self.__regions)
+        return region_map_copy
+
+    def __find_region_index(self, cell):
+        for i, region in enumerate(self.__regions):
+            if region >> cell & 1:
+                return i
+        return -1
+
+    def remove_cell(self, cell):
+        i = self.__find_region_index(cell)
+        if i < 0:
+            raise ValueError('Cell is not live')
+
+        region = self.__regions[i] & ~(1 << cell)
+        # the live neighbors of the cell are the ones in its Region
+        live_neighbor_mask = region & self.__neighbor_masks[cell]
+        if not region:
+            self.__regions.pop(i)
+            return
+        if not live_neighbor_mask & (live_neighbor_mask - 1):
+            # at most one live neighbor, which cannot be cut off from the rest of the Region
+            self.__regions[i] = region
+            return
+
+        # an arc starts at every live neighbor whose predecessor around the cell is not live
+        live_neighbors = [neighbor >= 0 and region >> neighbor & 1 for neighbor in self.__neighbor_table[cell]]
+        arc_starts = [neighbor for d, neighbor in enumerate(self.__neighbor_table[cell])
+                      if live_neighbors[d] and not live_neighbors[d - 1]]
+        if len(arc_starts) <= 1:
+            self.__regions[i] = region
+        else:
+            self.__regions.pop(i)
+            for start_cell in arc_starts:
+                if region >> start_cell & 1:
+                    split_region = flood_fill(self.__neighbor_table, start_cell, region)
+                    self.__regions.append(split_region)
+                    region &= ~split_region
+
+    def restore_cell(self, cell):
+        neighbor_mask = self.__neighbor_masks[cell]
+        merged_region = 1 << cell
+        regions = []
+        for region in self.__regions:
+            if region >> cell & 1:
+                raise ValueError('Cell is already live')
+            if region & neighbor_mask:
+                merged_region |= region
+            else:
+                regions.append(region)
+        regions.append(merged_region)
+        self.__regions = regions
+
+    def get_region(self, cell):
+        """
+        The Region of the tile at cell, or 0 if it is a hole.
+        """
+        i = self.__find_region_index(cell)
+        return self.__regions[i] if i >= 0 else 0
+
+    def get_regions(self):
+        return self.__regions
+
+    def get_neighbor_table(self):
+        return self.__neighbor_table
@@ -1,6 +1,9 @@
 from fish import __Fish as fish_inst
 from penguin import __Penguin as penguin_inst
 from tile_fish_penguin_constants import TILE_SIZE
+from bitboard import BitBoard
+from zobrist import get_zobrist_table
+import copy
 import tkinter
 
 """
@@ -8,6 +11,25 @@ This class essentially can tell you what the state of a game is, giving you a sn
 moment in time. This includes things like the state of the board (what tiles are on the board, where the holes are 
 on the board, how many fish are on a tile, etc) and things like the player penguin colors, the order in which 
 players play, whose turn it currently is, how many fish each player has, and where each player's penguins are located.
+
+Internally, a GameState keeps every penguin as the cell it is on (row * columns + col, see board.py), or -1 if it has 
+not been placed, and only converts between cells and [row, col] posns at its public methods, so moving a penguin 
+around in a search never builds a posn.
+
+A GameState can also be searched in place: apply_action executes an Action (see game_tree.py) for the player whose 
+turn it is and returns an UndoRecord, and undo takes that UndoRecord and puts the GameState back exactly the way it 
+was. An UndoRecord is a tuple, either (player_id, penguin_index, start_cell, desired_cell, fish_count) for a move, 
+where penguin_index is the index of the moved penguin in the player's penguins and fish_count is the number of fish 
+the player collected, or (player_id,) for a skipped turn. UndoRecords must be undone in the reverse order they were 
+applied.
+
+A GameState can be sent to another process in a compact form: serialize returns a SerializedGameState, and 
+GameState.deserialize builds an equal GameState on a BitBoard (see bitboard.py) from it. A SerializedGameState is a 
+tuple (rows, columns, fish_counts, live_mask, player_order, player_penguin_colors, player_fish_count, penguin_cells), 
+where fish_counts is a bytes with the number of fish on every cell (see board.py), live_mask is the int bitmask of the 
+cells that are not holes, player_order is a tuple of player ids, player_penguin_colors and player_fish_count are 
+tuples of (player_id, value) pairs and penguin_cells is a tuple of (player_id, cells) pairs, where cells is a tuple 
+with the cell of every penguin of the player, or -1 for a penguin that has not been placed.
 """
 
 # on the board, this is the x offset for placing a tile. so the leftmost tile will have x of 5..etc. this
@@ -45,22 +67,112 @@ class GameState:
         self.__player_fish_count = player_fish_count if player_fish_count is not None else \
             {player_id: 0 for player_id in self.__player_order}
 
-        # maps a player id to a double nested array containing [row,col] penguin posns
-        # is a Dictionary of the form {player_id: [[row,col]]}
-        # Where a player id is an int, and row, col are both ints
-        self.__penguin_posns = penguin_posns if penguin_posns is not None else {}
-        if self.__penguin_posns == {}:
-            self.__init_penguin_posns()
-
-    def __init_penguin_posns(self):
-        penguin_posns = {}
+        # maps a player id to the cells of its penguins, -1 for a penguin that has not been placed yet
+        # is a Dictionary of the form {player_id: [cell]}, built from penguin_posns, which is a Dictionary of the form
+        # {player_id: [[row,col]]} with [] for a penguin that has not been placed yet
+        # Where a player id is an int, and cell, row, col are all ints
+        if penguin_posns:
+            self.__penguin_cells = {player_id: [self.__get_cell(posn) if posn else -1 for posn in player_penguin_posns]
+                                    for player_id, player_penguin_posns in penguin_posns.items()}
+        else:
+            self.__init_penguin_cells()
+
+        # maps the cell (row * columns + col, see board.py) of every placed penguin to the id of the player who owns
+        # it, is a Dictionary of the form {int: int}, specifically {cell: player_id}. Kept up to date alongside
+        # penguin_cells, so every occupancy query is a single lookup.
+        self.__occupancy = {}
+
+        # maps a player id to an int bitmask of the cells (row * columns + col, see bitboard.py) its penguins are on,
+        # is a Dictionary of the form {player_id: int}. Kept up to date alongside penguin_cells.
+        self.__penguin_masks = {}
+        # an int bitmask of the cells that any penguin is on, the union of penguin_masks
+        self.__occupied_mask = 0
+
+        # the ZobristTable of the board (see zobrist.py). penguin_hash is the XOR of the penguin keys of every placed
+        # penguin and score_hash is the XOR of the score keys of every player, both are updated whenever a penguin or a
+        # score changes (see get_hash)
+        self.__zobrist = get_zobrist_table(board.get_rows(), board.get_columns())
+        self.__penguin_hash = 0
+        self.__score_hash = 0
+        for player_id, fish_count in self.__player_fish_count.items():
+            self.__score_hash ^= self.__zobrist.get_score_key(player_id, fish_count)
+
+        self.__init_occupancy()
+
+        # whether the board is a BitBoard, in which case move generation works on the bitmasks directly
+        self.__on_bitboard = isinstance(board, BitBoard)
+
+        # a List indexed by cell of tuples of the cells next to it, the first cell of each of its rays (see board.py)
+        self.__neighbors = [tuple(ray[0] for ray in cell_rays if ray) for cell_rays in board.get_rays()]
+        # maps the cell of every placed penguin to its mobility, the number of free cells (neither holes nor occupied)
+        # next to it, is a Dictionary of the form {cell: int}. A penguin can move if and only if its mobility is not 0.
+        self.__penguin_mobility = {}
+        # maps a player id to the sum of the mobilities of its penguins, is a Dictionary of the form {player_id: int}
+        self.__player_mobility = {player_id: 0 for player_id in self.__penguin_cells}
+        for cell, player_id in self.__occupancy.items():
+            self.__add_penguin_mobility(player_id, cell)
+
+    def __deepcopy__(self, memo):
+        # only the board and the containers are copied: player ids, colors, fish counts and cells are immutable, and
+        # the ZobristTable is shared (see zobrist.py)
+        game_state_copy = GameState.__new__(GameState)
+        game_state_copy.__dict__.update(self.__dict__)
+        memo[id(self)] = game_state_copy
+        game_state_copy.__board = copy.deepcopy(self.__board, memo)
+        game_state_copy.__player_penguin_colors = dict(self.__player_penguin_colors)
+        game_state_copy.__player_order = list(self.__player_order)
+        game_state_copy.__player_fish_count = dict(self.__player_fish_count)
+        game_state_copy.__penguin_cells = {player_id: list(cells) for player_id, cells in self.__penguin_cells.items()}
+        game_state_copy.__occupancy = dict(self.__occupancy)
+        game_state_copy.__penguin_masks = dict(self.__penguin_masks)
+        game_state_copy.__penguin_mobility = dict(self.__penguin_mobility)
+        game_state_copy.__player_mobility = dict(self.__player_mobility)
+        return game_state_copy
+
+    def __init_penguin_cells(self):
+        penguin_cells = {}
         num_of_players = len(self.__player_penguin_colors)
         penguins_per_player = 6 - num_of_players
 
         for player_id in self.__player_penguin_colors:
-            penguin_posns[player_id] = [[] for _i in range(penguins_per_player)]
-
-        self.__penguin_posns = penguin_posns
+            penguin_cells[player_id] = [-1] * penguins_per_player
+
+        self.__penguin_cells = penguin_cells
+
+    def __init_occupancy(self):
+        for player_id, cells in self.__penguin_cells.items():
+            player_mask = 0
+            for cell in cells:
+                if cell >= 0:
+                    self.__occupancy[cell] = player_id
+                    player_mask |= 1 << cell
+                    self.__penguin_hash ^= self.__zobrist.get_penguin_key(player_id, cell)
+            self.__penguin_masks[player_id] = player_mask
+            self.__occupied_mask |= player_mask
+
+    def __get_cell(self, posn):
+        return posn[0] * self.__board.get_columns() + posn[1]
+
+    def __add_penguin_mobility(self, player_id, cell):
+        # starts tracking the mobility of the penguin of the player on cell
+        free_mask = self.__board.get_live_mask() & ~self.__occupied_mask
+        mobility = 0
+        for neighbor in self.__neighbors[cell]:
+            if free_mask >> neighbor & 1:
+                mobility += 1
+        self.__penguin_mobility[cell] = mobility
+        self.__player_mobility[player_id] += mobility
+
+    def __remove_penguin_mobility(self, player_id, cell):
+        self.__player_mobility[player_id] -= self.__penguin_mobility.pop(cell)
+
+    def __update_neighbor_mobility(self, cell, change):
+        # cell just became free (change is 1) or stopped being free (change is -1), so every tracked penguin next to it
+        # gains or loses one free cell. Only the cells next to a changed cell can change mobilities.
+        for neighbor in self.__neighbors[cell]:
+            if neighbor in self.__penguin_mobility:
+                self.__penguin_mobility[neighbor] += change
+                self.__player_mobility[self.__occupancy[neighbor]] += change
 
     def is_pos_out_of_bounds(self, posn):
         board_rows = self.__board.get_rows()
@@ -72,52 +184,51 @@ class GameState:
         return (pos_row < 0 or pos_row >= board_rows) or (pos_col < 0 or pos_col >= board_columns)
 
     def player_has_penguin_at_pos(self, player_id, posn):
-        player_penguin_posns = self.__penguin_posns[player_id]
-        return posn in player_penguin_posns
+        if self.is_pos_out_of_bounds(posn):
+            return False
+        return self.__occupancy.get(self.__get_cell(posn)) == player_id
 
     def is_hole(self, posn):
-        board_tiles = self.__board.get_tiles()
-        pos_row = posn[0]
-        pos_col = posn[1]
-        tile_at_pos = board_tiles[pos_row][pos_col]
+        return self.__board.is_hole(posn)
 
-        return not tile_at_pos.get_visibility()
+    def get_fish_count(self, posn):
+        return self.__board.get_fish_count(posn)
 
     def is_unoccupied(self, posn):
-        for player_id in self.__penguin_posns:
-            if self.player_has_penguin_at_pos(player_id, posn):
-                return False
-        return True
+        if self.is_pos_out_of_bounds(posn):
+            return True
+        return self.__get_cell(posn) not in self.__occupancy
 
-    def get_all_reachable_dests_help(self, start_pos, lo_all_penguin_posns, recurse):
-        all_destinations = []
-        destinations = self.__board.get_reachable_posns(start_pos, lo_all_penguin_posns, recurse)
-        for dest_pos in destinations:
-            if dest_pos not in all_destinations and self.is_unoccupied(dest_pos):
-                all_destinations.append(dest_pos)
-        return all_destinations
+    def get_all_reachable_dests_help(self, start_pos, recurse):
+        return [self.__board.get_posn(cell) for cell in
+                self.__get_reachable_cells(self.__get_cell(start_pos), recurse)]
 
-    def get_all_reachable_dests(self, player_id, which_penguin=None, recurse=True):
-        player_penguin_posns = self.__penguin_posns[player_id]
+    def __get_reachable_cells(self, start_cell, recurse):
+        # every ray stops before the first occupied cell, so there is nothing left to filter out. A BitBoard takes
+        # the occupied cells as a bitmask, a Board takes anything that supports `in`, like the occupancy index.
+        blocked_cells = self.__occupied_mask if self.__on_bitboard else self.__occupancy
+        return self.__board.get_reachable_cells(start_cell, blocked_cells, recurse)
 
-        lo_all_penguin_posns = [pp for i in self.__penguin_posns for pp in self.__penguin_posns[i] if pp]
+    def get_all_reachable_dests(self, player_id, which_penguin=None, recurse=True):
+        cells = self.__penguin_cells[player_id]
 
-        if which_penguin is not None:
-            start_pos = player_penguin_posns[which_penguin]
-            all_destinations = self.get_all_reachable_dests_help(start_pos, lo_all_penguin_posns, recurse)
-        else:
-            all_destinations = []
-            for start_pos in player_penguin_posns:
-                if start_pos:
-                    all_destinations.extend(self.get_all_reachable_dests_help(start_pos, lo_all_penguin_posns, 
-                                                                           recurse))
-        return all_destinations
+        start_cells = cells if which_penguin is None else [cells[which_penguin]]
+        return [self.__board.get_posn(dest_cell) for start_cell in start_cells if start_cell >= 0
+                for dest_cell in self.__get_reachable_cells(start_cell, recurse)]
 
     def remove_player(self, player_id):
         self.__player_penguin_colors.pop(player_id)
         self.__player_order.remove(player_id)
-        self.__player_fish_count.pop(player_id)
-        self.__penguin_posns.pop(player_id)
+        self.__score_hash ^= self.__zobrist.get_score_key(player_id, self.__player_fish_count.pop(player_id))
+        freed_cells = [cell for cell in self.__penguin_cells.pop(player_id) if cell >= 0]
+        for cell in freed_cells:
+            self.__occupancy.pop(cell)
+            self.__penguin_hash ^= self.__zobrist.get_penguin_key(player_id, cell)
+            self.__penguin_mobility.pop(cell)
+        self.__player_mobility.pop(player_id)
+        self.__occupied_mask &= ~self.__penguin_masks.pop(player_id)
+        for cell in freed_cells:
+            self.__update_neighbor_mobility(cell, 1)
 
     def get_winning_score(self):
         return max(self.__player_fish_count.values())
@@ -126,7 +237,7 @@ class GameState:
         return self.__player_fish_count[player_id]
 
     def skip_turn(self, player_id):
-        if not self.get_all_reachable_dests(player_id):
+        if not self.__player_mobility[player_id]:
             self.__update_turns()
             return True
         return False
@@ -135,73 +246,181 @@ class GameState:
         player_who_took_a_turn = self.__player_order.pop(0)
         self.__player_order.append(player_who_took_a_turn)
 
+    def __revert_turns(self):
+        player_who_took_a_turn = self.__player_order.pop()
+        self.__player_order.insert(0, player_who_took_a_turn)
+
     def place_avatar(self, player_id, desired_posn):
         if not self.is_pos_out_of_bounds(desired_posn) and self.is_unoccupied(desired_posn) and \
                 not self.is_hole(desired_posn) and self.__player_order[0] == player_id:
-            player_penguin_posns = self.__penguin_posns[player_id]
-            for i, current_pos in enumerate(player_penguin_posns):
-                # That means the placement phase is still ongoing for this player
-                if not current_pos:
-                    player_penguin_posns[i] = desired_posn
-                    self.__penguin_posns[player_id] = player_penguin_posns
-                    self.__update_turns()
-                    return True
+            cells = self.__penguin_cells[player_id]
+            # That means the placement phase is still ongoing for this player
+            if -1 in cells:
+                desired_cell = self.__get_cell(desired_posn)
+                cells[cells.index(-1)] = desired_cell
+                self.__occupancy[desired_cell] = player_id
+                self.__penguin_hash ^= self.__zobrist.get_penguin_key(player_id, desired_cell)
+                self.__penguin_masks[player_id] |= 1 << desired_cell
+                self.__occupied_mask |= 1 << desired_cell
+                self.__update_neighbor_mobility(desired_cell, -1)
+                self.__add_penguin_mobility(player_id, desired_cell)
+                self.__update_turns()
+                return True
         return False
 
-    def __update_player_fish_count(self, player_id, start_posn):
-        board_tiles = self.__board.get_tiles()
-
-        start_posn_row = start_posn[0]
-        start_posn_col = start_posn[1]
-        tile_at_pos = board_tiles[start_posn_row][start_posn_col]
-        tile_fish_count = tile_at_pos.get_num_fish_per_tile()
-        self.__player_fish_count[player_id] += tile_fish_count
+    def __add_fish(self, player_id, fish_count):
+        self.__score_hash ^= self.__zobrist.get_score_key(player_id, self.__player_fish_count[player_id])
+        self.__player_fish_count[player_id] += fish_count
+        self.__score_hash ^= self.__zobrist.get_score_key(player_id, self.__player_fish_count[player_id])
 
     def is_placement_phase_over(self):
-        for player_id in self.__penguin_posns:
-            for posn in self.__penguin_posns[player_id]:
-                if not posn:
-                    return False
+        for cells in self.__penguin_cells.values():
+            if -1 in cells:
+                return False
         return True
 
     def move_avatar(self, player_id, start_posn, desired_posn):
-        if not self.is_pos_out_of_bounds(desired_posn) and \
-                self.is_unoccupied(desired_posn) and \
-                self.player_has_penguin_at_pos(player_id, start_posn) and \
-                desired_posn in self.get_all_reachable_dests(player_id) and \
-                self.__player_order[0] == player_id:
-
-            player_penguin_posns = self.__penguin_posns[player_id]
-
-            original_posn_index = player_penguin_posns.index(start_posn)
-            player_penguin_posns[original_posn_index] = desired_posn
-            self.__penguin_posns[player_id] = player_penguin_posns
-
-            self.__update_player_fish_count(player_id, start_posn)
-
-            self.__board.remove_tile(start_posn)
-
-            self.__update_turns()
-            return True
+        if self.__player_order[0] == player_id:
+            move_cells = self.__get_legal_move_cells(player_id, start_posn, desired_posn)
+            if move_cells is not None:
+                self.__move(player_id, *move_cells)
+                return True
 
         return False
 
+    def __move(self, player_id, start_cell, desired_cell):
+        # executes the legal move of the player's penguin on start_cell to desired_cell, and returns its UndoRecord
+        penguin_index = self.__penguin_cells[player_id].index(start_cell)
+        fish_count = self.__board.get_cell_fish_count(start_cell)
+
+        self.__move_penguin(player_id, penguin_index, start_cell, desired_cell)
+        self.__add_fish(player_id, fish_count)
+        self.__board.remove_cell(start_cell)
+        self.__update_mobility_after_move(player_id, start_cell, desired_cell)
+        self.__update_turns()
+
+        return player_id, penguin_index, start_cell, desired_cell, fish_count
+
+    def __update_mobility_after_move(self, player_id, start_cell, desired_cell):
+        # the start cell went from occupied to a hole, so it was not free before and is not free now, and the dest cell
+        # went from free to occupied
+        self.__remove_penguin_mobility(player_id, start_cell)
+        self.__update_neighbor_mobility(desired_cell, -1)
+        self.__add_penguin_mobility(player_id, desired_cell)
+
+    def __move_penguin(self, player_id, penguin_index, start_cell, desired_cell):
+        self.__penguin_cells[player_id][penguin_index] = desired_cell
+        self.__occupancy.pop(start_cell)
+        self.__occupancy[desired_cell] = player_id
+        self.__penguin_hash ^= self.__zobrist.get_penguin_key(player_id, start_cell) ^ \
+            self.__zobrist.get_penguin_key(player_id, desired_cell)
+        moved_bits = 1 << start_cell | 1 << desired_cell
+        self.__penguin_masks[player_id] ^= moved_bits
+        self.__occupied_mask ^= moved_bits
+
+    def is_legal_action(self, player_id, action):
+        """
+        Whether action is an Action (see game_tree.py) that the player with the given id can take right now: it is the
+        player's turn, one of its penguins is on the start posn, and the dest posn is on one of the rays out of the
+        start posn (see board.py) with no hole or penguin on the way. Anything that is not a tuple of two (row, col)
+        tuples of ints is not legal. Only the cells between the two posns are looked at, nothing is copied.
+        """
+        if not isinstance(action, tuple) or len(action) != 2:
+            return False
+        for posn in action:
+            if not isinstance(posn, tuple) or len(posn) != 2 or not all(isinstance(coord, int) for coord in posn):
+                return False
+        return self.__player_order[0] == player_id and \
+            self.__get_legal_move_cells(player_id, action[0], action[1]) is not None
+
+    def __get_legal_move_cells(self, player_id, start_posn, desired_posn):
+        # the cells of the two posns, a tuple of the form (start_cell, desired_cell), if moving the player's penguin on
+        # start_posn to desired_posn is legal, otherwise None
+        if self.is_pos_out_of_bounds(start_posn) or self.is_pos_out_of_bounds(desired_posn):
+            return None
+        start_cell = self.__get_cell(start_posn)
+        desired_cell = self.__get_cell(desired_posn)
+        if self.__occupancy.get(start_cell) != player_id:
+            return None
+        for ray in self.__board.get_rays()[start_cell]:
+            if desired_cell in ray:
+                if self.__is_clear_path(ray[:ray.index(desired_cell) + 1]):
+                    return start_cell, desired_cell
+                return None
+        return None
+
+    def __is_clear_path(self, cells):
+        # whether none of the cells is a hole or has a penguin on it
+        free_mask = self.__board.get_live_mask() & ~self.__occupied_mask
+        return all(free_mask >> cell & 1 for cell in cells)
+
+    def get_legal_actions(self):
+        """
+        The Actions the player whose turn it is can take, in the same order as the edges of a GameTree node: [] if the
+        game is over, [()] if the player is stuck, otherwise every move of its first penguin, then its second, etc.
+        """
+        if self.is_game_over():
+            return []
+
+        whose_turn = self.__player_order[0]
+        # the (row, col) tuple of every cell, shared by every Action
+        cell_posns = self.__board.get_cell_posns()
+        legal_actions = []
+        for start_cell in self.__penguin_cells[whose_turn]:
+            if start_cell >= 0:
+                start_posn = cell_posns[start_cell]
+                for dest_cell in self.__get_reachable_cells(start_cell, True):
+                    legal_actions.append((start_posn, cell_posns[dest_cell]))
+
+        return legal_actions if legal_actions else [()]
+
+    def apply_action(self, action):
+        """
+        Executes the Action for the player whose turn it is and returns an UndoRecord for it (see above), or False if
+        the Action is not legal. The empty Action skips the turn of a player who cannot move.
+        """
+        whose_turn = self.__player_order[0]
+
+        if action == ():
+            return (whose_turn,) if self.skip_turn(whose_turn) else False
+
+        move_cells = self.__get_legal_move_cells(whose_turn, action[0], action[1])
+        if move_cells is None:
+            return False
+
+        return self.__move(whose_turn, *move_cells)
+
+    def undo(self, undo_record):
+        self.__revert_turns()
+
+        if len(undo_record) == 1:
+            return
+
+        player_id, penguin_index, start_cell, desired_cell, fish_count = undo_record
+
+        self.__board.restore_cell(start_cell)
+        self.__add_fish(player_id, -fish_count)
+        self.__move_penguin(player_id, penguin_index, desired_cell, start_cell)
+        # the dest cell is free again, and the start cell is occupied again, like before the move
+        self.__remove_penguin_mobility(player_id, desired_cell)
+        self.__update_neighbor_mobility(desired_cell, 1)
+        self.__add_penguin_mobility(player_id, start_cell)
+
+    def get_successor(self, action):
+        # a copy of this GameState after the Action is applied, this GameState is left as it was
+        undo_record = self.apply_action(action)
+        game_state_copy = copy.deepcopy(self)
+        self.undo(undo_record)
+        return game_state_copy
+
     def player_can_make_move(self, player_id):
-        player_penguin_posns = self.__penguin_posns[player_id]
-        for posn in player_penguin_posns:
-            # placement phase is still going on, so there are still empty lists
-            if not posn:
-                return True
-            else:
-                reachable_posns = self.__board.get_reachable_posns(posn, player_penguin_posns)
-                if len(reachable_posns) > 0:
-                    for reachable_posn in reachable_posns:
-                        if self.is_unoccupied(reachable_posn):
-                            return True
-        return False
+        # placement phase is still going on, so there are still unplaced penguins
+        if -1 in self.__penguin_cells[player_id]:
+            return True
+        return self.__player_mobility[player_id] > 0
 
     def is_game_over(self):
-        for player_id in self.__penguin_posns:
+        for player_id in self.__penguin_cells:
             if self.player_can_make_move(player_id):
                 return False
         return True
@@ -239,15 +458,12 @@ class GameState:
 
                 else:
                     canvas.create_polygon(sequence, outline='black', fill='orange')
-                    penguin_on_tile = False
-                    for player_id in self.__penguin_posns:
-                        if self.player_has_penguin_at_pos(player_id, [i, j]):
-                            player_penguin_color = self.__player_penguin_colors[player_id]
-                            penguin = penguin_inst(x1, y1, player_penguin_color)
-                            penguin.draw_penguin(canvas)
-                            penguin_on_tile = True
-                            break
-                    if not penguin_on_tile:
+                    player_id = self.__occupancy.get(self.__get_cell([i, j]))
+                    if player_id is not None:
+                        player_penguin_color = self.__player_penguin_colors[player_id]
+                        penguin = penguin_inst(x1, y1, player_penguin_color)
+                        penguin.draw_penguin(canvas)
+                    else:
                         for y in range(fish_count):
                             fish = fish_inst(x1, y1)
                             fish.draw_fish(canvas, y)
@@ -255,6 +471,36 @@ class GameState:
         canvas.pack()
         root.mainloop()
 
+    def serialize(self):
+        board = self.__board if self.__on_bitboard else BitBoard.from_board(self.__board)
+        penguin_cells = tuple((player_id, tuple(cells)) for player_id, cells in self.__penguin_cells.items())
+        return (board.get_rows(), board.get_columns(), bytes(board.get_fish_counts()), board.get_live_mask(),
+                tuple(self.__player_order), tuple(self.__player_penguin_colors.items()),
+                tuple(self.__player_fish_count.items()), penguin_cells)
+
+    @staticmethod
+    def deserialize(serialized_game_state):
+        rows, columns, fish_counts, live_mask, player_order, player_penguin_colors, player_fish_count, penguin_cells = \
+            serialized_game_state
+        board = BitBoard.from_fish_counts(rows, columns, fish_counts, live_mask)
+        penguin_posns = {player_id: [[cell // columns, cell % columns] if cell >= 0 else [] for cell in cells]
+                         for player_id, cells in penguin_cells}
+        return GameState(board, dict(player_penguin_colors), list(player_order),
+                         player_fish_count=dict(player_fish_count), penguin_posns=penguin_posns)
+
+    def get_hash(self, include_scores=False):
+        """
+        The Zobrist hash (see zobrist.py) of the holes, the penguins and whose turn it is, and of the scores if
+        include_scores is True. Equal positions have equal hashes, and every change to a GameState updates its hash in
+        O(1). Removing tiles from the board directly, rather than through this GameState, is also reflected.
+        """
+        position_hash = self.__board.get_hash() ^ self.__penguin_hash
+        if self.__player_order:
+            position_hash ^= self.__zobrist.get_turn_key(self.__player_order[0])
+        if include_scores:
+            position_hash ^= self.__score_hash
+        return position_hash
+
     def get_board(self):
         return self.__board
 
@@ -268,4 +514,28 @@ class GameState:
         return self.__player_fish_count
 
     def get_penguin_posns(self):
-        return self.__penguin_posns
+        """
+        A Dictionary of the form {player_id: [[row,col]]}, with [] for a penguin that has not been placed yet, built
+        from the penguin cells, so changing it does not change this GameState.
+        """
+        cell_posns = self.__board.get_cell_posns()
+        return {player_id: [list(cell_posns[cell]) if cell >= 0 else [] for cell in cells]
+                for player_id, cells in self.__penguin_cells.items()}
+
+    def get_penguin_cells(self):
+        return self.__penguin_cells
+
+    def get_occupancy(self):
+        return self.__occupancy
+
+    def get_penguin_masks(self):
+        return self.__penguin_masks
+
+    def get_occupied_mask(self):
+        return self.__occupied_mask
+
+    def get_penguin_mobility(self):
+        return self.__penguin_mobility
+
+    def get_player_mobility(self):
+        return self.__player_mobility
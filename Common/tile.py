@@ -18,3 +18,6 @@ class __Tile:
     def set_invisible(self):
         self.__is_visible = False
 
+    def set_visible(self):
+        self.__is_visible = True
+
@@ -0,0 +1,80 @@
+import random
+
+"""
+A ZobristTable holds the random 64-bit keys used to hash a position of a game (see Board.get_hash and
+GameState.get_hash). The hash of a position is the XOR of:
+
+- the hole key of every cell (see board.py) whose tile has been removed,
+- the penguin key of (player_id, cell) for every placed penguin,
+- the turn key of the player whose turn it is,
+- optionally, the score key of (player_id, fish_count) for every player.
+
+Since XOR is its own inverse, removing a tile, moving a penguin, changing a score or changing the turn updates a hash
+in O(1) by XOR-ing the keys that changed in and out.
+
+The keys only depend on the board dimensions and the player ids, and are generated from fixed seeds, so equal positions
+have equal hashes in every process. There is one ZobristTable per board dimensions (see get_zobrist_table), which is
+shared by every Board and GameState of those dimensions, including copies.
+"""
+
+# the seed all the keys are derived from
+ZOBRIST_SEED = 20201014
+
+# the number of bits in a key
+ZOBRIST_KEY_BITS = 64
+
+# {(rows, columns): ZobristTable}, see get_zobrist_table
+ZOBRIST_TABLES = {}
+
+
+def get_zobrist_table(rows, columns):
+    if (rows, columns) not in ZOBRIST_TABLES:
+        ZOBRIST_TABLES[(rows, columns)] = ZobristTable(rows, columns)
+    return ZOBRIST_TABLES[(rows, columns)]
+
+
+class ZobristTable:
+
+    def __init__(self, rows, columns):
+        self.__num_cells = rows * columns
+
+        key_generator = random.Random(hash((ZOBRIST_SEED, rows, columns)))
+        # a List indexed by cell
+        self.__hole_keys = [key_generator.getrandbits(ZOBRIST_KEY_BITS) for _i in range(self.__num_cells)]
+
+        # the keys that depend on a player id are generated the first time that player id is seen
+        # a Dictionary of the form {player_id: [key]}, the List is indexed by cell
+        self.__penguin_keys = {}
+        # a Dictionary of the form {player_id: key}
+        self.__turn_keys = {}
+        # a Dictionary of the form {(player_id, fish_count): key}
+        self.__score_keys = {}
+
+    def __deepcopy__(self, memo):
+        # the keys never change, so copies of Boards and GameStates share their table
+        return self
+
+    def __init_player_keys(self, player_id):
+        key_generator = random.Random(hash((ZOBRIST_SEED, player_id)))
+        self.__turn_keys[player_id] = key_generator.getrandbits(ZOBRIST_KEY_BITS)
+        self.__penguin_keys[player_id] = [key_generator.getrandbits(ZOBRIST_KEY_BITS)
+                                          for _i in range(self.__num_cells)]
+
+    def get_hole_key(self, cell):
+        return self.__hole_keys[cell]
+
+    def get_penguin_key(self, player_id, cell):
+        if player_id not in self.__penguin_keys:
+            self.__init_player_keys(player_id)
+        return self.__penguin_keys[player_id][cell]
+
+    def get_turn_key(self, player_id):
+        if player_id not in self.__turn_keys:
+            self.__init_player_keys(player_id)
+        return self.__turn_keys[player_id]
+
+    def get_score_key(self, player_id, fish_count):
+        if (player_id, fish_count) not in self.__score_keys:
+            key_generator = random.Random(hash((ZOBRIST_SEED, player_id, fish_count)))
+            self.__score_keys[(player_id, fish_count)] = key_generator.getrandbits(ZOBRIST_KEY_BITS)
+        return self.__score_keys[(player_id, fish_count)]
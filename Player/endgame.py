@@ -0,0 +1,267 @@
+import sys
+sys.path.append('../Common')
+from bitboard import BitBoard
+from regions import get_neighbor_masks, flood_fill
+
+# the most free cells a Subgame (see below) can have for an EndgameSolver to solve it
+MAX_SOLITAIRE_CELLS = 16
+
+# the most solitaire positions an EndgameSolver solves per call, see below
+MAX_SOLITAIRE_NODES = 2000
+
+"""
+An EndgameSolver plays the end of a game of Fish perfectly, once the game has broken up into parts that no player can
+change for another player.
+
+A free cell is a cell (row * columns + col, see bitboard.py) whose tile is live and has no penguin on it. A Subgame is a
+tuple of the form (free_mask, penguin_masks), where free_mask is an int bitmask of free cells and penguin_masks is a
+Dictionary of the form {player_id: int bitmask}, the cells of the penguins of each player next to them, such that:
+
+- the free cells are connected to each other through free cells next to each other, or through a penguin next to both,
+- no other free cell is next to them or to their penguins.
+
+Every penguin that can still move is in exactly one Subgame, and only ever moves to its free cells, so a move in one
+Subgame changes nothing in any other one. The Subgames of a position are found within the Regions of its board (see
+regions.py), which holes have already split into parts that cannot reach each other.
+
+A Subgame whose penguins all belong to one player is solitaire: the other players can never move into it, so how many
+fish that player still collects in it only depends on its own moves, and the most it can collect is found by searching
+its moves alone, without any turns of the other players in between. A position is decided when every Subgame of it is
+solitaire. The final score of every player is then known exactly (see solve), and so is the move that gets it
+(see get_best_action).
+
+The solitaire search splits every position it reaches into Subgames again, and solves each one on its own, memoized by
+(free_mask, penguin_mask), so a Subgame is only ever searched once, whichever turn, search or bigger Subgame reaches it.
+Only the solutions for the fish of one board are kept: solving a board with different fish starts over.
+
+A position is not decided if a Subgame has more than max_cells free cells, or if solving it takes more than max_nodes
+new solutions in one call. The solutions found before the limit are kept, so a later call picks up where that one
+stopped, and always finds at least one more.
+"""
+
+
+class SolveLimitReached(Exception):
+    """
+    Raised inside the solitaire search when it has found max_nodes solutions, to abandon the search.
+    """
+    pass
+
+
+class EndgameSolver:
+
+    def __init__(self, max_cells=MAX_SOLITAIRE_CELLS, max_nodes=MAX_SOLITAIRE_NODES):
+        if max_cells < 1:
+            raise ValueError('Max cells must be >= 1')
+        if max_nodes < 1:
+            raise ValueError('Max nodes must be >= 1')
+
+        # an int
+        self.__max_cells = max_cells
+        # an int
+        self.__max_nodes = max_nodes
+        # a tuple of the form (rows, columns, fish), where fish is a bytes object indexed by cell, the board the
+        # solutions are for
+        self.__board_key = None
+        # a Dictionary of the form {(free_mask, penguin_mask): int}, the most fish the penguins on penguin_mask can
+        # still collect in that solitaire Subgame
+        self.__solutions = {}
+        # a Dictionary of the form {(rows, columns): List of int bitmasks}, the cells next to each cell of a board
+        self.__neighbor_masks = {}
+        # how many more solutions the current call can find
+        self.__nodes_left = 0
+        # how many solitaire values were found in the memo, and how many had to be searched
+        self.__hits = 0
+        self.__misses = 0
+
+    def get_subgames(self, game_state):
+        """
+        The Subgames of the position of game_state, a List in no particular order. Penguins that cannot move are in none.
+        """
+        return self.__get_subgames(game_state, game_state.get_board())
+
+    def __get_subgames(self, game_state, board):
+        # board is the board of game_state, which is only asked for once per call, since building the board of a
+        # PersistentGameState takes O(board size) (see persistent_state.py)
+        neighbor_table = board.get_neighbor_table()
+        neighbor_masks = self.__get_neighbor_masks(board)
+        occupied_mask = game_state.get_occupied_mask()
+        free_mask = board.get_live_mask() & ~occupied_mask
+        penguin_masks = game_state.get_penguin_masks()
+
+        subgames = []
+        for region in board.get_regions():
+            for subgame_mask, subgame_penguin_mask in self.__split(neighbor_table, neighbor_masks, region & free_mask,
+                                                                   region & occupied_mask):
+                subgames.append((subgame_mask, {player_id: penguin_mask & subgame_penguin_mask
+                                                for player_id, penguin_mask in penguin_masks.items()
+                                                if penguin_mask & subgame_penguin_mask}))
+        return subgames
+
+    @staticmethod
+    def __split(neighbor_table, neighbor_masks, free_mask, penguin_mask):
+        """
+        Splits the free cells of free_mask and the penguins on penguin_mask into Subgames, a List of tuples of the form
+        (free_mask, penguin_mask). Penguins that have no free cell next to them are left out.
+        """
+        # the free cells, split into the parts that are connected without going through a penguin
+        components = []
+        remaining_mask = free_mask
+        while remaining_mask:
+            start_cell = (remaining_mask & -remaining_mask).bit_length() - 1
+            component = flood_fill(neighbor_table, start_cell, remaining_mask)
+            components.append(component)
+            remaining_mask &= ~component
+
+        # a penguin joins the parts next to it into one Subgame
+        subgames = []
+        while penguin_mask:
+            cell_bit = penguin_mask & -penguin_mask
+            penguin_mask ^= cell_bit
+            neighbor_mask = neighbor_masks[cell_bit.bit_length() - 1]
+            joined_mask = 0
+            for component in components:
+                if component & neighbor_mask:
+                    joined_mask |= component
+            if not joined_mask:
+                continue
+            joined_penguin_mask = cell_bit
+            for i in range(len(subgames) - 1, -1, -1):
+                if subgames[i][0] & joined_mask:
+                    subgame_mask, subgame_penguin_mask = subgames.pop(i)
+                    joined_mask |= subgame_mask
+                    joined_penguin_mask |= subgame_penguin_mask
+            subgames.append((joined_mask, joined_penguin_mask))
+        return subgames
+
+    def solve(self, game_state):
+        """
+        The final scores of the game of game_state, a Dictionary of the form {player_id: fish_count}, if its position
+        is decided and every player makes the most of it, otherwise None. Every position of a game that is over is
+        decided.
+        """
+        return self.__solve(game_state, game_state.get_board())
+
+    def __solve(self, game_state, board):
+        if not game_state.is_placement_phase_over():
+            return None
+
+        subgames = self.__get_subgames(game_state, board)
+        for free_mask, penguin_masks in subgames:
+            if len(penguin_masks) > 1 or bin(free_mask).count('1') > self.__max_cells:
+                return None
+
+        final_scores = dict(game_state.get_player_fish_count())
+        self.__start_solving(board)
+        try:
+            for free_mask, penguin_masks in subgames:
+                (player_id, penguin_mask), = penguin_masks.items()
+                final_scores[player_id] += self.__get_solitaire_value(board, free_mask, penguin_mask)
+        except SolveLimitReached:
+            return None
+        return final_scores
+
+    def get_best_action(self, game_state):
+        """
+        If the position of game_state is decided, the Action that gets the player whose turn it is its final score
+        (see solve), with the same tiebreaker as Strategy (see strategy.py), or the empty Action () if it cannot move.
+        Otherwise None.
+        """
+        board = game_state.get_board()
+        if self.__solve(game_state, board) is None:
+            return None
+
+        player_id = game_state.get_player_order()[0]
+        fish = self.__board_key[2]
+        rays = board.get_rays()
+        optimal_actions = []
+        # every position after a move of a decided position was solved along with it
+        for free_mask, penguin_masks in self.__get_subgames(game_state, board):
+            penguin_mask = penguin_masks.get(player_id, 0)
+            if not penguin_mask:
+                continue
+            subgame_value = self.__get_solitaire_value(board, free_mask, penguin_mask)
+            for start_cell, dest_cell in self.__get_moves(rays, free_mask, penguin_mask):
+                value = fish[start_cell] + self.__get_solitaire_value(
+                    board, free_mask & ~(1 << dest_cell), penguin_mask ^ (1 << start_cell) | 1 << dest_cell)
+                if value == subgame_value:
+                    optimal_actions.append((tuple(board.get_posn(start_cell)), tuple(board.get_posn(dest_cell))))
+        # Strategy breaks ties by the smallest start posn, then the smallest dest posn
+        return min(optimal_actions) if optimal_actions else ()
+
+    @staticmethod
+    def __get_moves(rays, free_mask, penguin_mask):
+        # the moves of the penguins on penguin_mask to the free cells of free_mask, tuples of the form
+        # (start_cell, dest_cell)
+        moves = []
+        while penguin_mask:
+            start_cell = (penguin_mask & -penguin_mask).bit_length() - 1
+            penguin_mask &= penguin_mask - 1
+            for ray in rays[start_cell]:
+                for dest_cell in ray:
+                    if not free_mask >> dest_cell & 1:
+                        break
+                    moves.append((start_cell, dest_cell))
+        return moves
+
+    def __get_solitaire_value(self, board, free_mask, penguin_mask):
+        # the most fish the penguins on penguin_mask can still collect with the free cells of free_mask to themselves,
+        # the sum over the Subgames they split into
+        neighbor_table = board.get_neighbor_table()
+        neighbor_masks = self.__get_neighbor_masks(board)
+        value = 0
+        for subgame_mask, subgame_penguin_mask in self.__split(neighbor_table, neighbor_masks, free_mask, penguin_mask):
+            value += self.__solve_subgame(board, subgame_mask, subgame_penguin_mask)
+        return value
+
+    def __solve_subgame(self, board, free_mask, penguin_mask):
+        key = (free_mask, penguin_mask)
+        value = self.__solutions.get(key)
+        if value is not None:
+            self.__hits += 1
+            return value
+
+        self.__misses += 1
+        if self.__nodes_left <= 0:
+            raise SolveLimitReached()
+        fish = self.__board_key[2]
+        value = 0
+        for start_cell, dest_cell in self.__get_moves(board.get_rays(), free_mask, penguin_mask):
+            value = max(value, fish[start_cell] + self.__get_solitaire_value(
+                board, free_mask & ~(1 << dest_cell), penguin_mask ^ (1 << start_cell) | 1 << dest_cell))
+        self.__solutions[key] = value
+        self.__nodes_left -= 1
+        return value
+
+    def __start_solving(self, board):
+        # resets the node limit, and the solutions if they are for other fish than the ones of the board
+        self.__nodes_left = self.__max_nodes
+        if isinstance(board, BitBoard):
+            fish = bytes(board.get_fish_counts())
+        else:
+            fish = bytes(board.get_fish_count(board.get_posn(cell))
+                         for cell in range(board.get_rows() * board.get_columns()))
+        board_key = (board.get_rows(), board.get_columns(), fish)
+        if board_key != self.__board_key:
+            self.__board_key = board_key
+            self.__solutions = {}
+
+    def __get_neighbor_masks(self, board):
+        board_size = (board.get_rows(), board.get_columns())
+        if board_size not in self.__neighbor_masks:
+            self.__neighbor_masks[board_size] = get_neighbor_masks(board.get_neighbor_table())
+        return self.__neighbor_masks[board_size]
+
+    def get_max_cells(self):
+        return self.__max_cells
+
+    def get_max_nodes(self):
+        return self.__max_nodes
+
+    def get_solutions(self):
+        return self.__solutions
+
+    def get_hits(self):
+        return self.__hits
+
+    def get_misses(self):
+        return self.__misses
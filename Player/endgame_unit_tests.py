@@ -0,0 +1,119 @@
+import unittest
+import sys
+import copy
+from endgame import EndgameSolver
+sys.path.append('../Common')
+from board import Board
+from state import GameState
+from persistent_state import PersistentGameState
+from tile import __Tile as tile_inst
+
+
+def create_decided_state():
+    # the penguins of player 2 can only reach [0, 0], [2, 0] and [2, 1], and the ones of player 1 can only reach
+    # [0, 2] and [1, 2]
+    board = Board(3, 4, {1: [1, 3], 2: [3]}, num_of_fish_per_tile=1)
+    board.get_tiles()[2][0] = tile_inst(5)
+    board.get_tiles()[0][2] = tile_inst(4)
+    return GameState(board, {1: "black", 2: "white"}, [1, 2],
+                     penguin_posns={1: [[2, 2], [0, 3]], 2: [[0, 1], [1, 0]]})
+
+
+class TestEndgameSolver(unittest.TestCase):
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            EndgameSolver(max_cells=0)
+        with self.assertRaises(ValueError):
+            EndgameSolver(max_nodes=0)
+
+    def test_get_subgames(self):
+        state = create_decided_state()
+        subgames = EndgameSolver().get_subgames(state)
+        # cells are row * 4 + col
+        assert sorted(subgames, key=lambda subgame: subgame[0]) == \
+            [(0b1000100, {1: 0b10000001000}), (0b1100000001, {2: 0b10010})]
+
+        # the penguins next to the two free tiles, [1, 2], [1, 3] and [1, 4], share one Subgame, the others are stuck
+        board = Board(2, 5, {}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        assert EndgameSolver().get_subgames(state) == [(0b11000, {1: 0b100000000, 2: 0b1010000000})]
+
+    def test_solve(self):
+        solver = EndgameSolver()
+        state = create_decided_state()
+        assert solver.solve(state) == {1: 5, 2: 7}
+        # the BitBoard copy of the state has the same fish, so its Subgames are already solved
+        misses = solver.get_misses()
+        assert solver.solve(GameState.deserialize(state.serialize())) == {1: 5, 2: 7}
+        assert solver.get_misses() == misses
+        # moving off the tile with 4 fish first strands the other penguin of player 1
+        state.move_avatar(1, [0, 3], [1, 2])
+        assert solver.solve(state) == {1: 2, 2: 7}
+
+        # a Subgame with penguins of both players is not decided, and neither is the placement phase
+        board = Board(2, 5, {}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        assert solver.solve(state) is None
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2])
+        assert solver.solve(state) is None
+
+        # a game that is over is decided
+        board = Board(2, 5, {0: [4], 1: [4]}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2], player_fish_count={1: 3, 2: 4},
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [0, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 3]]})
+        assert state.is_game_over()
+        assert solver.solve(state) == {1: 3, 2: 4}
+        assert solver.get_best_action(state) == ()
+
+    def test_persistent_state(self):
+        # tests that a PersistentGameState has the same Subgames, final scores and best Action as its GameState
+        solver = EndgameSolver()
+        state = create_decided_state()
+        persistent_state = PersistentGameState.from_game_state(state)
+        assert persistent_state.get_penguin_masks() == state.get_penguin_masks()
+        assert sorted(solver.get_subgames(persistent_state), key=lambda subgame: subgame[0]) == \
+            sorted(solver.get_subgames(state), key=lambda subgame: subgame[0])
+        assert solver.solve(persistent_state) == {1: 5, 2: 7}
+        assert solver.get_best_action(persistent_state) == ((2, 2), (0, 2))
+
+    def test_get_best_action(self):
+        # tests that playing the Actions of the solver gets every player the final score of solve
+        solver = EndgameSolver()
+        state = create_decided_state()
+        final_scores = solver.solve(state)
+        assert solver.get_best_action(state) == ((2, 2), (0, 2))
+        while not state.is_game_over():
+            action = solver.get_best_action(state)
+            player_id = state.get_player_order()[0]
+            if action == ():
+                assert state.skip_turn(player_id)
+            else:
+                assert state.is_legal_action(player_id, action)
+                state.move_avatar(player_id, list(action[0]), list(action[1]))
+        assert state.get_player_fish_count() == final_scores
+
+        board = Board(2, 5, {}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        assert solver.get_best_action(state) is None
+
+    def test_limits(self):
+        state = create_decided_state()
+        assert EndgameSolver(max_cells=2).solve(state) is None
+
+        # the positions solved before the node limit are kept, so repeated calls finish the search
+        solver = EndgameSolver(max_nodes=1)
+        calls = 1
+        while solver.solve(copy.deepcopy(state)) is None:
+            calls += 1
+        assert calls > 1
+        assert solver.solve(state) == {1: 5, 2: 7}
+        assert solver.get_max_nodes() == 1
+        assert len(solver.get_solutions()) >= calls
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+"""
+A MoveOrderer sorts the Actions of a position before Strategy searches them. Alpha-beta pruning (see strategy.py) cuts
+off the rest of a node's Actions as soon as one of them is good enough, so the sooner the best Action is searched the
+more of the tree is pruned. Ordering never changes the result of a search, only how many nodes it visits.
+
+Actions are sorted by these signals, each one only breaking the ties of the ones before it:
+
+- the best Action stored for the position in the TranspositionTable (see transposition_table.py), if any,
+- the killer Actions of the ply: the last KILLERS_PER_PLY Actions that caused a cutoff at the same distance from the
+  root, since positions at the same ply are often similar,
+- the history score of the Action: the sum of depth * depth over every cutoff it caused, in any position,
+- the number of fish on the tile the penguin leaves, which is what the move scores,
+- the mobility of the destination: how many tiles next to it are free, since a penguin with nowhere to go scores nothing
+  afterwards.
+
+Actions that tie on every signal stay in the order they were given in, which is the order of the edges of a GameTree
+node (see game_tree.py).
+
+A ply is an int, how many Actions a position is from the root of the search. An Action is a tuple of the form
+((start_row, start_col), (dest_row, dest_col)), see game_tree.py. Killers and history scores are keyed by Action.
+
+A MoveOrderer is meant to be kept by one Player across all the searches it does: killers only make sense within one
+search, so they are cleared by start_search, but history scores carry over, halved each time so that old cutoffs count
+for less than new ones.
+"""
+
+# how many killer Actions are remembered for each ply
+KILLERS_PER_PLY = 2
+
+
+class MoveOrderer:
+
+    def __init__(self):
+        # a Dictionary of the form {ply: [action]}, most recent first, at most KILLERS_PER_PLY Actions per ply
+        self.__killers = {}
+        # a Dictionary of the form {action: history_score}
+        self.__history = {}
+
+    def start_search(self):
+        self.__killers = {}
+        self.__history = {action: score // 2 for action, score in self.__history.items() if score > 1}
+
+    def order_actions(self, game_state, actions, ply, best_action=None):
+        """
+        Returns the given Actions of game_state, sorted so that the ones most likely to cause a cutoff come first.
+        best_action is the best Action stored for game_state in a TranspositionTable, or None.
+        """
+        if len(actions) < 2:
+            return actions
+
+        killers = self.__killers.get(ply, [])
+
+        def sort_key(action):
+            start_posn, dest_posn = action
+            return (action == best_action,
+                    action in killers,
+                    self.__history.get(action, 0),
+                    game_state.get_fish_count(start_posn),
+                    len(game_state.get_all_reachable_dests_help(dest_posn, False)))
+
+        return sorted(actions, key=sort_key, reverse=True)
+
+    def record_cutoff(self, action, ply, depth):
+        """
+        Records that action caused a cutoff at the given ply, in a search with depth turns left.
+        """
+        if action == ():
+            return
+        killers = self.__killers.setdefault(ply, [])
+        if action in killers:
+            killers.remove(action)
+        killers.insert(0, action)
+        del killers[KILLERS_PER_PLY:]
+        self.__history[action] = self.__history.get(action, 0) + depth * depth
+
+    def get_killers(self, ply):
+        return list(self.__killers.get(ply, []))
+
+    def get_history_score(self, action):
+        return self.__history.get(action, 0)
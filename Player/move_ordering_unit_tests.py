@@ -0,0 +1,55 @@
+import unittest
+import sys
+from move_ordering import MoveOrderer, KILLERS_PER_PLY
+sys.path.append('../Common')
+from board import Board
+from state import GameState
+from tile import __Tile as tile_inst
+
+
+class TestMoveOrderer(unittest.TestCase):
+
+    def test_order_actions_fish_and_mobility(self):
+        # tests that without cutoffs, moves off tiles with more fish come first, then moves to more mobile tiles,
+        # and the rest keep their order
+        board = Board(4, 5, {}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        board.get_tiles()[0][2] = tile_inst(5)
+        actions = state.get_legal_actions()
+        ordered_actions = MoveOrderer().order_actions(state, actions, 0)
+        assert sorted(ordered_actions) == sorted(actions)
+        assert ordered_actions[0] == ((0, 2), (2, 2))
+        mobilities = [len(state.get_all_reachable_dests_help(action[1], False)) for action in ordered_actions[1:]]
+        assert mobilities == sorted(mobilities, reverse=True)
+        assert ordered_actions[-4:] == [((0, 0), (2, 0)), ((1, 3), (0, 4)), ((1, 3), (3, 4)), ((1, 3), (0, 3))]
+
+    def test_order_actions_table_action_and_killers(self):
+        # tests that the table's best action comes first, then the killers of the ply, then the history scores
+        board = Board(2, 5, {}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        actions = state.get_legal_actions()
+        move_orderer = MoveOrderer()
+        move_orderer.record_cutoff(actions[-1], 1, 1)
+        move_orderer.record_cutoff(actions[-2], 3, 2)
+        assert move_orderer.order_actions(state, actions, 1)[0] == actions[-1]
+        assert move_orderer.order_actions(state, actions, 1, best_action=actions[0])[:2] == [actions[0], actions[-1]]
+        # at ply 2 there are no killers, so the higher history score of actions[-2] wins
+        assert move_orderer.order_actions(state, actions, 2)[0] == actions[-2]
+
+    def test_record_cutoff(self):
+        move_orderer = MoveOrderer()
+        actions = [((0, 0), (i, 0)) for i in range(KILLERS_PER_PLY + 1)]
+        for action in actions:
+            move_orderer.record_cutoff(action, 0, 3)
+        move_orderer.record_cutoff((), 0, 3)
+        assert move_orderer.get_killers(0) == list(reversed(actions))[:KILLERS_PER_PLY]
+        assert move_orderer.get_history_score(actions[0]) == 9
+        move_orderer.start_search()
+        assert move_orderer.get_killers(0) == []
+        assert move_orderer.get_history_score(actions[0]) == 4
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,164 @@
+import sys
+sys.path.append('../Common')
+import heapq
+from bitboard import BitBoard
+
+# the orders a PlacementEngine can place penguins in, see below
+ZIG_ZAG_PLACEMENT = "zig_zag"
+VALUE_PLACEMENT = "value"
+
+"""
+A PlacementEngine picks the Placements of a Player during the placement phase. A Placement is a List of the form
+[row, col], see board.py for details on the coordinate system. Cells are row * columns + col, see bitboard.py, and a
+free cell is one whose tile is live and has no penguin on it.
+
+It places penguins in one of two orders:
+
+- ZIG_ZAG_PLACEMENT: the first free cell going through every row from left to right, top row first, like
+  Strategy.zig_zag,
+- VALUE_PLACEMENT: the free cell with the highest value, the first one in zig-zag order if several tie.
+
+The value of a free cell is the fish on its tile plus the fish on every tile a penguin placed there could reach, in
+other words the fish of the free cells along each of its rays (see board.py), up to the first cell that is not free.
+
+A PlacementEngine is meant to be kept by one Player for a whole placement phase. It remembers the free cells, and the
+values, of the last position it was asked about, and when it is asked about the next one it only takes the penguins
+placed since then into account:
+
+- a penguin placed on a cell only lowers the values of the free cells behind it on its rays, by what they could reach
+  through it, and every other value stays the same,
+- zig-zag order never has to look at a cell twice, since a cell that is not free stays that way during the placement
+  phase,
+- in value order, free cells are kept in buckets by value, each bucket a heap of cells, and values only ever go down,
+  so the highest bucket that is not empty is never above the one of the last Placement.
+
+It starts over whenever the position it is asked about does not follow from the last one, for example in a new game,
+after a Player is removed, or when it is given a copy of the board, which is what happens when the Referee calls its
+Players with a timeout (see referee.py).
+"""
+
+
+class PlacementEngine:
+
+    def __init__(self, mode=ZIG_ZAG_PLACEMENT):
+        if mode not in (ZIG_ZAG_PLACEMENT, VALUE_PLACEMENT):
+            raise ValueError(f'Mode must be one of {ZIG_ZAG_PLACEMENT}, {VALUE_PLACEMENT}')
+
+        self.__mode = mode
+        # the Board or BitBoard of the last position, its int bitmask of live cells, and the int bitmask of the cells
+        # its penguins were on
+        self.__board = None
+        self.__live_mask = 0
+        self.__occupied_mask = 0
+        # an int bitmask of the free cells of the last position
+        self.__free_mask = 0
+        # the first cell zig-zag order has not gone past yet
+        self.__next_cell = 0
+        # Lists indexed by cell, of the fish on each tile, and of the fish along each of the six rays out of each free
+        # cell, up to the first cell that is not free (only in value order)
+        self.__fish = []
+        self.__ray_fish = []
+        # a List indexed by cell of the value of each free cell (only in value order)
+        self.__values = []
+        # a List indexed by value of heaps of the free cells with that value, which may also still hold cells that
+        # are no longer free or whose value went down since, and the highest value that can have a free cell
+        self.__buckets = []
+        self.__top_value = -1
+
+    def place_avatar(self, game_state):
+        """
+        The Placement of the next penguin of the player whose turn it is in game_state, or None if no cell is free.
+        """
+        board = game_state.get_board()
+        occupied_mask = game_state.get_occupied_mask()
+        if board is not self.__board or board.get_live_mask() != self.__live_mask or \
+                occupied_mask & self.__occupied_mask != self.__occupied_mask:
+            self.__start(board, occupied_mask)
+        else:
+            placed_mask = occupied_mask & ~self.__occupied_mask
+            while placed_mask:
+                cell = (placed_mask & -placed_mask).bit_length() - 1
+                placed_mask &= placed_mask - 1
+                self.__block_cell(cell)
+            self.__occupied_mask = occupied_mask
+
+        cell = self.__next_zig_zag_cell() if self.__mode == ZIG_ZAG_PLACEMENT else self.__next_value_cell()
+        return board.get_posn(cell) if cell is not None else None
+
+    def __start(self, board, occupied_mask):
+        self.__board = board
+        self.__live_mask = board.get_live_mask()
+        self.__occupied_mask = occupied_mask
+        self.__free_mask = self.__live_mask & ~occupied_mask
+        self.__next_cell = 0
+        if self.__mode == ZIG_ZAG_PLACEMENT:
+            return
+
+        num_of_cells = board.get_rows() * board.get_columns()
+        if isinstance(board, BitBoard):
+            self.__fish = list(board.get_fish_counts())
+        else:
+            self.__fish = [board.get_fish_count(board.get_posn(cell)) for cell in range(num_of_cells)]
+        self.__ray_fish = [[0] * 6 for _cell in range(num_of_cells)]
+        self.__values = [0] * num_of_cells
+        rays = board.get_rays()
+        for cell in range(num_of_cells):
+            if not self.__free_mask >> cell & 1:
+                continue
+            for d, ray in enumerate(rays[cell]):
+                for ray_cell in ray:
+                    if not self.__free_mask >> ray_cell & 1:
+                        break
+                    self.__ray_fish[cell][d] += self.__fish[ray_cell]
+            self.__values[cell] = self.__fish[cell] + sum(self.__ray_fish[cell])
+
+        self.__top_value = max(self.__values)
+        self.__buckets = [[] for _value in range(self.__top_value + 1)]
+        # cells are pushed in increasing order, so every bucket is already a heap
+        for cell in range(num_of_cells):
+            if self.__free_mask >> cell & 1:
+                self.__buckets[self.__values[cell]].append(cell)
+
+    def __block_cell(self, cell):
+        # a penguin was placed on cell, which was free
+        self.__free_mask &= ~(1 << cell)
+        if self.__mode == ZIG_ZAG_PLACEMENT:
+            return
+
+        rays = self.__board.get_rays()
+        for d, ray in enumerate(rays[cell]):
+            # the free cells behind cell on its ray d (the opposite one, d + 3) could reach the fish of cell, and what
+            # cell itself could reach on ray d, which they no longer can
+            lost_fish = self.__fish[cell] + self.__ray_fish[cell][d]
+            for behind_cell in rays[cell][(d + 3) % 6]:
+                if not self.__free_mask >> behind_cell & 1:
+                    break
+                self.__ray_fish[behind_cell][d] -= lost_fish
+                self.__values[behind_cell] -= lost_fish
+                heapq.heappush(self.__buckets[self.__values[behind_cell]], behind_cell)
+
+    def __next_zig_zag_cell(self):
+        num_of_cells = self.__board.get_rows() * self.__board.get_columns()
+        while self.__next_cell < num_of_cells and not self.__free_mask >> self.__next_cell & 1:
+            self.__next_cell += 1
+        return self.__next_cell if self.__next_cell < num_of_cells else None
+
+    def __next_value_cell(self):
+        while self.__top_value >= 0:
+            bucket = self.__buckets[self.__top_value]
+            while bucket:
+                cell = bucket[0]
+                if self.__free_mask >> cell & 1 and self.__values[cell] == self.__top_value:
+                    return cell
+                heapq.heappop(bucket)
+            self.__top_value -= 1
+        return None
+
+    def get_value_map(self):
+        """
+        A Dictionary of the form {cell: value} of the free cells of the last position, only in value order.
+        """
+        return {cell: self.__values[cell] for cell in range(len(self.__values)) if self.__free_mask >> cell & 1}
+
+    def get_mode(self):
+        return self.__mode
@@ -0,0 +1,99 @@
+import unittest
+import sys
+import random
+from placement import PlacementEngine, ZIG_ZAG_PLACEMENT, VALUE_PLACEMENT
+sys.path.append('../Common')
+from board import Board
+from state import GameState
+from tile import __Tile as tile_inst
+
+
+def get_values(game_state):
+    # the value of every free cell worked out from scratch, a Dictionary of the form {cell: value}
+    board = game_state.get_board()
+    values = {}
+    for cell in range(board.get_rows() * board.get_columns()):
+        posn = board.get_posn(cell)
+        if board.is_hole(posn) or not game_state.is_unoccupied(posn):
+            continue
+        values[cell] = board.get_fish_count(posn) + \
+            sum(board.get_fish_count(dest_posn) for dest_posn in game_state.get_all_reachable_dests_help(posn, True))
+    return values
+
+
+def place_all_penguins(game_state, engines):
+    # places every penguin, each player with its own PlacementEngine, and returns the Placements in order
+    placements = []
+    while not game_state.is_placement_phase_over():
+        player_id = game_state.get_player_order()[0]
+        placement = engines[player_id].place_avatar(game_state)
+        placements.append(placement)
+        game_state.place_avatar(player_id, placement)
+    return placements
+
+
+class TestPlacementEngine(unittest.TestCase):
+
+    def test_invalid_input(self):
+        with self.assertRaises(ValueError):
+            PlacementEngine("hello")
+        assert PlacementEngine().get_mode() == ZIG_ZAG_PLACEMENT
+
+    def test_zig_zag(self):
+        # tests that every Placement is the first free tile in zig-zag order, as with Strategy.zig_zag
+        board = Board(3, 4, {0: [0, 2], 1: [1]}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2])
+        placements = place_all_penguins(state, {1: PlacementEngine(), 2: PlacementEngine()})
+        assert placements == [[0, 1], [0, 3], [1, 0], [1, 2], [1, 3], [2, 0], [2, 1], [2, 2]]
+
+        board = Board(2, 5, {1: [3, 4]}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [0, 3]], 2: [[0, 4], [1, 0], [1, 1], [1, 2]]})
+        assert PlacementEngine().place_avatar(state) is None
+
+    def test_value(self):
+        # tests that every Placement is on a free tile with the highest value, and that the values kept up to date
+        # from one Placement to the next are the ones worked out from scratch
+        random.seed(2)
+        board = Board(4, 5, {1: [2], 3: [0]})
+        state = GameState(board, {1: "black", 2: "white", 3: "red"}, [1, 2, 3])
+        engines = {1: PlacementEngine(VALUE_PLACEMENT), 2: PlacementEngine(VALUE_PLACEMENT),
+                   3: PlacementEngine(VALUE_PLACEMENT)}
+        while not state.is_placement_phase_over():
+            player_id = state.get_player_order()[0]
+            engine = engines[player_id]
+            placement = engine.place_avatar(state)
+            values = get_values(state)
+            assert engine.get_value_map() == values
+            best_value = max(values.values())
+            assert board.get_cell(placement) == min(cell for cell in values if values[cell] == best_value)
+            state.place_avatar(player_id, placement)
+
+        # [0, 4] has 1 fish, but can reach the 5 fish of [1, 4] as well as [1, 3], so it beats [1, 4] itself
+        board = Board(2, 5, {}, num_of_fish_per_tile=1)
+        board.get_tiles()[1][4] = tile_inst(5)
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2])
+        engine = PlacementEngine(VALUE_PLACEMENT)
+        assert engine.get_mode() == VALUE_PLACEMENT
+        assert engine.place_avatar(state) == [0, 4]
+        assert engine.get_value_map()[9] == 6
+
+    def test_start_over(self):
+        # tests that a position that does not follow from the last one, or is on another board, is worked out again
+        board = Board(3, 4, {}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[0, 0], [1, 1], [], []], 2: [[2, 2], [0, 3], [], []]})
+        engine = PlacementEngine(VALUE_PLACEMENT)
+        engine.place_avatar(state)
+        state.remove_player(2)
+        engine.place_avatar(state)
+        assert engine.get_value_map() == get_values(state)
+
+        copied_state = GameState.deserialize(state.serialize())
+        copied_state.place_avatar(1, [2, 3])
+        engine.place_avatar(copied_state)
+        assert engine.get_value_map() == get_values(copied_state)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,8 +1,25 @@
-from strategy import Strategy
+from strategy import Strategy, MCTSStrategy
+from transposition_table import TranspositionTable
+from move_ordering import MoveOrderer
+from game_tree import GameTree
+from endgame import EndgameSolver
+from placement import PlacementEngine, ZIG_ZAG_PLACEMENT
+from state import GameState
+import random
 
 # how many turns to look ahead in the game tree when determining the best action to take
 TURNS_LOOK_AHEAD = 2
 
+# how many playouts an MCTSStrategy plays when determining the best action to take, if there is no time budget
+MCTS_PLAYOUTS = 1000
+
+# the most nodes the GameTree a Player keeps between turns holds a GameState for, see game_tree.py
+GAME_TREE_MAX_NODES = 2 ** 15
+
+# the ways a Player can search for its moves, see below
+MINIMAX_SEARCH = "minimax"
+MCTS_SEARCH = "mcts"
+
 """
 A Player is an object that exists to provide the game-playing logic of placing and moving avatars, so the Referee will
 call the player interface methods at the appropriate time. 
@@ -13,26 +30,157 @@ An Action is a tuple of the form ((start_row, start_col), (dest_row, dest_col)).
 Where *row, and *col are both ints. (start_row, start_col) is the current location of a penguin, and (dest_row, dest_col) 
 is the location that the penguin wants to go to. See board.py for details on the coordinate system. An empty Action, 
 representing a time when a Player cannot make a move, is of the form ().
+
+A Player keeps one TranspositionTable (see transposition_table.py) for all of its move searches, so positions it has
+already searched in earlier turns are not searched again. It also keeps one MoveOrderer (see move_ordering.py), so the
+Actions that caused cutoffs in earlier turns are searched first. And it keeps one EndgameSolver (see endgame.py), so
+once the game is decided it plays perfectly without searching, and every Subgame it solved stays solved.
+
+The hashes the TranspositionTable and the GameTree below are keyed by (see zobrist.py) do not cover the fish on the
+tiles, so both are only kept within one game: a Player forgets them when a game starts or ends, and whenever it is
+asked to move on a board with other fish than the last one, like EndgameSolver does with its solutions, so a Player
+that is reused for another game on a board of the same size never reads what it stored during the last one.
+
+A Player that searches with a Strategy also keeps the GameTree it searched (see game_tree.py), which merges
+transpositions and holds at most GAME_TREE_MAX_NODES GameStates. When it is asked for its next move, it looks for the
+position it is given among the nodes its last search created, and if it finds it, makes it the root of the tree and
+searches from there, so the nodes below it are not created again. Otherwise it starts a new GameTree. The tree is on a
+BitBoard copy of the position it is given (see GameState.serialize), which makes its nodes cheap to create.
+
+A Player can optionally be given a time_budget, a number of seconds. It then searches for its moves for about that long
+(see Strategy.which_action_to_take_within) instead of looking TURNS_LOOK_AHEAD turns ahead, so the time it takes per move
+does not depend on the board.
+
+A Player can also optionally be given an executor, a concurrent.futures Executor (typically a ProcessPoolExecutor shared
+by many Players). When it has no time_budget, it then searches the Actions of its moves in parallel in that executor
+(see Strategy.which_action_to_take_in_parallel), which picks the same Actions, only sooner on a machine with idle cores.
+
+A Player searches with a Strategy by default (MINIMAX_SEARCH). With search=MCTS_SEARCH it searches with an MCTSStrategy
+instead (see strategy.py), which plays MCTS_PLAYOUTS playouts per move, or plays playouts for time_budget seconds if it
+has one. That is meant for large boards, where looking TURNS_LOOK_AHEAD turns ahead takes too long. A Player can be
+given a seed, from which it seeds the MCTSStrategy of each of its moves, so a Player with a seed and no time_budget
+always picks the same moves in the same game.
+
+A Player places its penguins with a PlacementEngine (see placement.py) that it keeps for the whole placement phase, in
+zig-zag order by default (ZIG_ZAG_PLACEMENT, like Strategy.zig_zag), or on the tiles with the most fish within reach
+with placement=VALUE_PLACEMENT.
 """
 
 
 class Player:
 
-    def __init__(self, player_id):
+    def __init__(self, player_id, time_budget=None, executor=None, search=MINIMAX_SEARCH,
+                 placement=ZIG_ZAG_PLACEMENT, seed=None):
+        if search not in (MINIMAX_SEARCH, MCTS_SEARCH):
+            raise ValueError(f'Search must be one of {MINIMAX_SEARCH}, {MCTS_SEARCH}')
+
         self.__player_id = player_id
+        self.__search = search
+        self.__time_budget = time_budget
+        self.__executor = executor
+        self.__seed = seed
+        # draws the seed of the MCTSStrategy of each move
+        self.__random = random.Random(seed)
         self.__game_is_ongoing = False
+        self.__transposition_table = TranspositionTable()
+        self.__move_orderer = MoveOrderer()
+        self.__endgame_solver = EndgameSolver()
+        self.__placement_engine = PlacementEngine(placement)
+        # the GameTree of the last search, None before the first one of a game
+        self.__game_tree = None
+        # a tuple of the form (rows, columns, fish), where fish is a bytes object indexed by cell, the board that the
+        # TranspositionTable and the GameTree are for, None before the first move of a game
+        self.__board_key = None
 
     def game_has_started(self):
         self.__game_is_ongoing = True
+        self.__forget_game()
 
     def game_has_ended(self):
         self.__game_is_ongoing = False
+        self.__forget_game()
+
+    def __forget_game(self):
+        # drops everything this player learned about the positions of one game, see above
+        self.__transposition_table.clear()
+        self.__game_tree = None
+        self.__board_key = None
+
+    def __check_board(self, current_game_state):
+        # forgets the last game if current_game_state is on a board with other fish
+        board = current_game_state.get_board()
+        fish = bytes(board.get_fish_count(board.get_posn(cell))
+                     for cell in range(board.get_rows() * board.get_columns()))
+        board_key = (board.get_rows(), board.get_columns(), fish)
+        if board_key != self.__board_key:
+            self.__forget_game()
+            self.__board_key = board_key
 
     def place_avatar(self, current_game_state):
-        return Strategy(current_game_state, self.__player_id).zig_zag()
+        return self.__placement_engine.place_avatar(current_game_state)
 
     def move_avatar(self, current_game_state):
-        return Strategy(current_game_state, self.__player_id).which_action_to_take(TURNS_LOOK_AHEAD)
+        self.__check_board(current_game_state)
+        if self.__search == MCTS_SEARCH:
+            return self.__move_avatar_mcts(current_game_state)
+        if self.__time_budget is None and self.__executor is not None:
+            strategy = Strategy(current_game_state, self.__player_id, endgame_solver=self.__endgame_solver)
+            return strategy.which_action_to_take_in_parallel(TURNS_LOOK_AHEAD, executor=self.__executor)
+        strategy = Strategy(current_game_state, self.__player_id, transposition_table=self.__transposition_table,
+                            move_orderer=self.__move_orderer, game_tree=self.__reroot_game_tree(current_game_state),
+                            endgame_solver=self.__endgame_solver)
+        if self.__time_budget is None:
+            return strategy.which_action_to_take(TURNS_LOOK_AHEAD)
+        return strategy.which_action_to_take_within(self.__time_budget)
+
+    def __reroot_game_tree(self, current_game_state):
+        position_hash = current_game_state.get_hash(include_scores=True)
+        # since the last search, this player and every other player took one turn
+        max_depth = len(current_game_state.get_player_order())
+        node = self.__game_tree.find_descendant(position_hash, max_depth) if self.__game_tree is not None else None
+        if node is not None:
+            node.reroot()
+            self.__game_tree = node
+        else:
+            self.__game_tree = GameTree(GameState.deserialize(current_game_state.serialize()),
+                                        max_nodes=GAME_TREE_MAX_NODES, merge_transpositions=True)
+        return self.__game_tree
+
+    def __move_avatar_mcts(self, current_game_state):
+        if self.__time_budget is None:
+            mcts_strategy = MCTSStrategy(current_game_state, self.__player_id, num_playouts=MCTS_PLAYOUTS,
+                                         seed=self.__random.getrandbits(32))
+        else:
+            mcts_strategy = MCTSStrategy(current_game_state, self.__player_id, time_budget_ms=self.__time_budget * 1000,
+                                         seed=self.__random.getrandbits(32))
+        return mcts_strategy.which_action_to_take()
 
     def get_player_id(self):
         return self.__player_id
+
+    def get_search(self):
+        return self.__search
+
+    def get_time_budget(self):
+        return self.__time_budget
+
+    def get_seed(self):
+        return self.__seed
+
+    def get_executor(self):
+        return self.__executor
+
+    def get_transposition_table(self):
+        return self.__transposition_table
+
+    def get_move_orderer(self):
+        return self.__move_orderer
+
+    def get_endgame_solver(self):
+        return self.__endgame_solver
+
+    def get_placement_engine(self):
+        return self.__placement_engine
+
+    def get_game_tree(self):
+        return self.__game_tree
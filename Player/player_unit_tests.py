@@ -1,9 +1,12 @@
 import unittest
 import sys
-from player import Player
+from concurrent.futures import ProcessPoolExecutor
+from player import Player, MCTS_SEARCH
+from placement import VALUE_PLACEMENT
 sys.path.append('../Common')
 from board import Board
 from state import GameState
+from tile import __Tile as tile_inst
 
 
 class TestPlayer(unittest.TestCase):
@@ -19,6 +22,23 @@ class TestPlayer(unittest.TestCase):
                           penguin_posns={1: [[0, 0], [0, 1], [0, 2], []], 2: [[1, 0], [1, 1], [], []]})
         assert player2.place_avatar(state) == [0, 3]
 
+    def test_place_avatar_value(self):
+        # tests that a Player placing by value keeps its PlacementEngine across the placement phase
+        board = Board(2, 5, {}, num_of_fish_per_tile=1)
+        board.get_tiles()[1][4] = tile_inst(5)
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2])
+        with self.assertRaises(ValueError):
+            Player(1, placement='hello')
+        player1 = Player(1, placement=VALUE_PLACEMENT)
+        player2 = Player(2, placement=VALUE_PLACEMENT)
+        placement_engine = player1.get_placement_engine()
+        assert placement_engine.get_mode() == VALUE_PLACEMENT
+        assert player1.place_avatar(state) == [0, 4]
+        state.place_avatar(1, [0, 4])
+        assert player2.place_avatar(state) == [1, 4]
+        state.place_avatar(2, [1, 4])
+        player1.place_avatar(state)
+        assert player1.get_placement_engine() is placement_engine
 
     def test_move_avatar(self):
         board = Board(2, 5, {}, num_of_fish_per_tile=2)
@@ -33,6 +53,99 @@ class TestPlayer(unittest.TestCase):
                           penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
         assert player2.move_avatar(state) == ((1, 2), (0, 3))
 
+    def test_move_avatar_reused(self):
+        # tests that a Player reused for a second game on a board of the same size, with other fish, does not use what
+        # it learned in the first one, with or without being told that the game changed
+        def create_state(fish_posn):
+            board = Board(4, 5, {}, num_of_fish_per_tile=1)
+            board.get_tiles()[fish_posn[0]][fish_posn[1]] = tile_inst(5)
+            return GameState(board, {1: "black", 2: "white"}, [1, 2],
+                             penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+
+        player1 = Player(1)
+        assert player1.move_avatar(create_state([0, 1])) == ((0, 1), (2, 1))
+        assert len(player1.get_transposition_table()) > 0
+        assert player1.move_avatar(create_state([0, 2])) == ((0, 2), (2, 2))
+
+        player1.game_has_ended()
+        assert len(player1.get_transposition_table()) == 0
+        assert player1.get_game_tree() is None
+        player1.game_has_started()
+        assert player1.move_avatar(create_state([0, 1])) == ((0, 1), (2, 1))
+
+    def test_move_avatar_time_budget(self):
+        board = Board(2, 5, {}, num_of_fish_per_tile=2)
+
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        player1 = Player(1, time_budget=0.1)
+        assert player1.get_time_budget() == 0.1
+        assert player1.move_avatar(state) == ((1, 3), (0, 3))
+
+    def test_move_avatar_game_tree(self):
+        # tests that a player keeps its GameTree between turns, and re-roots it on the position it is given
+        board = Board(4, 5, {}, num_of_fish_per_tile=2)
+
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        player1 = Player(1)
+        player1.game_has_started()
+        assert player1.get_game_tree() is None
+        action = player1.move_avatar(state)
+        game_tree = player1.get_game_tree()
+        assert game_tree.get_parent() is None
+
+        state.apply_action(action)
+        other_action = state.get_legal_actions()[0]
+        state.apply_action(other_action)
+        node = game_tree.get_child(action).get_child(other_action)
+        assert player1.move_avatar(state) in state.get_legal_actions()
+        assert player1.get_game_tree() is node
+        assert node.get_parent() is None
+        player1.game_has_ended()
+        assert player1.get_game_tree() is None
+
+    def test_move_avatar_endgame(self):
+        # tests that a decided position is played by the EndgameSolver, which keeps what it solved
+        board = Board(3, 4, {1: [1, 3], 2: [3]}, num_of_fish_per_tile=1)
+        board.get_tiles()[2][0] = tile_inst(5)
+        board.get_tiles()[0][2] = tile_inst(4)
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[2, 2], [0, 3]], 2: [[0, 1], [1, 0]]})
+        player1 = Player(1)
+        assert player1.get_endgame_solver().get_solutions() == {}
+        assert player1.move_avatar(state) == ((2, 2), (0, 2))
+        assert player1.get_endgame_solver().get_solutions() != {}
+
+    def test_move_avatar_mcts(self):
+        board = Board(2, 5, {}, num_of_fish_per_tile=2)
+
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        with self.assertRaises(ValueError):
+            Player(1, search='hello')
+        player1 = Player(1, search=MCTS_SEARCH)
+        assert player1.get_search() == MCTS_SEARCH
+        assert player1.move_avatar(state) in state.get_legal_actions()
+        player1 = Player(1, time_budget=0.05, search=MCTS_SEARCH)
+        assert player1.move_avatar(state) in state.get_legal_actions()
+        # two Players with the same seed pick the same moves
+        player1 = Player(1, search=MCTS_SEARCH, seed=5)
+        assert player1.get_seed() == 5
+        moves = [player1.move_avatar(state) for _ in range(3)]
+        player1 = Player(1, search=MCTS_SEARCH, seed=5)
+        assert [player1.move_avatar(state) for _ in range(3)] == moves
+
+    def test_move_avatar_executor(self):
+        board = Board(2, 5, {}, num_of_fish_per_tile=2)
+
+        state = GameState(board, {1: "black", 2: "white"}, [2, 1],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            player2 = Player(2, executor=executor)
+            assert player2.get_executor() is executor
+            assert player2.move_avatar(state) == ((1, 2), (0, 3))
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -1,6 +1,16 @@
 import sys
 sys.path.append('../Common')
-from game_tree import GameTree
+import copy
+import math
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from state import GameState
+from persistent_state import PersistentGameState
+from transposition_table import TranspositionTable, EXACT, LOWER_BOUND, UPPER_BOUND
+from move_ordering import MoveOrderer
+from placement import PlacementEngine, ZIG_ZAG_PLACEMENT
 
 """
 See state.py for details on what a GameState looks like
@@ -13,10 +23,30 @@ care of two decisions: penguin placement and which action at a given state will
 the game_state attr is the current game state of the game and the player_id attr is the id of the player whose turn it is currently in the game.
 a player_id is a reference to a player; it will be determined by the tournament manager.
 
-A Strategy does not need to have a GameTree passed in as an arg, as it can instantiate one from the GameState it is 
-passed in, when it truly needs it in the which_action_to_take method. 
-I did not want to unnecessarily instantiate and pass in a GameTree, if the player is only using this class for penguin placement 
-strategizing, for example, since that method cannot use a GameTree.
+A Strategy does not need to have a GameTree passed in as an arg. which_action_to_take searches the same tree a GameTree
+would build, in the same order, but it does so in place on a single copy of the GameState it is passed in, applying 
+each Action with GameState.apply_action and taking it back with GameState.undo, so no GameState is copied per node.
+A Strategy can also be passed in a PersistentGameState (see persistent_state.py), which cannot be changed in place, so
+it then steps to the position after each Action with get_successor instead, which only copies what the Action changes.
+
+A Strategy can also be given a GameTree whose root is in the current game state, in which case it searches the nodes 
+of the tree instead, creating the children it visits (see GameTree.get_child). The tree keeps them after the search, 
+so a Player that keeps its tree from one turn to the next (see player.py) does not create them again.
+
+which_action_to_take searches a fixed number of turns, so how long it takes depends on the size of the board and how
+mobile the penguins are. which_action_to_take_within searches for a fixed amount of time instead: it searches 1 turn,
+then 2 turns, and so on until the time runs out, and returns the action chosen by the deepest search that finished.
+Each search tries the actions at the root in the order of their scores from the search before it.
+
+A Strategy can also be given an EndgameSolver (see endgame.py). When the position is decided, which_action_to_take,
+which_action_to_take_within and which_action_to_take_in_parallel all return the Action of the solver instead of
+searching, since it gets player_id the best final score there is, not just the best score n turns ahead.
+
+which_action_to_take_in_parallel searches the actions at the root in a pool of processes instead, one task per action.
+Each task is sent the GameState in its serialized form (see GameState.serialize, a PersistentGameState is converted
+with to_game_state first), searches its action with a full window, so that its score is exact, and sends back the
+score. The scores are then merged in the order of the actions, so the action returned, tiebreak included, is the same
+as the one which_action_to_take returns.
 
 An Action is a tuple of the form ((start_row, start_col), (dest_row, dest_col)). 
 Where *row, and *col are both ints. (start_row, start_col) is the current location of a penguin, and (dest_row, dest_col) is
@@ -26,77 +56,405 @@ a time when a Player cannot make a move, is of the form ().
 """
 
 # Class Signature: A Strategy is passed in two parameters, game_state (type is GameState) and player_id (type is int). A
-# player_id is a reference to a Player.
+# player_id is a reference to a Player. It can optionally be passed in a transposition_table (type is
+# TranspositionTable, see transposition_table.py), which it uses to remember the positions it has searched. A value
+# in the table is the gain of player_id from that position on, in other words the minimax score minus player_id's score
+# at that position, which only depends on the position, so a table can be kept across searches by the same player.
+
+# It can also optionally be passed in a game_tree (type is GameTree, see game_tree.py) whose root is in the same position
+# as game_state, which it then searches instead of a copy of game_state.
+
+# It can also optionally be passed in a move_orderer (type is MoveOrderer, see move_ordering.py), which it uses to
+# search the most promising Actions of every position first, so that more of the tree is pruned.
+
+# It can also optionally be passed in an endgame_solver (type is EndgameSolver, see endgame.py), which it asks for the
+# Action to take before searching.
+
+# time_budget is a number of seconds, see which_action_to_take_within.
 
 # Assumptions: This game state that is passed in is the CURRENT game state for which the game is not over, otherwise there would
 # be no point of this class. I also assume that in the passed in game state, the turn is of the player who is
 # represented by the passed in player_id (must match).
 
 
+def score_serialized_action(serialized_game_state, player_id, action, n):
+    """
+    The task of which_action_to_take_in_parallel. Returns a tuple (score, search_stats), see Strategy.score_action.
+    """
+    strategy = Strategy(GameState.deserialize(serialized_game_state), player_id, move_orderer=MoveOrderer())
+    return strategy.score_action(action, n), strategy.get_search_stats()
+
+
+# the playout policies of an MCTSStrategy: a random move, or a move off the tile with the most fish
+RANDOM_PLAYOUT = "random"
+GREEDY_PLAYOUT = "greedy"
+
+# the exploration constant of UCT, see MCTSStrategy
+UCT_EXPLORATION = math.sqrt(2)
+
+
+class SearchTimeout(Exception):
+    """
+    Raised inside a search when the deadline of which_action_to_take_within has passed, to abandon the search.
+    """
+    pass
+
+
 class Strategy:
-    def __init__(self, game_state, player_id):
+    def __init__(self, game_state, player_id, transposition_table=None, move_orderer=None, game_tree=None,
+                 endgame_solver=None):
         self.__game_state = game_state
-        self.__game_tree = None
+        self.__game_tree = game_tree
         self.__player_id = player_id
+        self.__transposition_table = transposition_table
+        self.__move_orderer = move_orderer
+        self.__endgame_solver = endgame_solver
+        # whether the search steps through PersistentGameStates rather than applying and undoing Actions in place
+        self.__persistent = isinstance(game_state, PersistentGameState)
+        # a Dictionary of counters about the last search done by which_action_to_take, see get_search_stats
+        self.__search_stats = {}
+        # the time.monotonic() time after which the current search is abandoned, or None if it runs to completion
+        self.__deadline = None
+        # whether the current search has cut off any line of play at its depth, see which_action_to_take_within
+        self.__hit_depth_limit = False
 
     """
     Please see board.py for more details on my coordinate system (which follows what I just described).
     
     Assumption: The board has enough free slots for which penguins can be placed.
+
+    The first free slot is found with the bitmasks of the board and the game state, see placement.py. A Player that
+    places all its penguins keeps a PlacementEngine instead, so the slots before the last one are not looked at again.
     """
     def zig_zag(self):
-        board = self.__game_state.get_board()
-        # Python ranges are exclusive at the end
-        # i=0 i < len(board.get_tiles()) i++
-        for i in range(0, len(board.get_tiles())):
-            # j=0 j < (board.get_tiles())[i] j++
-            for j in range(0, len(board.get_tiles()[i])):
-                desired_posn = [i, j]
-                if self.__game_state.is_unoccupied(desired_posn) and \
-                        not self.__game_state.is_hole(desired_posn):
-                            return desired_posn
-
-    def which_action_to_take(self, n):
+        return PlacementEngine(ZIG_ZAG_PLACEMENT).place_avatar(self.__game_state)
+
+    def which_action_to_take(self, n, measure_ordering=False):
+        """
+        If measure_ordering is True and this Strategy has a MoveOrderer, the same search is also run without ordering
+        first, and the nodes it visits are reported as "nodes_unordered" in the search stats, next to the "nodes" of the
+        ordered search. The unordered search starts from an empty TranspositionTable, if this Strategy uses one.
+        """
         if n == 0:
             raise ValueError("N must be greater than 0")
 
-        # instantiates the game tree because now we need it (next_layer must still be called to kick off the generator)
-        self.__game_tree = GameTree(self.__game_state)
-        self.__game_tree.next_layer()
+        nodes_unordered = None
+        if measure_ordering and self.__move_orderer is not None:
+            nodes_unordered = self.__count_unordered_nodes(n)
 
-        actions_to_scores = {}
-        for action, node in self.__game_tree.get_map_action_to_child_nodes().items():
-            actions_to_scores[action] = (self.__minimax(node, n-1))
+        self.__search_stats = {"nodes": 0, "cutoffs": 0, "depth": n}
+        if nodes_unordered is not None:
+            self.__search_stats["nodes_unordered"] = nodes_unordered
+        endgame_action = self.__get_endgame_action()
+        if endgame_action is not None:
+            return endgame_action
+        self.__deadline = None
+        if self.__move_orderer is not None:
+            self.__move_orderer.start_search()
+
+        position = self.__get_root_position()
+        actions_to_scores = self.__score_actions(position, n, self.__order_actions(position, 0, None))
 
         # game over
         if actions_to_scores == {}:
             return ()
 
-        # this is the best gain
+        return self.__get_optimal_action(self.__get_optimal_actions(actions_to_scores))
+
+    def __count_unordered_nodes(self, n):
+        move_orderer = self.__move_orderer
+        transposition_table = self.__transposition_table
+        self.__move_orderer = None
+        if transposition_table is not None:
+            self.__transposition_table = TranspositionTable(max_entries=transposition_table.get_max_entries(),
+                                                            replacement=transposition_table.get_replacement())
+        self.which_action_to_take(n)
+        self.__move_orderer = move_orderer
+        self.__transposition_table = transposition_table
+        return self.__search_stats["nodes"]
+
+    def which_action_to_take_within(self, time_budget):
+        """
+        Iterative deepening: searches 1 turn ahead, then 2, and so on, and returns the action chosen by the deepest
+        search that finished within time_budget seconds. The search of 1 turn always finishes, however long it takes,
+        so there is always an action to return. Deepening stops early when a search did not cut off any line of play
+        at its depth, since a deeper search would then give the same result.
+        """
+        if not isinstance(time_budget, (int, float)) or isinstance(time_budget, bool):
+            raise TypeError("Time budget must be a number")
+        if time_budget <= 0:
+            raise ValueError("Time budget must be greater than 0")
+
+        deadline = time.monotonic() + time_budget
+        self.__search_stats = {"nodes": 0, "cutoffs": 0, "depth": 0}
+        endgame_action = self.__get_endgame_action()
+        if endgame_action is not None:
+            return endgame_action
+        if self.__move_orderer is not None:
+            self.__move_orderer.start_search()
+
+        position = self.__get_root_position()
+        ordered_actions = self.__order_actions(position, 0, None)
+        # game over
+        if ordered_actions == []:
+            return ()
+
+        optimal_action = None
+        n = 1
+        while True:
+            # the first search runs to completion
+            self.__deadline = deadline if optimal_action is not None else None
+            self.__hit_depth_limit = False
+            try:
+                actions_to_scores = self.__score_actions(position, n, ordered_actions)
+            except SearchTimeout:
+                # the abandoned search did not undo its Actions, but the copy of the game state is not used again
+                break
+            optimal_action = self.__get_optimal_action(self.__get_optimal_actions(actions_to_scores))
+            self.__search_stats["depth"] = n
+            if not self.__hit_depth_limit or time.monotonic() >= deadline:
+                break
+            # the next search tries the best actions of this one first, which narrows its window sooner
+            ordered_actions = sorted(ordered_actions, key=lambda action: actions_to_scores[action], reverse=True)
+            n += 1
+
+        self.__deadline = None
+        return optimal_action
+
+    def which_action_to_take_in_parallel(self, n, executor=None, max_workers=None):
+        """
+        Same as which_action_to_take, but the actions at the root are searched in parallel, in executor if it is given
+        (any concurrent.futures Executor, typically a ProcessPoolExecutor kept for many searches), otherwise in a new
+        ProcessPoolExecutor of max_workers processes. The search stats are the sums over all the tasks.
+        """
+        if n == 0:
+            raise ValueError("N must be greater than 0")
+
+        self.__search_stats = {"nodes": 0, "cutoffs": 0, "depth": n}
+        endgame_action = self.__get_endgame_action()
+        if endgame_action is not None:
+            return endgame_action
+        actions = self.__game_state.get_legal_actions()
+        # game over, or only one thing to do
+        if len(actions) < 2:
+            return actions[0] if actions else ()
+
+        # a PersistentGameState is sent as the GameState it stands for, which every task searches in place
+        game_state = self.__game_state.to_game_state() if self.__persistent else self.__game_state
+        serialized_game_state = game_state.serialize()
+        task_args = (repeat(serialized_game_state), repeat(self.__player_id), actions, repeat(n))
+        if executor is None:
+            with ProcessPoolExecutor(max_workers=max_workers) as own_executor:
+                results = list(own_executor.map(score_serialized_action, *task_args))
+        else:
+            results = list(executor.map(score_serialized_action, *task_args))
+
+        actions_to_scores = {}
+        for action, (score, search_stats) in zip(actions, results):
+            actions_to_scores[action] = score
+            self.__search_stats["nodes"] += search_stats["nodes"]
+            self.__search_stats["cutoffs"] += search_stats["cutoffs"]
+
+        return self.__get_optimal_action(self.__get_optimal_actions(actions_to_scores))
+
+    def score_action(self, action, n):
+        """
+        The exact score of player_id after taking action and then searching n-1 more of its turns, the same score
+        which_action_to_take gives action.
+        """
+        if n == 0:
+            raise ValueError("N must be greater than 0")
+
+        self.__search_stats = {"nodes": 0, "cutoffs": 0, "depth": n}
+        self.__deadline = None
+        if self.__move_orderer is not None:
+            self.__move_orderer.start_search()
+
+        position = self.__get_root_position()
+        child_position, undo_record = self.__play(position, action)
+        if child_position is False or undo_record is False:
+            raise ValueError("Action must be legal")
+        return self.__minimax(child_position, n-1, float('-inf'), float('+inf'), 1)
+
+    def __get_endgame_action(self):
+        """
+        The Action of the EndgameSolver if this Strategy has one and the position is decided, otherwise None. The
+        search stats then record that no node was searched, with "endgame" set to True.
+        """
+        if self.__endgame_solver is None:
+            return None
+        endgame_action = self.__endgame_solver.get_best_action(self.__game_state)
+        if endgame_action is not None:
+            self.__search_stats["endgame"] = True
+        return endgame_action
+
+    def __get_root_position(self):
+        """
+        The search works on positions, which are either GameStates, searched in place, or the nodes of game_tree,
+        whose children are kept after the search (see game_tree.py).
+        """
+        if self.__game_tree is not None:
+            return self.__game_tree
+        # the search mutates the state it runs on (and puts it back), so it runs on a copy of the current game state
+        return copy.deepcopy(self.__game_state)
+
+    def __play(self, position, action):
+        """
+        Returns the position after action, and the UndoRecord that takes it back if the position was changed in place,
+        or None.
+        """
+        if self.__game_tree is not None:
+            return position.get_child(action), None
+        if self.__persistent:
+            return position.get_successor(action), None
+        return position, position.apply_action(action)
+
+    @staticmethod
+    def __take_back(position, undo_record):
+        if undo_record is not None:
+            position.undo(undo_record)
+
+    def __get_state(self, position):
+        return position.get_game_state() if self.__game_tree is not None else position
+
+    def __score_actions(self, position, n, actions):
+        """
+        Searches each of the given Actions at the root position n turns ahead. Returns a Dictionary of the form
+        {action: score}, where the score is exact for every Action whose score is the best, and lower than the best for
+        the others.
+        """
+        actions_to_scores = {}
+        optimal_score = float('-inf')
+        for action in actions:
+            child_position, undo_record = self.__play(position, action)
+            # Scores are ints, so searching with alpha one below the best score so far returns the exact score of every
+            # action that ties or beats it, and some score below the best score for every other action. That keeps
+            # all the optimal actions for the tiebreaker while still pruning the rest.
+            actions_to_scores[action] = self.__minimax(child_position, n-1, optimal_score - 1, float('+inf'), 1)
+            self.__take_back(position, undo_record)
+            optimal_score = max(optimal_score, actions_to_scores[action])
+        return actions_to_scores
+
+    def __order_actions(self, position, ply, best_action):
+        if self.__game_tree is not None:
+            # the Actions of a node are only worked out once, see LazyChildNodes
+            actions = list(position.expand())
+        else:
+            actions = position.get_legal_actions()
+        if self.__move_orderer is None:
+            return actions
+        return self.__move_orderer.order_actions(self.__get_state(position), actions, ply, best_action)
+
+    @staticmethod
+    def __get_optimal_actions(actions_to_scores):
         optimal_score = max(actions_to_scores.values())
+        return [action for action in actions_to_scores if actions_to_scores[action] == optimal_score]
+
+    def __minimax(self, position, n, alpha, beta, ply):
+        """
+        Minimax with alpha-beta pruning. The result is exact when it is strictly between alpha and beta, otherwise it
+        is an upper bound when it is <= alpha and a lower bound when it is >= beta. ply is the number of Actions
+        position is from the root, see move_ordering.py.
+        """
+        self.__search_stats["nodes"] += 1
+        game_state = self.__get_state(position)
+        if self.__deadline is not None and time.monotonic() > self.__deadline:
+            raise SearchTimeout()
 
-        optimal_actions = [action for action in actions_to_scores if actions_to_scores[action] == optimal_score]
+        # base case, the player has finished all its turns
+        if n == 0:
+            self.__hit_depth_limit = True
+            return game_state.get_player_score(self.__player_id)
 
-        return self.__get_optimal_action(optimal_actions)
+        current_score = game_state.get_player_score(self.__player_id)
+        # the best Action the TranspositionTable has for this position, searched first
+        table_action = None
+        if self.__transposition_table is not None:
+            position_hash = game_state.get_hash()
+            entry = self.__transposition_table.lookup(position_hash, n)
+            if entry is not None:
+                # the search that stored the entry may have cut off lines of play at its depth
+                self.__hit_depth_limit = True
+                entry_value = current_score + entry[0]
+                table_action = entry[2]
+                if entry[1] == EXACT:
+                    return entry_value
+                elif entry[1] == LOWER_BOUND:
+                    alpha = max(alpha, entry_value)
+                else:
+                    beta = min(beta, entry_value)
+                if alpha >= beta:
+                    return entry_value
 
-    def __minimax(self, node, n):
-        # base case, either the player has finished all its turns or there are no moves left after this move
-        if n == 0 or node.get_game_state().is_game_over():
-            return node.get_game_state().get_player_score(self.__player_id)
+        # base case, there are no moves left after this move
+        if game_state.is_game_over():
+            return current_score
+
+        original_alpha = alpha
+        original_beta = beta
+        best_action = None
         # it is the maximizing player's turn
-        if node.get_game_state().get_player_order()[0] == self.__player_id:
+        if game_state.get_player_order()[0] == self.__player_id:
             value = float('-inf')  # because we need the absolute lowest possible value to compare to
-            node.next_layer()
-            for action, child_node in node.get_map_action_to_child_nodes().items():
-                value = max(value, self.__minimax(child_node, n-1))
-            return value
+            for action in self.__order_actions(position, ply, table_action):
+                if n == 1:
+                    # the last turn of the search, whose score is known without taking the Action
+                    child_value = self.__get_final_score(game_state, current_score, action)
+                else:
+                    child_position, undo_record = self.__play(position, action)
+                    child_value = self.__minimax(child_position, n-1, alpha, beta, ply+1)
+                    self.__take_back(position, undo_record)
+                if child_value > value:
+                    value = child_value
+                    best_action = action
+                alpha = max(alpha, value)
+                # the opponents already have a way to keep the score at beta or below, so they will never let this
+                # position happen
+                if alpha >= beta:
+                    self.__record_cutoff(action, ply, n)
+                    break
         # it is all opponents' turn
         else:
             value = float('+inf')  # because we need the absolute highest possible value to compare to
-            node.next_layer()
-            for action, child_node in node.get_map_action_to_child_nodes().items():
-                value = min(value, self.__minimax(child_node, n))
-            return value
+            for action in self.__order_actions(position, ply, table_action):
+                child_position, undo_record = self.__play(position, action)
+                child_value = self.__minimax(child_position, n, alpha, beta, ply+1)
+                self.__take_back(position, undo_record)
+                if child_value < value:
+                    value = child_value
+                    best_action = action
+                beta = min(beta, value)
+                # the maximizing player already has a way to get alpha or more, so it will never let this position
+                # happen
+                if alpha >= beta:
+                    self.__record_cutoff(action, ply, n)
+                    break
+
+        if self.__transposition_table is not None:
+            if value <= original_alpha:
+                bound = UPPER_BOUND
+            elif value >= original_beta:
+                bound = LOWER_BOUND
+            else:
+                bound = EXACT
+            self.__transposition_table.store(position_hash, n, value - current_score, bound, best_action)
+        return value
+
+    def __get_final_score(self, game_state, current_score, action):
+        """
+        The score of player_id after it takes action, which is what __minimax would return for the child of action
+        with no turns left.
+        """
+        self.__search_stats["nodes"] += 1
+        self.__hit_depth_limit = True
+        if action == ():
+            return current_score
+        return current_score + game_state.get_fish_count(action[0])
+
+    def __record_cutoff(self, action, ply, n):
+        self.__search_stats["cutoffs"] += 1
+        if self.__move_orderer is not None:
+            self.__move_orderer.record_cutoff(action, ply, n)
 
     def __get_optimal_action(self, optimal_actions):
         # this means there are multiple optimal actions that can lead to the same best gain
@@ -129,8 +487,177 @@ class Strategy:
     def get_game_state(self):
         return self.__game_state
 
+    def get_player_id(self):
+        return self.__player_id
+
+    def get_transposition_table(self):
+        return self.__transposition_table
+
     def get_game_tree(self):
         return self.__game_tree
 
+    def get_move_orderer(self):
+        return self.__move_orderer
+
+    def get_endgame_solver(self):
+        return self.__endgame_solver
+
+    def get_search_stats(self):
+        return self.__search_stats
+
+
+"""
+An MCTSStrategy is the Monte Carlo Tree Search counterpart of a Strategy, for boards that are too large for a
+Strategy to search TURNS_LOOK_AHEAD turns ahead in time (see player.py). Instead of searching every Action, it plays
+many quick games, called playouts, from the current game state to the end, and grows a tree of MCTSNodes towards the
+Actions that won the most of them. Each iteration:
+
+- selection: walks down the tree from the root, at every node taking the child with the highest UCT value,
+  wins / visits + UCT_EXPLORATION * sqrt(ln(parent visits) / visits), until it reaches a node with untried Actions,
+- expansion: adds the child of one of those untried Actions,
+- playout: plays the rest of the game with GameState.apply_action (or get_successor, for a PersistentGameState), moving
+  a random penguin to a random reachable tile (RANDOM_PLAYOUT) or taking the move off the tile with the most fish
+  (GREEDY_PLAYOUT),
+- backpropagation: adds the result to every node on the path. A playout is worth 1 to its winner, or 1 / k to each of
+  k tied winners, and a node counts the wins of the player who took the Action leading to it.
+
+The nodes of the tree follow the edges of a GameTree (see game_tree.py): a stuck player's only Action is (), which
+skips its turn, and a game over node has no Actions.
+
+An MCTSStrategy has a budget of num_playouts playouts, or time_budget_ms milliseconds, or both, whichever runs out
+first, and always does at least one playout. which_action_to_take returns the Action of the most visited child of the
+root, the most visited being the one whose result is the most reliable; ties are broken like a Strategy breaks them.
+seed seeds the random choices, so a search with a playout budget and a seed is reproducible.
+"""
+
+
+class MCTSNode:
+
+    def __init__(self, game_state, parent=None, action=None):
+        self.parent = parent
+        # the Action that led here from parent, and the id of the player who took it (None at the root)
+        self.action = action
+        self.player_id = parent.whose_turn if parent is not None else None
+        # the id of the player whose turn it is at this node, None if the game is over
+        player_order = game_state.get_player_order()
+        self.whose_turn = player_order[0] if player_order else None
+        # a Dictionary of the form {action: MCTSNode}
+        self.children = {}
+        self.untried_actions = game_state.get_legal_actions()
+        self.visits = 0
+        self.wins = 0.0
+
+    def get_uct_value(self, parent_visits):
+        return self.wins / self.visits + UCT_EXPLORATION * math.sqrt(math.log(parent_visits) / self.visits)
+
+
+class MCTSStrategy:
+
+    def __init__(self, game_state, player_id, num_playouts=None, time_budget_ms=None, playout_policy=RANDOM_PLAYOUT,
+                 seed=None):
+        if num_playouts is None and time_budget_ms is None:
+            raise ValueError("There must be a number of playouts or a time budget")
+        if num_playouts is not None and num_playouts < 1:
+            raise ValueError("Number of playouts must be greater than 0")
+        if time_budget_ms is not None and time_budget_ms <= 0:
+            raise ValueError("Time budget must be greater than 0")
+        if playout_policy not in (RANDOM_PLAYOUT, GREEDY_PLAYOUT):
+            raise ValueError(f"Playout policy must be one of {RANDOM_PLAYOUT}, {GREEDY_PLAYOUT}")
+
+        self.__game_state = game_state
+        # whether an iteration steps through PersistentGameStates rather than applying Actions to a copy in place
+        self.__persistent = isinstance(game_state, PersistentGameState)
+        self.__player_id = player_id
+        self.__num_playouts = num_playouts
+        self.__time_budget_ms = time_budget_ms
+        self.__playout_policy = playout_policy
+        self.__random = random.Random(seed)
+        # a Dictionary of counters about the last search done by which_action_to_take, see get_search_stats
+        self.__search_stats = {}
+
+    def which_action_to_take(self):
+        root = MCTSNode(self.__game_state)
+        self.__search_stats = {"playouts": 0, "nodes": 1}
+        # game over, or only one thing to do
+        if len(root.untried_actions) < 2:
+            return root.untried_actions[0] if root.untried_actions else ()
+
+        deadline = time.monotonic() + self.__time_budget_ms / 1000 if self.__time_budget_ms is not None else None
+        while True:
+            self.__run_iteration(root)
+            self.__search_stats["playouts"] += 1
+            if self.__num_playouts is not None and self.__search_stats["playouts"] >= self.__num_playouts:
+                break
+            if deadline is not None and time.monotonic() >= deadline:
+                break
+
+        most_visits = max(child.visits for child in root.children.values())
+        return min(action for action, child in root.children.items() if child.visits == most_visits)
+
+    def __run_iteration(self, root):
+        game_state = copy.deepcopy(self.__game_state)
+
+        # selection
+        node = root
+        while not node.untried_actions and node.children:
+            node = max(node.children.values(), key=lambda child: child.get_uct_value(node.visits))
+            game_state = self.__play(game_state, node.action)
+
+        # expansion
+        if node.untried_actions:
+            action = node.untried_actions.pop(self.__random.randrange(len(node.untried_actions)))
+            game_state = self.__play(game_state, action)
+            node.children[action] = MCTSNode(game_state, parent=node, action=action)
+            node = node.children[action]
+            self.__search_stats["nodes"] += 1
+
+        # playout
+        game_state = self.__play_out(game_state)
+
+        # backpropagation
+        scores = game_state.get_player_fish_count()
+        winning_score = max(scores.values())
+        winners = [player_id for player_id in scores if scores[player_id] == winning_score]
+        while node is not None:
+            node.visits += 1
+            if node.player_id in winners:
+                node.wins += 1 / len(winners)
+            node = node.parent
+
+    def __play_out(self, game_state):
+        # returns the game state the game ends in
+        actions = game_state.get_legal_actions()
+        while actions:
+            if actions != [()] and self.__playout_policy == GREEDY_PLAYOUT:
+                most_fish = max(game_state.get_fish_count(start_posn) for start_posn, _dest_posn in actions)
+                actions = [action for action in actions if game_state.get_fish_count(action[0]) == most_fish]
+            # a stuck player's only Action skips its turn, and takes no random choice
+            action = actions[self.__random.randrange(len(actions))] if actions != [()] else ()
+            game_state = self.__play(game_state, action)
+            actions = game_state.get_legal_actions()
+        return game_state
+
+    def __play(self, game_state, action):
+        # the game state after action, which is game_state itself, changed in place, unless it is a PersistentGameState
+        if self.__persistent:
+            return game_state.get_successor(action)
+        game_state.apply_action(action)
+        return game_state
+
+    def get_game_state(self):
+        return self.__game_state
+
     def get_player_id(self):
         return self.__player_id
+
+    def get_num_playouts(self):
+        return self.__num_playouts
+
+    def get_time_budget_ms(self):
+        return self.__time_budget_ms
+
+    def get_playout_policy(self):
+        return self.__playout_policy
+
+    def get_search_stats(self):
+        return self.__search_stats
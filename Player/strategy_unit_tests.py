@@ -1,9 +1,15 @@
 import unittest
 import sys
-from strategy import Strategy
+from concurrent.futures import ProcessPoolExecutor
+from strategy import Strategy, MCTSStrategy, GREEDY_PLAYOUT
+from transposition_table import TranspositionTable
+from move_ordering import MoveOrderer
+from endgame import EndgameSolver
 sys.path.append('../Common')
 from board import Board
 from state import GameState
+from game_tree import GameTree
+from persistent_state import PersistentGameState
 from tile import __Tile as tile_inst
 
 
@@ -36,6 +42,10 @@ class TestStrategy(unittest.TestCase):
         strategy = Strategy(state, 2)
         with self.assertRaises(ValueError):
             strategy.which_action_to_take(0)
+        with self.assertRaises(ValueError):
+            strategy.which_action_to_take_within(0)
+        with self.assertRaises(TypeError):
+            strategy.which_action_to_take_within('hello')
 
     def test_which_action_to_take_one_turn(self):
         board = Board(2, 5, {}, num_of_fish_per_tile=2)
@@ -57,6 +67,226 @@ class TestStrategy(unittest.TestCase):
         strategy = Strategy(state, 1)
         assert strategy.which_action_to_take(2) == ((0, 2), (2, 2))
 
+    def test_which_action_to_take_transposition_table(self):
+        # tests that a transposition table does not change the action taken, and is reused across searches
+        board = Board(4, 5, {}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        board_tiles = board.get_tiles()
+        board_tiles[0][1] = tile_inst(7)
+        board_tiles[0][2] = tile_inst(12)
+        table = TranspositionTable()
+        assert Strategy(state, 1, transposition_table=table).which_action_to_take(2) == ((0, 2), (2, 2))
+        misses = table.get_misses()
+        assert misses > 0
+        assert Strategy(state, 1, transposition_table=table).which_action_to_take(2) == ((0, 2), (2, 2))
+        assert table.get_hits() > 0
+        assert table.get_misses() == misses
+
+    def test_which_action_to_take_game_tree(self):
+        # tests that searching the nodes of a GameTree does not change the action taken, and creates the nodes searched
+        board = Board(4, 5, {}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        board_tiles = board.get_tiles()
+        board_tiles[0][1] = tile_inst(7)
+        board_tiles[0][2] = tile_inst(12)
+        game_tree = GameTree(state, merge_transpositions=True)
+        strategy = Strategy(state, 1, game_tree=game_tree)
+        assert strategy.get_game_tree() is game_tree
+        assert strategy.which_action_to_take(2) == ((0, 2), (2, 2))
+        assert game_tree.is_expanded()
+        assert game_tree.get_map_action_to_child_nodes().is_created(((0, 2), (2, 2)))
+
+    def test_which_action_to_take_persistent_state(self):
+        # tests that searching a PersistentGameState, on its own or as the root of a GameTree, takes the same action as
+        # searching a GameState, and leaves it as it was
+        board = Board(4, 5, {}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        board_tiles = board.get_tiles()
+        board_tiles[0][1] = tile_inst(7)
+        board_tiles[0][2] = tile_inst(12)
+        persistent_state = PersistentGameState.from_game_state(state)
+        strategy = Strategy(persistent_state, 1, transposition_table=TranspositionTable())
+        assert strategy.which_action_to_take(2) == Strategy(state, 1).which_action_to_take(2)
+        assert strategy.score_action(((0, 2), (2, 2)), 2) == Strategy(state, 1).score_action(((0, 2), (2, 2)), 2)
+        strategy = Strategy(persistent_state, 1, game_tree=GameTree(persistent_state))
+        assert strategy.which_action_to_take(2) == ((0, 2), (2, 2))
+        strategy = Strategy(persistent_state, 1, game_tree=GameTree(persistent_state), move_orderer=MoveOrderer())
+        assert strategy.which_action_to_take(3) == \
+            Strategy(state, 1, move_orderer=MoveOrderer()).which_action_to_take(3)
+        assert persistent_state.get_player_fish_count() == {1: 0, 2: 0}
+        assert persistent_state.get_hash() == state.get_hash()
+
+    def test_which_action_to_take_pruning(self):
+        # tests that a deeper search prunes branches and records it in the search stats
+        board = Board(4, 5, {}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        board_tiles = board.get_tiles()
+        board_tiles[0][1] = tile_inst(7)
+        board_tiles[0][2] = tile_inst(12)
+        strategy = Strategy(state, 1)
+        assert strategy.which_action_to_take(3) == ((0, 2), (2, 2))
+        assert strategy.get_search_stats()["nodes"] > 0
+        assert strategy.get_search_stats()["cutoffs"] > 0
+
+    def test_which_action_to_take_move_ordering(self):
+        # tests that move ordering does not change the action taken, visits fewer nodes, and reports how many
+        board = Board(4, 5, {}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        board_tiles = board.get_tiles()
+        board_tiles[0][1] = tile_inst(7)
+        board_tiles[0][2] = tile_inst(12)
+        strategy = Strategy(state, 1, transposition_table=TranspositionTable(), move_orderer=MoveOrderer())
+        assert strategy.which_action_to_take(3, measure_ordering=True) == ((0, 2), (2, 2))
+        stats = strategy.get_search_stats()
+        assert stats["nodes"] < stats["nodes_unordered"]
+        strategy = Strategy(state, 1)
+        strategy.which_action_to_take(3, measure_ordering=True)
+        assert "nodes_unordered" not in strategy.get_search_stats()
+
+    def test_which_action_to_take_in_parallel(self):
+        # tests that searching the root actions in a process pool picks the same action, tiebreak included
+        board = Board(4, 5, {}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        board_tiles = board.get_tiles()
+        board_tiles[0][1] = tile_inst(7)
+        board_tiles[0][2] = tile_inst(12)
+        strategy = Strategy(state, 1)
+        assert strategy.which_action_to_take_in_parallel(2, max_workers=2) == ((0, 2), (2, 2))
+        assert strategy.get_search_stats()["nodes"] > 0
+        assert strategy.score_action(((0, 2), (2, 2)), 2) == 14
+        strategy = Strategy(PersistentGameState.from_game_state(state), 1)
+        assert strategy.which_action_to_take_in_parallel(2, max_workers=2) == ((0, 2), (2, 2))
+
+        state = GameState(Board(2, 5, {}), {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        with ProcessPoolExecutor(max_workers=2) as executor:
+            assert Strategy(state, 1).which_action_to_take_in_parallel(1, executor=executor) == ((1, 3), (0, 3))
+        with self.assertRaises(ValueError):
+            Strategy(state, 1).score_action(((1, 3), (1, 3)), 1)
+
+    def test_which_action_to_take_within(self):
+        # tests that iterative deepening returns the action of the deepest search it finished, and always finishes the
+        # search of 1 turn
+        board = Board(4, 5, {}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        board_tiles = board.get_tiles()
+        board_tiles[0][1] = tile_inst(7)
+        board_tiles[0][2] = tile_inst(12)
+        strategy = Strategy(state, 1, transposition_table=TranspositionTable())
+        action = strategy.which_action_to_take_within(0.2)
+        depth = strategy.get_search_stats()["depth"]
+        assert depth >= 1
+        assert action == Strategy(state, 1).which_action_to_take(depth)
+
+        strategy = Strategy(state, 1)
+        assert strategy.which_action_to_take_within(1e-9) == Strategy(state, 1).which_action_to_take(1)
+        assert strategy.get_search_stats()["depth"] == 1
+
+    def test_which_action_to_take_within_game_end(self):
+        # tests that deepening stops once a search sees every line of play to the end of the game
+        board = Board(2, 5, {}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        strategy = Strategy(state, 1)
+        assert strategy.which_action_to_take_within(10) == ((1, 3), (0, 3))
+        assert strategy.get_search_stats()["depth"] < 10
+
+    def test_which_action_to_take_endgame_solver(self):
+        # tests that once the position is decided, the Action of the solver is taken without searching, while a search
+        # of one turn takes the 4 fish at once and strands the other penguin of player 1
+        board = Board(3, 4, {1: [1, 3], 2: [3]}, num_of_fish_per_tile=1)
+        board.get_tiles()[2][0] = tile_inst(5)
+        board.get_tiles()[0][2] = tile_inst(4)
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[2, 2], [0, 3]], 2: [[0, 1], [1, 0]]})
+        assert Strategy(state, 1).which_action_to_take(1) == ((0, 3), (1, 2))
+        endgame_solver = EndgameSolver()
+        strategy = Strategy(state, 1, endgame_solver=endgame_solver)
+        assert strategy.get_endgame_solver() is endgame_solver
+        assert strategy.which_action_to_take(1) == ((2, 2), (0, 2))
+        assert strategy.get_search_stats() == {"nodes": 0, "cutoffs": 0, "depth": 1, "endgame": True}
+        assert strategy.which_action_to_take_within(0.05) == ((2, 2), (0, 2))
+        assert strategy.which_action_to_take_in_parallel(1) == ((2, 2), (0, 2))
+
+        # a position that is not decided is searched as usual
+        board = Board(2, 5, {}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        strategy = Strategy(state, 1, endgame_solver=endgame_solver)
+        assert strategy.which_action_to_take(2) == Strategy(state, 1).which_action_to_take(2)
+        assert "endgame" not in strategy.get_search_stats()
+
+    def test_which_action_to_take_endgame_solver_persistent_state(self):
+        # tests that a Strategy on a PersistentGameState takes the Action of the solver once the position is decided
+        board = Board(3, 4, {1: [1, 3], 2: [3]}, num_of_fish_per_tile=1)
+        board.get_tiles()[2][0] = tile_inst(5)
+        board.get_tiles()[0][2] = tile_inst(4)
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[2, 2], [0, 3]], 2: [[0, 1], [1, 0]]})
+        strategy = Strategy(PersistentGameState.from_game_state(state), 1, endgame_solver=EndgameSolver())
+        assert strategy.which_action_to_take(2) == ((2, 2), (0, 2))
+        assert strategy.get_search_stats()["endgame"]
+
+    def test_mcts_invalid_input(self):
+        board = Board(2, 5, {}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        with self.assertRaises(ValueError):
+            MCTSStrategy(state, 1)
+        with self.assertRaises(ValueError):
+            MCTSStrategy(state, 1, num_playouts=0)
+        with self.assertRaises(ValueError):
+            MCTSStrategy(state, 1, time_budget_ms=-1)
+        with self.assertRaises(ValueError):
+            MCTSStrategy(state, 1, num_playouts=10, playout_policy='hello')
+
+    def test_mcts_which_action_to_take(self):
+        # tests that MCTS finds the move off the 12 fish tile with either playout policy, and is reproducible
+        board = Board(4, 5, {}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [1, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 4]]})
+        board_tiles = board.get_tiles()
+        board_tiles[0][2] = tile_inst(12)
+        for playout_policy in [GREEDY_PLAYOUT, "random"]:
+            mcts_strategy = MCTSStrategy(state, 1, num_playouts=300, playout_policy=playout_policy, seed=0)
+            action = mcts_strategy.which_action_to_take()
+            assert action == ((0, 2), (2, 2))
+            assert mcts_strategy.get_search_stats()["playouts"] == 300
+            assert MCTSStrategy(state, 1, num_playouts=300, playout_policy=playout_policy,
+                                seed=0).which_action_to_take() == action
+        # the search does not change the game state it is given
+        assert state.get_player_fish_count() == {1: 0, 2: 0}
+
+        mcts_strategy = MCTSStrategy(state, 1, time_budget_ms=20, seed=0)
+        assert mcts_strategy.which_action_to_take() in state.get_legal_actions()
+        assert mcts_strategy.get_search_stats()["playouts"] >= 1
+
+        # a PersistentGameState makes the same random choices, so the search ends the same way
+        persistent_state = PersistentGameState.from_game_state(state)
+        for playout_policy in [GREEDY_PLAYOUT, "random"]:
+            assert MCTSStrategy(persistent_state, 1, num_playouts=100, playout_policy=playout_policy,
+                                seed=1).which_action_to_take() == \
+                MCTSStrategy(state, 1, num_playouts=100, playout_policy=playout_policy, seed=1).which_action_to_take()
+
+    def test_mcts_stuck_and_game_over(self):
+        # tests that MCTS handles the empty action of a stuck player, and game over, like a GameTree
+        board = Board(2, 5, {}, num_of_fish_per_tile=2)
+        state = GameState(board, {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[0, 0], [0, 1], [0, 2], [0, 3]], 2: [[1, 0], [1, 1], [1, 2], [1, 3]]})
+        assert state.get_legal_actions() == [()]
+        assert MCTSStrategy(state, 1, num_playouts=10).which_action_to_take() == ()
+
+        state = GameState(Board(1, 2, {}), {1: "black", 2: "white"}, [1, 2],
+                          penguin_posns={1: [[0, 0]], 2: [[0, 1]]})
+        assert MCTSStrategy(state, 1, num_playouts=10).which_action_to_take() == ()
+
     def test_which_action_to_take_tiebreaker(self):
             # tests both cases of the tiebreaker
             board = Board(2, 5, {})
@@ -0,0 +1,111 @@
+from collections import OrderedDict
+
+"""
+A TranspositionTable remembers the results of searching positions, so that a position reached again, for example by
+two penguins moving in the other order, does not have to be searched again. It is keyed by a position hash (see
+GameState.get_hash) and the remaining depth of the search, and each entry is a tuple (value, bound, best_action):
+
+- value is the result of the search. The table does not interpret it, see Strategy for what it holds.
+- bound is one of EXACT, LOWER_BOUND or UPPER_BOUND (see below), what value is known to be relative to the true result.
+- best_action is the Action (see game_tree.py) that led to value, or None if there was none.
+
+A TranspositionTable holds at most max_entries entries. When it is full, the replacement policy decides what to do
+with a new entry:
+
+- DEPTH_PREFERRED: every key maps to one slot, and a new entry only replaces the entry in its slot if it was searched at
+  least as deep, since deeper searches are the expensive ones to redo.
+- LRU: the least recently used entry is dropped.
+
+A TranspositionTable is meant to be kept by one Player across all the searches it does, and counts its hits and misses
+so its effect can be measured.
+"""
+
+# the bound of a value that is the true result
+EXACT = "exact"
+# the bound of a value that the true result is greater than or equal to
+LOWER_BOUND = "lower bound"
+# the bound of a value that the true result is less than or equal to
+UPPER_BOUND = "upper bound"
+
+DEPTH_PREFERRED = "depth-preferred"
+LRU = "lru"
+
+DEFAULT_MAX_ENTRIES = 2 ** 18
+
+
+class TranspositionTable:
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, replacement=DEPTH_PREFERRED):
+        if not isinstance(max_entries, int):
+            raise TypeError('Max entries must be an int')
+        if max_entries < 1:
+            raise ValueError('Max entries must be at least 1')
+        if replacement not in (DEPTH_PREFERRED, LRU):
+            raise ValueError(f'Replacement must be one of {DEPTH_PREFERRED}, {LRU}')
+
+        self.__max_entries = max_entries
+        self.__replacement = replacement
+
+        # DEPTH_PREFERRED: a List of max_entries slots, each either None or a tuple (position_hash, depth, entry)
+        # LRU: an OrderedDict of the form {(position_hash, depth): entry}, from least to most recently used
+        self.__slots = [None] * max_entries if replacement == DEPTH_PREFERRED else None
+        self.__entries = OrderedDict() if replacement == LRU else None
+
+        # ints, the number of lookups that found an entry and that did not
+        self.__hits = 0
+        self.__misses = 0
+
+    def __get_slot_index(self, position_hash, depth):
+        return hash((position_hash, depth)) % self.__max_entries
+
+    def lookup(self, position_hash, depth):
+        entry = None
+        if self.__replacement == DEPTH_PREFERRED:
+            slot = self.__slots[self.__get_slot_index(position_hash, depth)]
+            if slot is not None and slot[0] == position_hash and slot[1] == depth:
+                entry = slot[2]
+        elif (position_hash, depth) in self.__entries:
+            self.__entries.move_to_end((position_hash, depth))
+            entry = self.__entries[(position_hash, depth)]
+
+        if entry is None:
+            self.__misses += 1
+        else:
+            self.__hits += 1
+        return entry
+
+    def store(self, position_hash, depth, value, bound, best_action):
+        entry = (value, bound, best_action)
+        if self.__replacement == DEPTH_PREFERRED:
+            slot_index = self.__get_slot_index(position_hash, depth)
+            slot = self.__slots[slot_index]
+            if slot is None or depth >= slot[1] or (slot[0] == position_hash and slot[1] == depth):
+                self.__slots[slot_index] = (position_hash, depth, entry)
+        else:
+            self.__entries[(position_hash, depth)] = entry
+            self.__entries.move_to_end((position_hash, depth))
+            if len(self.__entries) > self.__max_entries:
+                self.__entries.popitem(last=False)
+
+    def clear(self):
+        if self.__replacement == DEPTH_PREFERRED:
+            self.__slots = [None] * self.__max_entries
+        else:
+            self.__entries.clear()
+
+    def __len__(self):
+        if self.__replacement == DEPTH_PREFERRED:
+            return sum(1 for slot in self.__slots if slot is not None)
+        return len(self.__entries)
+
+    def get_max_entries(self):
+        return self.__max_entries
+
+    def get_replacement(self):
+        return self.__replacement
+
+    def get_hits(self):
+        return self.__hits
+
+    def get_misses(self):
+        return self.__misses
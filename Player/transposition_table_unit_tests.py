@@ -0,0 +1,54 @@
+import unittest
+from transposition_table import TranspositionTable, EXACT, LOWER_BOUND, DEPTH_PREFERRED, LRU
+
+
+class TestTranspositionTable(unittest.TestCase):
+
+    def test_invalid_input(self):
+        with self.assertRaises(TypeError):
+            TranspositionTable(max_entries='hello')
+        with self.assertRaises(ValueError):
+            TranspositionTable(max_entries=0)
+        with self.assertRaises(ValueError):
+            TranspositionTable(replacement='hello')
+
+    def test_lookup_and_store(self):
+        # tests that entries are keyed by both the position hash and the depth, and that hits and misses are counted
+        for replacement in [DEPTH_PREFERRED, LRU]:
+            table = TranspositionTable(replacement=replacement)
+            assert table.lookup(12345, 2) is None
+            table.store(12345, 2, 4, EXACT, ((0, 0), (2, 0)))
+            assert table.lookup(12345, 2) == (4, EXACT, ((0, 0), (2, 0)))
+            assert table.lookup(12345, 1) is None
+            assert table.lookup(54321, 2) is None
+            assert table.get_hits() == 1
+            assert table.get_misses() == 3
+            assert len(table) == 1
+
+    def test_depth_preferred_replacement(self):
+        # tests that with one slot, an entry is only replaced by one searched at least as deep
+        table = TranspositionTable(max_entries=1, replacement=DEPTH_PREFERRED)
+        table.store(1, 3, 4, EXACT, None)
+        table.store(2, 2, 5, EXACT, None)
+        assert table.lookup(1, 3) == (4, EXACT, None)
+        assert table.lookup(2, 2) is None
+        table.store(2, 3, 6, LOWER_BOUND, None)
+        assert table.lookup(1, 3) is None
+        assert table.lookup(2, 3) == (6, LOWER_BOUND, None)
+
+    def test_lru_replacement(self):
+        # tests that the least recently used entry is the one dropped
+        table = TranspositionTable(max_entries=2, replacement=LRU)
+        table.store(1, 1, 1, EXACT, None)
+        table.store(2, 1, 2, EXACT, None)
+        assert table.lookup(1, 1) is not None
+        table.store(3, 1, 3, EXACT, None)
+        assert table.lookup(2, 1) is None
+        assert table.lookup(1, 1) is not None
+        assert table.lookup(3, 1) is not None
+        table.clear()
+        assert len(table) == 0
+
+
+if __name__ == '__main__':
+    unittest.main()